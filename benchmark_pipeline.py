@@ -0,0 +1,263 @@
+# benchmark_pipeline.py
+"""Measure throughput and peak memory of each pipeline stage on a synthetic season"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from statsbomb_events import parse_events, loads_json, calculate_player_match_stats, orjson
+from statsbomb_fetcher import StatsBombFetcher, BACKENDS
+from statsbomb_similarity import PlayerEmbedding
+from statsbomb_synthetic import write_synthetic_corpus, player_name
+
+
+# Stages in pipeline order; each is timed on its own
+STAGES = [
+    'parse_events', 'match_stats', 'season_cold', 'season_warm', 'team_stats',
+    'passing_network', 'heatmap', 'similarity_build', 'similarity_query'
+]
+
+# Never contacted: every document is served from the synthetic corpus on disk
+OFFLINE_URL = 'http://127.0.0.1:9/unreachable'
+
+
+class PipelineBenchmark:
+    """Builds a synthetic corpus once and exposes a setup/run pair per stage"""
+
+    def __init__(self, workdir: str, n_matches: int, events_per_match: int, n_teams: int,
+                 seed: int, backend: str, max_workers: int):
+        self.workdir = workdir
+        self.backend = backend
+        self.max_workers = max_workers
+        self._runs = 0
+
+        print(f"Generating {n_matches} matches x {events_per_match} events (seed {seed})...")
+        start = time.perf_counter()
+        self.raw_dir = os.path.join(workdir, 'corpus')
+        self.corpus = write_synthetic_corpus(self.raw_dir, n_matches, events_per_match, n_teams, seed)
+        print(f"  {self.corpus['bytes'] / 1e6:.1f} MB of JSON in {time.perf_counter() - start:.1f}s")
+
+        self.competition_id = self.corpus['competition_id']
+        self.season_id = self.corpus['season_id']
+        self.match_ids = self.corpus['match_ids']
+
+        # Inputs shared by the stages that exercise one function in isolation
+        self.event_bytes = [self._read('events', match_id) for match_id in self.match_ids]
+        self.lineups = [loads_json(self._read('lineups', match_id)) for match_id in self.match_ids]
+        self.tables = [parse_events(data) for data in self.event_bytes]
+
+        # A fully warmed fetcher backs the per-match query stages and the similarity input
+        self.warm_fetcher = self.new_fetcher(self.new_cache_dir())
+        self.season_stats = self.warm_fetcher.get_player_season_stats(self.competition_id, self.season_id)
+        for match_id in self.match_ids:
+            self.warm_fetcher.get_match_event_table(match_id)
+            self.warm_fetcher.get_lineups(match_id)
+        self.embedding = PlayerEmbedding.from_season_stats(self.season_stats)
+
+    def _read(self, kind: str, match_id: int) -> bytes:
+        with open(os.path.join(self.raw_dir, kind, f"{match_id}.json"), 'rb') as f:
+            return f.read()
+
+    def new_cache_dir(self) -> str:
+        """An empty cache directory whose raw/ tree is the synthetic corpus"""
+        self._runs += 1
+        cache_dir = os.path.join(self.workdir, f"cache_{self._runs}")
+        os.makedirs(cache_dir)
+        os.symlink(self.raw_dir, os.path.join(cache_dir, 'raw'))
+        return cache_dir
+
+    def new_fetcher(self, cache_dir: str) -> StatsBombFetcher:
+        return StatsBombFetcher(max_workers=self.max_workers, cache_dir=cache_dir, base_url=OFFLINE_URL,
+                                max_retries=0, backend=self.backend)
+
+    def stages(self) -> Dict[str, Tuple[str, Callable, Callable]]:
+        """Map stage name to (unit, setup, run); run(setup()) returns the items it processed"""
+        match_infos = [{'match_id': match_id, 'match_date': ''} for match_id in self.match_ids]
+        warm_dir = self.warm_fetcher.cache_dir
+        players = self.season_stats['player_name'].tolist()
+        teams = self.corpus['home_teams']
+
+        def parse(_):
+            for data in self.event_bytes:
+                parse_events(data)
+            return sum(len(table) for table in self.tables)
+
+        def match_stats(_):
+            for table, lineups, info in zip(self.tables, self.lineups, match_infos):
+                calculate_player_match_stats(table, lineups, info)
+            return len(self.match_ids)
+
+        def season(fetcher):
+            fetcher.get_player_season_stats(self.competition_id, self.season_id)
+            fetcher.close()
+            return len(self.match_ids)
+
+        def team_stats(_):
+            self.warm_fetcher.get_team_stats(self.competition_id, self.season_id)
+            return len(self.match_ids)
+
+        def passing_network(_):
+            for match_id, team in zip(self.match_ids, teams):
+                self.warm_fetcher.get_passing_network(match_id, team)
+            return len(self.match_ids)
+
+        def heatmap(_):
+            for match_id in self.match_ids:
+                self.warm_fetcher.get_player_heatmap_data(match_id, player_name(0, 9))
+            return len(self.match_ids)
+
+        def similarity_build(_):
+            PlayerEmbedding.from_season_stats(self.season_stats)
+            return len(self.season_stats)
+
+        def similarity_query(_):
+            self.embedding.query_many(players, top_n=10)
+            return len(players)
+
+        return {
+            'parse_events': ('events', lambda: None, parse),
+            'match_stats': ('matches', lambda: None, match_stats),
+            'season_cold': ('matches', lambda: self.new_fetcher(self.new_cache_dir()), season),
+            'season_warm': ('matches', lambda: self.new_fetcher(warm_dir), season),
+            'team_stats': ('matches', lambda: None, team_stats),
+            'passing_network': ('matches', lambda: None, passing_network),
+            'heatmap': ('matches', lambda: None, heatmap),
+            'similarity_build': ('players', lambda: None, similarity_build),
+            'similarity_query': ('queries', lambda: None, similarity_query)
+        }
+
+
+def measure(unit: str, setup: Callable, run: Callable, repeat: int) -> Dict:
+    """Best wall time over the repeats, then peak traced memory of one more run"""
+    best = float('inf')
+    items = 0
+    for _ in range(repeat):
+        state = setup()
+        gc.collect()
+        start = time.perf_counter()
+        items = run(state)
+        best = min(best, time.perf_counter() - start)
+
+    # Tracing slows everything down, so memory is measured on a separate run
+    state = setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'seconds': best,
+        'items': items,
+        'unit': unit,
+        'throughput': items / best if best > 0 else float('inf'),
+        'peak_mb': peak / 1e6
+    }
+
+
+def environment() -> Dict:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'orjson': getattr(orjson, '__version__', None) if orjson is not None else None
+    }
+
+
+def print_results(results: Dict, baseline: Dict = None):
+    print("\nStage results (best of runs):")
+    print("="*80)
+    header = f"  {'stage':<18} {'time':>10} {'throughput':>22} {'peak mem':>12}"
+    if baseline:
+        header += f" {'vs baseline':>13}"
+    print(header)
+    for name, stage in results['stages'].items():
+        line = (f"  {name:<18} {stage['seconds'] * 1000:8.1f}ms "
+                f"{stage['throughput']:>12,.0f} {stage['unit'] + '/s':<9} {stage['peak_mb']:9.1f} MB")
+        previous = (baseline or {}).get('stages', {}).get(name)
+        if previous:
+            line += f" {stage['throughput'] / previous['throughput']:12.2f}x"
+        print(line)
+
+    parse = results['stages'].get('parse_events')
+    if parse:
+        print(f"\n  parse_events input rate: {results['config']['event_bytes'] / parse['seconds'] / 1e6:.1f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='StatsBomb pipeline benchmark on synthetic data')
+    parser.add_argument('--matches', type=int, default=38, help='Matches in the synthetic season')
+    parser.add_argument('--events', type=int, default=3500, help='Events per match')
+    parser.add_argument('--teams', type=int, default=20, help='Teams in the synthetic league')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage (best is reported)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES, help='Stages to run')
+    parser.add_argument('--backend', choices=BACKENDS, default='threads', help='Backend for season stages')
+    parser.add_argument('--workers', type=int, default=10, help='Worker count for season stages')
+    parser.add_argument('--workdir', help='Directory for the corpus and caches (default: a temp dir)')
+    parser.add_argument('--json', dest='json_path', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON from an earlier run to compare throughput against')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('config', {}).get('matches') != args.matches or \
+                baseline.get('config', {}).get('events') != args.events:
+            print("Warning: baseline was run at a different scale, ratios are not comparable")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='statsbomb_bench_')
+    try:
+        bench = PipelineBenchmark(workdir, args.matches, args.events, args.teams, args.seed,
+                                  args.backend, args.workers)
+        stages = bench.stages()
+
+        results = {
+            'config': {
+                'matches': args.matches,
+                'events': args.events,
+                'teams': args.teams,
+                'seed': args.seed,
+                'repeat': args.repeat,
+                'backend': args.backend,
+                'workers': args.workers,
+                'event_bytes': sum(len(data) for data in bench.event_bytes),
+                'players': len(bench.season_stats)
+            },
+            'environment': environment(),
+            'stages': {}
+        }
+
+        for name in args.stages:
+            print(f"Running {name}...")
+            results['stages'][name] = measure(*stages[name], repeat=args.repeat)
+        bench.warm_fetcher.close()
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results, baseline)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
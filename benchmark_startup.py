@@ -0,0 +1,104 @@
+# benchmark_startup.py
+"""Measure CLI startup: import time per module and wall time of whole invocations"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+
+# Modules whose import cost is reported individually
+MODULES = [
+    'statsbomb_main', 'statsbomb_server', 'statsbomb_analyzer', 'statsbomb_fetcher',
+    'statsbomb_events', 'statsbomb_aggregate', 'statsbomb_similarity', 'statsbomb_memcache',
+    'pandas', 'numpy', 'requests', 'matplotlib.pyplot', 'seaborn'
+]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_tree(module: str) -> List[Tuple[int, str, float]]:
+    """Import a module in a fresh interpreter and return (depth, name, cumulative seconds) per import"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=HERE, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    # Lines look like "import time:      self [us] |  cumulative | imported package",
+    # with nested imports indented two spaces per level
+    tree = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        tree.append((depth, name.strip(), int(cumulative) / 1e6))
+    return tree
+
+
+def direct_imports(tree: List[Tuple[int, str, float]], module: str) -> List[Tuple[str, float]]:
+    """Imports made directly by a top-level module (importtime lists children before their parent)"""
+    children = []
+    end = next(i for i, (depth, name, _) in enumerate(tree) if depth == 0 and name == module)
+    for depth, name, seconds in reversed(tree[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((name, seconds))
+    return children
+
+
+def import_time(module: str) -> float:
+    """Seconds to import a module, including everything it imports"""
+    return sum(seconds for depth, name, seconds in import_tree(module) if depth == 0 and name == module)
+
+
+def command_time(args: List[str], repeat: int) -> float:
+    """Best wall time in seconds of running statsbomb_main.py with the given arguments"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'statsbomb_main.py', *args], cwd=HERE,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='StatsBomb CLI startup benchmark')
+    parser.add_argument('--modules', nargs='+', default=MODULES, help='Modules to time on import')
+    parser.add_argument('--command', action='append', default=[],
+                       help='CLI arguments to time end to end, e.g. --command="--list" (repeatable)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    print("\nImport time per module (best of runs, fresh interpreter each):")
+    print("="*60)
+    for module in args.modules:
+        try:
+            best = min(import_time(module) for _ in range(args.repeat))
+            print(f"  {module:<28} {best * 1000:8.1f} ms")
+        except RuntimeError as e:
+            print(f"  {module:<28} failed: {e}")
+
+    # Show what each project module pulls in directly, heaviest first
+    for module in ['statsbomb_main', 'statsbomb_analyzer']:
+        print(f"\nDirect imports of {module}:")
+        print("="*60)
+        direct = direct_imports(import_tree(module), module)
+        for name, seconds in sorted(direct, key=lambda item: -item[1])[:10]:
+            print(f"  {name:<28} {seconds * 1000:8.1f} ms")
+
+    print("\nEnd-to-end CLI time:")
+    print("="*60)
+    for command in [['--help']] + [c.split() for c in args.command]:
+        print(f"  {' '.join(command):<28} {command_time(command, args.repeat) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# statsbomb_aggregate.py
+"""Materialized season aggregates that can be updated one match at a time"""
+
+import hashlib
+import pandas as pd
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Union
+
+from statsbomb_events import STATS_VERSION
+from statsbomb_diskcache import atomic_write
+
+
+GROUP_COLUMNS = ['player_name', 'team_name', 'position']
+
+# Summed per-match columns, in output order after games_played
+SUM_COLUMNS = [
+    'minutes_played', 'goals', 'assists', 'shots', 'shots_on_target', 'passes',
+    'passes_completed', 'key_passes', 'dribbles', 'dribbles_completed', 'tackles',
+    'interceptions', 'clearances', 'fouls', 'cards_yellow', 'cards_red', 'touches',
+    'xg', 'xa'
+]
+
+FLOAT_SUMS = ['xg', 'xa']
+INT_SUMS = ['games_played'] + [c for c in SUM_COLUMNS if c not in FLOAT_SUMS]
+
+
+def player_name_mask(names: pd.Series, player_name: Union[str, List[str]]) -> np.ndarray:
+    """Match names containing the query (or any of several queries), ignoring case"""
+    queries = [player_name] if isinstance(player_name, str) else player_name
+    names = pd.Series(names)
+
+    mask = np.zeros(len(names), dtype=bool)
+    for query in queries:
+        mask |= names.str.contains(query, case=False, na=False).to_numpy()
+    return mask
+
+
+def add_derived_metrics(aggregated: pd.DataFrame) -> pd.DataFrame:
+    """Add per-90 and ratio columns to summed season stats"""
+    aggregated['goals_per_90'] = (aggregated['goals'] / aggregated['minutes_played']) * 90
+    aggregated['assists_per_90'] = (aggregated['assists'] / aggregated['minutes_played']) * 90
+    aggregated['shots_per_90'] = (aggregated['shots'] / aggregated['minutes_played']) * 90
+    aggregated['key_passes_per_90'] = (aggregated['key_passes'] / aggregated['minutes_played']) * 90
+    aggregated['tackles_per_90'] = (aggregated['tackles'] / aggregated['minutes_played']) * 90
+    aggregated['pass_completion'] = (aggregated['passes_completed'] / aggregated['passes']) * 100
+    aggregated['dribble_success'] = (aggregated['dribbles_completed'] / aggregated['dribbles']) * 100
+    aggregated['shot_accuracy'] = (aggregated['shots_on_target'] / aggregated['shots']) * 100
+    aggregated['xg_per_90'] = (aggregated['xg'] / aggregated['minutes_played']) * 90
+    aggregated['xa_per_90'] = (aggregated['xa'] / aggregated['minutes_played']) * 90
+
+    # Handle division by zero
+    aggregated = aggregated.fillna(0)
+    aggregated = aggregated.replace([float('inf'), -float('inf')], 0)
+
+    return aggregated
+
+
+def sum_match_stats(match_stats: pd.DataFrame) -> pd.DataFrame:
+    """Sum per-match player rows into season totals keyed by player, team and position"""
+    sums = match_stats.groupby(GROUP_COLUMNS).agg(
+        games_played=('match_id', 'count'),
+        **{column: (column, 'sum') for column in SUM_COLUMNS}
+    )
+    return sums
+
+
+def _empty_sums() -> pd.DataFrame:
+    return pd.DataFrame(
+        {column: pd.Series(dtype=np.float64 if column in FLOAT_SUMS else np.int64)
+         for column in ['games_played'] + SUM_COLUMNS},
+        index=pd.MultiIndex.from_tuples([], names=GROUP_COLUMNS)
+    )
+
+
+def _add_sums(sums: pd.DataFrame, other: pd.DataFrame) -> pd.DataFrame:
+    sums = sums.add(other, fill_value=0).sort_index()
+    return sums.astype({column: np.int64 for column in INT_SUMS})
+
+
+class SeasonAggregate:
+    """Season totals per player plus the matches (and their source fingerprints) they cover"""
+
+    def __init__(self):
+        self.sums = _empty_sums()
+        self.fingerprints = {}
+
+        # Matches folded in without a fingerprint (their events or lineups are not cached) count
+        # towards this result only; they are never saved and stay pending for the next update
+        self.uncovered = _empty_sums()
+
+    @property
+    def match_ids(self) -> set:
+        return set(self.fingerprints)
+
+    @property
+    def empty(self) -> bool:
+        return self.sums.empty and self.uncovered.empty
+
+    def covered(self) -> 'SeasonAggregate':
+        """A copy holding only the matches it covers, safe to cache and to fold more matches into"""
+        aggregate = SeasonAggregate()
+        aggregate.sums = self.sums.copy()
+        aggregate.fingerprints = dict(self.fingerprints)
+        return aggregate
+
+    def coverage(self) -> Optional[str]:
+        """Digest of the covered matches and their fingerprints, or None while any match is uncovered"""
+        if not self.uncovered.empty:
+            return None
+        digest = hashlib.sha1()
+        for match_id in sorted(self.fingerprints):
+            digest.update(f"{match_id}={self.fingerprints[match_id]};".encode())
+        return digest.hexdigest()
+
+    def is_current(self, fingerprints: Dict[int, Optional[str]]) -> bool:
+        """Check that no covered match has changed or left the season since it was folded in"""
+        for match_id, fingerprint in self.fingerprints.items():
+            if match_id not in fingerprints:
+                return False
+            current = fingerprints[match_id]
+            if fingerprint is None or current is None or fingerprint != current:
+                return False
+        return True
+
+    def add(self, match_stats: Iterable[pd.DataFrame], fingerprints: Dict[int, Optional[str]]):
+        """Fold new per-match stats frames into the running season totals"""
+        covered = []
+        uncovered = []
+        for stats in match_stats:
+            if stats.empty:
+                continue
+            match_id = int(stats['match_id'].iloc[0])
+            if fingerprints.get(match_id) is None:
+                uncovered.append(stats)
+            else:
+                covered.append(stats)
+                self.fingerprints[match_id] = fingerprints[match_id]
+
+        if covered:
+            self.sums = _add_sums(self.sums, sum_match_stats(pd.concat(covered)))
+        if uncovered:
+            self.uncovered = _add_sums(self.uncovered, sum_match_stats(pd.concat(uncovered)))
+
+    def to_frame(self, player_name: Union[str, List[str]] = None) -> pd.DataFrame:
+        """Build the season stats frame, with per-90 and ratio columns recomputed from the sums"""
+        aggregated = self.sums
+        if not self.uncovered.empty:
+            aggregated = _add_sums(aggregated, self.uncovered)
+        if player_name:
+            aggregated = aggregated[player_name_mask(aggregated.index.get_level_values('player_name'), player_name)]
+
+        return add_derived_metrics(aggregated.copy()).reset_index()
+
+    def save(self, path: str):
+        """Write the aggregate as an .npz file"""
+        match_ids = list(self.fingerprints)
+        with atomic_write(path) as f:
+            np.savez(
+                f,
+                __version__=np.array(STATS_VERSION),
+                **{column: np.asarray(self.sums.index.get_level_values(column), dtype=str)
+                   for column in GROUP_COLUMNS},
+                int_sums=self.sums[INT_SUMS].to_numpy(dtype=np.int64),
+                float_sums=self.sums[FLOAT_SUMS].to_numpy(dtype=np.float64),
+                match_ids=np.array(match_ids, dtype=np.int64),
+                fingerprints=np.asarray([self.fingerprints[m] or '' for m in match_ids], dtype=str)
+            )
+
+    @classmethod
+    def load(cls, path: str) -> 'SeasonAggregate':
+        """Read an aggregate written by save"""
+        aggregate = cls()
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['__version__']) != STATS_VERSION:
+                raise ValueError(f"Stale stats version in {path}")
+
+            index = pd.MultiIndex.from_arrays([data[column] for column in GROUP_COLUMNS], names=GROUP_COLUMNS)
+            sums = pd.DataFrame(data['int_sums'], index=index, columns=INT_SUMS)
+            sums[FLOAT_SUMS] = data['float_sums']
+            aggregate.sums = sums[['games_played'] + SUM_COLUMNS]
+            aggregate.fingerprints = {
+                int(match_id): fingerprint or None
+                for match_id, fingerprint in zip(data['match_ids'], data['fingerprints'].tolist())
+            }
+
+        return aggregate
@@ -1,25 +1,50 @@
 # statsbomb_analyzer.py
 """Enhanced analyzer using StatsBomb detailed event data"""
 
+import os
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional
-from statsbomb_fetcher import StatsBombFetcher
-import matplotlib.pyplot as plt
-import seaborn as sns
-from matplotlib.patches import Arc
+from statsbomb_fetcher import StatsBombFetcher, get_shared_fetcher
+from statsbomb_aggregate import player_name_mask
+from statsbomb_similarity import PlayerEmbedding
+from statsbomb_metrics import metrics
+from statsbomb_diskcache import NPZ_ERRORS, discard_file
+
+
+# Season columns summed into a player's career totals
+CAREER_COLUMNS = [
+    'games_played', 'minutes_played', 'goals', 'assists', 'xg', 'xa', 'shots',
+    'shots_on_target', 'passes', 'passes_completed', 'key_passes', 'tackles',
+    'interceptions'
+]
+
+
+def _pyplot():
+    """Import pyplot on first use, so only visualizations pay for the plotting stack"""
+    import matplotlib.pyplot as plt
+    return plt
 
 
 class StatsBombAnalyzer:
     """Analyzes player and team performance using StatsBomb event data"""
     
-    def __init__(self):
-        self.fetcher = StatsBombFetcher(max_workers=10)  # Use threading
+    def __init__(self, fetcher: StatsBombFetcher = None):
+        # Share the process-wide fetcher (and its cache) unless one is injected
+        self.fetcher = fetcher if fetcher is not None else get_shared_fetcher(max_workers=10)
+        self._embeddings = {}
+        self._similarity_index = None
         
     def analyze_player_performance(self, player_name: str, 
                                  competition_name: str = None,
                                  season_name: str = None) -> Dict:
         """Comprehensive player analysis using StatsBomb data"""
+        return self.analyze_players([player_name], competition_name, season_name)[player_name]
+    
+    def analyze_players(self, player_names: List[str],
+                        competition_name: str = None,
+                        season_name: str = None) -> Dict[str, Dict]:
+        """Analyze several players from a single shared season computation"""
         competitions = self.fetcher.get_competitions()
         
         # Filter competitions if specified
@@ -28,68 +53,58 @@ class StatsBombAnalyzer:
         if season_name:
             competitions = competitions[competitions['season_name'] == season_name]
         
-        all_stats = []
+        # Load every matching season once for all players through one shared worker pool
+        season_stats = self.fetcher.get_multi_season_stats(competitions, list(player_names))
         
-        for _, comp in competitions.iterrows():
-            try:
-                stats = self.fetcher.get_player_season_stats(
-                    comp['competition_id'], 
-                    comp['season_id'],
-                    player_name
-                )
-                if not stats.empty:
-                    stats['competition'] = comp['competition_name']
-                    stats['season'] = comp['season_name']
-                    all_stats.append(stats)
-            except:
-                continue
+        analyses = {name: {"error": f"No data found for player {name}"} for name in player_names}
+        if season_stats.empty:
+            return analyses
         
-        if not all_stats:
-            return {"error": f"No data found for player {player_name}"}
-        
-        player_data = pd.concat(all_stats)
-        
-        # Aggregate across all competitions
-        career_stats = player_data.groupby('player_name').agg({
-            'games_played': 'sum',
-            'minutes_played': 'sum',
-            'goals': 'sum',
-            'assists': 'sum',
-            'xg': 'sum',
-            'xa': 'sum',
-            'shots': 'sum',
-            'shots_on_target': 'sum',
-            'passes': 'sum',
-            'passes_completed': 'sum',
-            'key_passes': 'sum',
-            'tackles': 'sum',
-            'interceptions': 'sum'
-        }).iloc[0]
+        # Tag rows with every query they match so all players aggregate in one groupby
+        tagged = pd.concat([
+            season_stats[player_name_mask(season_stats['player_name'], name)].assign(query=name)
+            for name in player_names
+        ])
+        if tagged.empty:
+            return analyses
         
-        # Calculate advanced metrics
-        analysis = {
-            'player_name': player_name,
-            'career_stats': career_stats.to_dict(),
-            'per_90_stats': {
-                'goals_per_90': (career_stats['goals'] / career_stats['minutes_played']) * 90,
-                'assists_per_90': (career_stats['assists'] / career_stats['minutes_played']) * 90,
-                'xg_per_90': (career_stats['xg'] / career_stats['minutes_played']) * 90,
-                'xa_per_90': (career_stats['xa'] / career_stats['minutes_played']) * 90,
-                'shots_per_90': (career_stats['shots'] / career_stats['minutes_played']) * 90,
-                'key_passes_per_90': (career_stats['key_passes'] / career_stats['minutes_played']) * 90,
-                'tackles_per_90': (career_stats['tackles'] / career_stats['minutes_played']) * 90
-            },
-            'efficiency_metrics': {
-                'goals_per_shot': career_stats['goals'] / career_stats['shots'] if career_stats['shots'] > 0 else 0,
-                'shot_accuracy': career_stats['shots_on_target'] / career_stats['shots'] * 100 if career_stats['shots'] > 0 else 0,
-                'pass_completion': career_stats['passes_completed'] / career_stats['passes'] * 100 if career_stats['passes'] > 0 else 0,
-                'xg_overperformance': career_stats['goals'] - career_stats['xg'],
-                'xa_overperformance': career_stats['assists'] - career_stats['xa']
-            },
-            'by_competition': player_data.to_dict('records')
-        }
+        # Aggregate across all competitions, keeping the first matching player per query
+        career = tagged.groupby(['query', 'player_name'])[CAREER_COLUMNS].sum()
+        career = career.groupby(level='query').head(1).droplevel('player_name')
         
-        return analysis
+        minutes = career['minutes_played']
+        shots = career['shots']
+        passes = career['passes']
+        
+        # Calculate advanced metrics
+        per_90 = pd.DataFrame({
+            'goals_per_90': (career['goals'] / minutes) * 90,
+            'assists_per_90': (career['assists'] / minutes) * 90,
+            'xg_per_90': (career['xg'] / minutes) * 90,
+            'xa_per_90': (career['xa'] / minutes) * 90,
+            'shots_per_90': (career['shots'] / minutes) * 90,
+            'key_passes_per_90': (career['key_passes'] / minutes) * 90,
+            'tackles_per_90': (career['tackles'] / minutes) * 90
+        })
+        efficiency = pd.DataFrame({
+            'goals_per_shot': (career['goals'] / shots).where(shots > 0, 0),
+            'shot_accuracy': (career['shots_on_target'] / shots * 100).where(shots > 0, 0),
+            'pass_completion': (career['passes_completed'] / passes * 100).where(passes > 0, 0),
+            'xg_overperformance': career['goals'] - career['xg'],
+            'xa_overperformance': career['assists'] - career['xa']
+        })
+        
+        for name in career.index:
+            analyses[name] = {
+                'player_name': name,
+                # Column by column, so counts stay integers next to the float xG sums
+                'career_stats': {column: career[column].loc[name].item() for column in CAREER_COLUMNS},
+                'per_90_stats': per_90.loc[name].to_dict(),
+                'efficiency_metrics': efficiency.loc[name].to_dict(),
+                'by_competition': tagged[tagged['query'] == name].drop(columns='query').to_dict('records')
+            }
+        
+        return analyses
     
     def compare_players(self, player_names: List[str], 
                        metrics: List[str] = None) -> pd.DataFrame:
@@ -100,8 +115,9 @@ class StatsBombAnalyzer:
         
         comparison_data = []
         
+        analyses = self.analyze_players(player_names)
         for player in player_names:
-            analysis = self.analyze_player_performance(player)
+            analysis = analyses[player]
             if 'error' not in analysis:
                 player_metrics = {'player_name': player}
                 player_metrics.update(analysis['per_90_stats'])
@@ -109,75 +125,141 @@ class StatsBombAnalyzer:
                 comparison_data.append(player_metrics)
         
         comparison_df = pd.DataFrame(comparison_data)
+        if comparison_df.empty:
+            return comparison_df
         
         # Select only requested metrics
         available_metrics = [m for m in metrics if m in comparison_df.columns]
         return comparison_df[['player_name'] + available_metrics]
     
-    def find_similar_players_statsbomb(self, target_player: str, 
-                                      position_filter: str = None,
-                                      top_n: int = 10) -> pd.DataFrame:
-        """Find similar players based on StatsBomb playing style metrics"""
-        # Get all available players from a recent competition
+    def get_player_embedding(self, competition_id: int, season_id: int) -> PlayerEmbedding:
+        """Get a season's player feature matrix, cached in memory and on disk by the aggregate it was built from"""
+        key = (competition_id, season_id)
+        
+        # Bring the season aggregate up to date first, so a changed season never reuses an old matrix
+        aggregate = self.fetcher.get_season_aggregate(competition_id, season_id)
+        if aggregate.empty:
+            raise ValueError(f"No player stats for competition {competition_id}, season {season_id}")
+        coverage = aggregate.coverage()
+        
+        embedding = self._embeddings.pop(key, None)
+        if embedding is not None and coverage is not None and embedding.coverage == coverage:
+            self._embeddings[key] = embedding
+            return embedding
+        
+        # Reuse the on-disk matrix only if it was built from the same matches and fingerprints
+        embedding_path = os.path.join(self.fetcher.cache_dir, f"embedding_{competition_id}_{season_id}.npz")
+        embedding = None
+        if coverage is not None and os.path.exists(embedding_path):
+            try:
+                with metrics.timer('disk_load'):
+                    embedding = PlayerEmbedding.load(embedding_path)
+            except NPZ_ERRORS as e:
+                discard_file(embedding_path, f"{type(e).__name__}: {e}")
+                embedding = None
+            if embedding is not None and embedding.coverage != coverage:
+                embedding = None
+        metrics.hit('embedding', embedding is not None)
+        
+        if embedding is None:
+            with metrics.timer('aggregation'):
+                all_players = aggregate.to_frame()
+            with metrics.timer('similarity_build'):
+                embedding = PlayerEmbedding.from_season_stats(all_players)
+            embedding.coverage = coverage
+            
+            # A season with uncovered matches is rebuilt until they are cached
+            if coverage is not None:
+                try:
+                    embedding.save(embedding_path)
+                except OSError:
+                    pass
+        
+        if coverage is not None:
+            self._embeddings[key] = embedding
+        return embedding
+    
+    def _similarity_index_path(self) -> str:
+        return os.path.join(self.fetcher.cache_dir, 'similarity_index')
+    
+    def build_similarity_index(self, competitions: pd.DataFrame = None) -> Optional[PlayerEmbedding]:
+        """Build the cross-competition similarity index from every season aggregate"""
+        if competitions is None:
+            competitions = self.fetcher.get_competitions()
+        
+        print(f"Building similarity index over {len(competitions)} seasons...")
+        all_stats = self.fetcher.get_multi_season_stats(competitions)
+        if all_stats.empty:
+            print("No season stats available for the similarity index")
+            return None
+        
+        with metrics.timer('similarity_build'):
+            embedding = PlayerEmbedding.from_season_stats(all_stats)
+            embedding.save_index(self._similarity_index_path())
+        print(f"Indexed {len(embedding)} player-seasons")
+        
+        # Reopen memory-mapped so queries read the same arrays later runs will
+        self._similarity_index = PlayerEmbedding.load_index(self._similarity_index_path())
+        return self._similarity_index
+    
+    def get_similarity_index(self) -> Optional[PlayerEmbedding]:
+        """Get the memory-mapped cross-competition index, or None if it has not been built"""
+        if self._similarity_index is None:
+            try:
+                self._similarity_index = PlayerEmbedding.load_index(self._similarity_index_path())
+            except (OSError, ValueError, KeyError):
+                return None
+        return self._similarity_index
+    
+    def _default_similarity_season(self):
+        """Season used for similarity search when none is given"""
         competitions = self.fetcher.get_competitions()
         
         # Use a competition with many players (e.g., Premier League)
         pl = competitions[competitions['competition_name'] == 'Premier League'].iloc[-1]
+        return pl['competition_id'], pl['season_id']
+    
+    def find_similar_players_many(self, target_players: List[str],
+                                  position_filter: str = None,
+                                  top_n: int = 10,
+                                  competition_id: int = None,
+                                  season_id: int = None) -> Dict[str, pd.DataFrame]:
+        """Find similar players for many targets at once"""
+        embedding = None
+        if competition_id is None and season_id is None:
+            # Search the whole corpus when an offline index exists
+            embedding = self.get_similarity_index()
+            if embedding is None:
+                competition_id, season_id = self._default_similarity_season()
+        
+        if embedding is None:
+            try:
+                embedding = self.get_player_embedding(competition_id, season_id)
+            except ValueError:
+                return {target: pd.DataFrame() for target in target_players}
         
-        all_players = self.fetcher.get_player_season_stats(
-            pl['competition_id'], 
-            pl['season_id']
-        )
-        
-        if all_players.empty:
-            return pd.DataFrame()
-        
-        # Filter by position if specified
-        if position_filter:
-            all_players = all_players[all_players['position'].str.contains(position_filter, case=False)]
-        
-        # Get target player stats
-        target_stats = all_players[all_players['player_name'] == target_player]
-        if target_stats.empty:
-            return pd.DataFrame()
-        
-        target_stats = target_stats.iloc[0]
-        
-        # Define similarity metrics based on position
-        if 'Forward' in str(target_stats['position']):
-            similarity_metrics = ['goals_per_90', 'xg_per_90', 'shots_per_90', 'touches']
-        elif 'Midfield' in str(target_stats['position']):
-            similarity_metrics = ['assists_per_90', 'xa_per_90', 'key_passes_per_90', 'pass_completion']
-        elif 'Back' in str(target_stats['position']):
-            similarity_metrics = ['tackles_per_90', 'interceptions', 'clearances', 'pass_completion']
-        else:
-            similarity_metrics = ['goals_per_90', 'assists_per_90', 'xg_per_90', 'xa_per_90']
-        
-        # Calculate similarity scores
-        all_players['similarity_score'] = 0
-        
-        for metric in similarity_metrics:
-            if metric in all_players.columns:
-                # Normalize metric
-                metric_std = all_players[metric].std()
-                if metric_std > 0:
-                    all_players['similarity_score'] += (
-                        (all_players[metric] - target_stats[metric]).abs() / metric_std
-                    )
-        
-        # Remove target player and sort by similarity
-        similar = all_players[all_players['player_name'] != target_player].copy()
-        similar = similar.sort_values('similarity_score').head(top_n)
-        
-        return similar[['player_name', 'team_name', 'position', 'games_played'] + 
-                      similarity_metrics + ['similarity_score']]
+        with metrics.timer('similarity_search'):
+            return embedding.query_many(target_players, position_filter, top_n)
+    
+    def find_similar_players_statsbomb(self, target_player: str, 
+                                      position_filter: str = None,
+                                      top_n: int = 10,
+                                      competition_id: int = None,
+                                      season_id: int = None) -> pd.DataFrame:
+        """Find similar players based on StatsBomb playing style metrics"""
+        return self.find_similar_players_many(
+            [target_player], position_filter, top_n, competition_id, season_id
+        )[target_player]
     
-    def visualize_player_radar(self, player_names: List[str]):
+    def visualize_player_radar(self, player_names: List[str], comparison: pd.DataFrame = None):
         """Create radar chart comparing players using StatsBomb metrics"""
+        plt = _pyplot()
         metrics = ['goals_per_90', 'assists_per_90', 'xg_per_90', 
                   'xa_per_90', 'shots_per_90', 'key_passes_per_90']
         
-        comparison = self.compare_players(player_names, metrics)
+        # Reuse an existing comparison instead of recomputing every player's stats
+        if comparison is None or not set(metrics) <= set(comparison.columns):
+            comparison = self.compare_players(player_names, metrics)
         
         if comparison.empty:
             print("No data available for comparison")
@@ -236,6 +318,7 @@ class StatsBombAnalyzer:
     
     def visualize_pitch_heatmap(self, match_id: int, player_name: str):
         """Visualize player movement heatmap on pitch"""
+        plt = _pyplot()
         locations = self.fetcher.get_player_heatmap_data(match_id, player_name)
         
         if not locations:
@@ -279,6 +362,7 @@ class StatsBombAnalyzer:
     
     def visualize_passing_network(self, match_id: int, team_name: str):
         """Visualize team passing network"""
+        plt = _pyplot()
         network_data = self.fetcher.get_passing_network(match_id, team_name)
         
         if not network_data:
@@ -345,10 +429,18 @@ class StatsBombAnalyzer:
         plt.tight_layout()
         plt.show()
     
+    def _season_player_stats(self, competition_id: int, season_id: int,
+                             player_stats: pd.DataFrame = None) -> pd.DataFrame:
+        """Season stats for a report; callers running several reports pass in one shared season frame"""
+        if player_stats is None:
+            player_stats = self.fetcher.get_player_season_stats(competition_id, season_id)
+        return player_stats
+    
     def analyze_shooting_efficiency(self, competition_id: int, season_id: int, 
-                                  min_shots: int = 20) -> pd.DataFrame:
+                                  min_shots: int = 20,
+                                  player_stats: pd.DataFrame = None) -> pd.DataFrame:
         """Analyze shooting efficiency across all players in a competition"""
-        player_stats = self.fetcher.get_player_season_stats(competition_id, season_id)
+        player_stats = self._season_player_stats(competition_id, season_id, player_stats)
         
         # Filter players with minimum shots
         shooters = player_stats[player_stats['shots'] >= min_shots].copy()
@@ -367,9 +459,10 @@ class StatsBombAnalyzer:
                         'shooting_overperformance', 'shot_accuracy']]
     
     def analyze_creative_players(self, competition_id: int, season_id: int,
-                               min_passes: int = 500) -> pd.DataFrame:
+                               min_passes: int = 500,
+                               player_stats: pd.DataFrame = None) -> pd.DataFrame:
         """Identify most creative players based on passing and chance creation"""
-        player_stats = self.fetcher.get_player_season_stats(competition_id, season_id)
+        player_stats = self._season_player_stats(competition_id, season_id, player_stats)
         
         # Filter players with minimum passes
         creators = player_stats[player_stats['passes'] >= min_passes].copy()
@@ -393,9 +486,10 @@ class StatsBombAnalyzer:
                         'key_passes_per_90', 'creative_actions_per_90', 'assist_rate']]
     
     def analyze_defensive_players(self, competition_id: int, season_id: int,
-                                min_minutes: int = 900) -> pd.DataFrame:
+                                min_minutes: int = 900,
+                                player_stats: pd.DataFrame = None) -> pd.DataFrame:
         """Analyze defensive performance metrics"""
-        player_stats = self.fetcher.get_player_season_stats(competition_id, season_id)
+        player_stats = self._season_player_stats(competition_id, season_id, player_stats)
         
         # Filter defenders and defensive midfielders
         defenders = player_stats[
@@ -0,0 +1,355 @@
+# statsbomb_cacheadmin.py
+"""Cache directory maintenance: warming, sizes by type and competition, verification and pruning"""
+
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from statsbomb_container import SeasonContainer, CONTAINER_ERRORS
+from statsbomb_diskcache import DiskCache, ENTRY_SUFFIX, NPZ_ERRORS
+from statsbomb_events import loads_json
+from statsbomb_prefetch import BulkDownloader
+
+
+# Cache files by type, matched against their path relative to the cache directory, with the
+# match id or (competition id, season id) the file belongs to
+FILE_TYPES = [
+    ('raw_events', re.compile(r'events_(\d+)\.pkl'), 'match'),
+    ('lineups', re.compile(r'lineups_(\d+)\.pkl'), 'match'),
+    ('matches', re.compile(r'matches_(\d+)_(\d+)\.pkl'), 'season'),
+    ('competitions', re.compile(r'competitions\.pkl'), None),
+    ('event_table', re.compile(r'events_(\d+)\.npz'), 'match'),
+    ('match_stats', re.compile(r'stats_(\d+)\.npz'), 'match'),
+    ('season_aggregate', re.compile(r'season_(\d+)_(\d+)\.npz'), 'season'),
+    ('embedding', re.compile(r'embedding_(\d+)_(\d+)\.npz'), 'season'),
+    ('container', re.compile(r'seasons/season_(\d+)_(\d+)\.sbs'), 'season'),
+    ('raw_json', re.compile(r'raw/(?:events|lineups)/(\d+)\.json'), 'match'),
+    ('raw_json', re.compile(r'raw/matches/(\d+)/(\d+)\.json'), 'season'),
+    ('raw_json', re.compile(r'raw/competitions\.json'), None),
+    ('etag', re.compile(r'(?:events|lineups|event_table)_(\d+)\.etag'), 'match'),
+    ('etag', re.compile(r'matches_(\d+)_(\d+)\.etag'), 'season'),
+    ('etag', re.compile(r'competitions\.etag'), None),
+    ('index', re.compile(r'player_index\.json|similarity_index/.*'), None),
+    ('source_copy', re.compile(r'sources/.*\.tar'), None),
+    ('temp', re.compile(r'.*\.(?:tmp|part)'), None)
+]
+
+# Never evicted by prune for their age: indexes are expensive to rebuild, ETags go with their
+# entries and temp files are only removed once stale
+KEEP_TYPES = ('index', 'etag', 'temp', 'other')
+
+# Temp files older than this belong to writes that were interrupted rather than still running
+TEMP_GRACE_SECONDS = 3600
+
+
+def scan_cache(cache_dir: str) -> List[Dict]:
+    """List every file in a cache directory with its type, size, last use and owning match or season"""
+    files = []
+    for root, _, names in os.walk(cache_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+
+            # atime is only coarsely kept on relatime/noatime mounts, so a write counts as a use too
+            entry = {'path': path, 'name': os.path.relpath(path, cache_dir).replace(os.sep, '/'),
+                     'type': 'other', 'bytes': st.st_size, 'accessed': max(st.st_atime, st.st_mtime),
+                     'match_id': None, 'season': None}
+            for file_type, pattern, owner in FILE_TYPES:
+                match = pattern.fullmatch(entry['name'])
+                if match is None:
+                    continue
+                entry['type'] = file_type
+                if owner == 'match':
+                    entry['match_id'] = int(match.group(1))
+                elif owner == 'season':
+                    entry['season'] = (int(match.group(1)), int(match.group(2)))
+                break
+            files.append(entry)
+    return files
+
+
+def _entry_key(entry: Dict) -> Optional[str]:
+    """Disk cache key of a pickled entry, or None for every other kind of file"""
+    name = entry['name']
+    if '/' in name or not name.endswith(ENTRY_SUFFIX):
+        return None
+    return name[:-len(ENTRY_SUFFIX)]
+
+
+def _container_match_ids(path: str) -> List[int]:
+    container = SeasonContainer(path)
+    try:
+        return container.match_ids
+    finally:
+        container.close()
+
+
+def _match_seasons(disk_cache: DiskCache, files: List[Dict]) -> Dict[int, Tuple[int, int]]:
+    """Map cached match ids to their (competition id, season id) using the cached match lists and containers"""
+    seasons = {}
+    for entry in files:
+        if entry['season'] is None:
+            continue
+        try:
+            if entry['type'] == 'matches':
+                matches = disk_cache.get(_entry_key(entry))
+                match_ids = [] if matches is None or matches.empty else matches['match_id'].tolist()
+            elif entry['type'] == 'raw_json':
+                with open(entry['path'], 'rb') as f:
+                    match_ids = [match['match_id'] for match in loads_json(f.read())]
+            elif entry['type'] == 'container':
+                match_ids = _container_match_ids(entry['path'])
+            else:
+                continue
+        except CONTAINER_ERRORS:
+            continue
+        for match_id in match_ids:
+            seasons[int(match_id)] = entry['season']
+    return seasons
+
+
+def cached_seasons(cache_dir: str) -> List[Tuple[int, int]]:
+    """Seasons whose match list is cached, so their matches can be found without a download"""
+    return sorted({entry['season'] for entry in scan_cache(cache_dir)
+                   if entry['type'] in ('matches', 'raw_json', 'container') and entry['season'] is not None})
+
+
+def cache_summary(cache_dir: str) -> Dict:
+    """Count a cache's entries and bytes by type and by competition"""
+    disk_cache = DiskCache(cache_dir)
+    files = scan_cache(cache_dir)
+    match_seasons = _match_seasons(disk_cache, files)
+
+    competitions = disk_cache.get('competitions')
+    names = {} if competitions is None or competitions.empty else dict(
+        zip(competitions['competition_id'], competitions['competition_name'])
+    )
+
+    by_type = {}
+    by_competition = {}
+    for entry in files:
+        season = entry['season'] or match_seasons.get(entry['match_id'])
+        if season is not None:
+            competition = names.get(season[0], f"competition {season[0]}")
+        else:
+            competition = '(unknown)' if entry['match_id'] is not None else '(shared)'
+
+        for totals, key in ((by_type, entry['type']), (by_competition, competition)):
+            total = totals.setdefault(key, {'entries': 0, 'bytes': 0})
+            total['entries'] += 1
+            total['bytes'] += entry['bytes']
+
+    return {
+        'directory': cache_dir,
+        'entries': len(files),
+        'bytes': sum(entry['bytes'] for entry in files),
+        'types': by_type,
+        'competitions': by_competition
+    }
+
+
+def _verify_npz(path: str) -> Optional[str]:
+    """Read every array of an npz file, returning why it is unreadable or None if it is intact"""
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            for name in data.files:
+                data[name]
+    except NPZ_ERRORS as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def _verify_container(path: str) -> Optional[str]:
+    """Check a season container's header and every block's checksum"""
+    try:
+        container = SeasonContainer(path)
+    except CONTAINER_ERRORS as e:
+        return f"{type(e).__name__}: {e}"
+    try:
+        damaged = container.verify()
+    finally:
+        container.close()
+    return f"{len(damaged)} damaged matches, rebuild it with cache compact" if damaged else None
+
+
+def verify_cache(cache_dir: str) -> Dict:
+    """Check every pickled entry, npz table and season container, removing damaged entries and tables"""
+    disk_cache = DiskCache(cache_dir)
+    checked = 0
+    damaged = []
+    for entry in scan_cache(cache_dir):
+        key = _entry_key(entry)
+        if key is not None:
+            checked += 1
+            if key not in disk_cache:
+                # Written by a process that stopped before recording it, so it cannot be trusted
+                print(f"Removing untracked cache file {entry['name']}")
+                os.remove(entry['path'])
+                damaged.append(entry['name'])
+            elif not disk_cache.verify(key):
+                damaged.append(entry['name'])
+        elif entry['name'].endswith('.npz'):
+            checked += 1
+            reason = _verify_npz(entry['path'])
+            if reason is not None:
+                print(f"Removing unreadable {entry['name']}: {reason}")
+                os.remove(entry['path'])
+                damaged.append(entry['name'])
+        elif entry['type'] == 'container':
+            # Damaged blocks are refetched when read, so the container is kept for its intact matches
+            checked += 1
+            reason = _verify_container(entry['path'])
+            if reason is not None:
+                print(f"Damaged container {entry['name']}: {reason}")
+                damaged.append(entry['name'])
+
+    return {'checked': checked, 'damaged': damaged}
+
+
+def _remove_entry(disk_cache: DiskCache, entry: Dict):
+    """Delete a cache file, keeping the disk cache manifest in step"""
+    key = _entry_key(entry)
+    if key is not None:
+        disk_cache.remove(key)
+        return
+    try:
+        os.remove(entry['path'])
+    except FileNotFoundError:
+        pass
+
+
+def _orphan_etags(files: List[Dict], evicted: set) -> List[Dict]:
+    """ETags whose entry is gone or about to be evicted; matches held by a container keep theirs"""
+    live = set()
+    for entry in files:
+        if entry['path'] in evicted:
+            continue
+        key = _entry_key(entry)
+        if key is not None:
+            live.add(key)
+        elif entry['type'] == 'event_table':
+            live.add(f"event_table_{entry['match_id']}")
+        elif entry['type'] == 'container':
+            try:
+                match_ids = _container_match_ids(entry['path'])
+            except (OSError, ValueError, KeyError):
+                continue
+            for match_id in match_ids:
+                live.update((f"lineups_{match_id}", f"event_table_{match_id}"))
+    return [entry for entry in files if entry['type'] == 'etag' and entry['name'][:-len('.etag')] not in live]
+
+
+def prune_cache(cache_dir: str, max_age_days: float = None, max_bytes: int = None,
+                dry_run: bool = False) -> Dict:
+    """Evict entries unused for max_age_days, then least recently used ones until the cache fits in max_bytes"""
+    disk_cache = DiskCache(cache_dir)
+    files = scan_cache(cache_dir)
+    now = time.time()
+
+    # Interrupted writes leave temp files that nothing will ever read
+    evict = [entry for entry in files if entry['type'] == 'temp' and now - entry['accessed'] > TEMP_GRACE_SECONDS]
+
+    candidates = sorted((entry for entry in files if entry['type'] not in KEEP_TYPES),
+                        key=lambda entry: entry['accessed'])
+    if max_age_days is not None:
+        cutoff = now - max_age_days * 86400
+        evict += [entry for entry in candidates if entry['accessed'] < cutoff]
+
+    evicted = {entry['path'] for entry in evict}
+    remaining = sum(entry['bytes'] for entry in files) - sum(entry['bytes'] for entry in evict)
+    if max_bytes is not None:
+        for entry in candidates:
+            if remaining <= max_bytes:
+                break
+            if entry['path'] not in evicted:
+                evict.append(entry)
+                evicted.add(entry['path'])
+                remaining -= entry['bytes']
+
+    orphans = _orphan_etags(files, evicted)
+    evict += orphans
+    remaining -= sum(entry['bytes'] for entry in orphans)
+
+    by_type = {}
+    for entry in evict:
+        total = by_type.setdefault(entry['type'], {'entries': 0, 'bytes': 0})
+        total['entries'] += 1
+        total['bytes'] += entry['bytes']
+        if not dry_run:
+            _remove_entry(disk_cache, entry)
+
+    # Every removed entry appended a tombstone, so the manifest is rewritten without them
+    if not dry_run and any(_entry_key(entry) is not None for entry in evict):
+        disk_cache.compact()
+
+    return {
+        'removed': len(evict),
+        'bytes': sum(entry['bytes'] for entry in evict),
+        'remaining_bytes': remaining,
+        'types': by_type,
+        'dry_run': dry_run
+    }
+
+
+def warm_cache(fetcher, competitions: pd.DataFrame, concurrency: int = 32, parse: bool = True,
+               aggregates: bool = False) -> Dict:
+    """Prefetch seasons' raw data with bounded concurrency, optionally also computing their season aggregates"""
+    seasons = list(zip(competitions['competition_id'], competitions['season_id']))
+    summary = BulkDownloader(fetcher, concurrency, parse).run(seasons)
+
+    # Analysts' first query then only reads the materialized aggregates
+    if aggregates and seasons:
+        fetcher.get_multi_season_stats(competitions)
+    return summary
+
+
+def _uncached_matches(fetcher, match_ids: List[int]) -> List[int]:
+    """Matches whose events or lineups are not cached and would have to be downloaded"""
+    if fetcher.source is not None:
+        return []
+
+    containers = fetcher._season_containers()
+
+    def cached(match_id):
+        if match_id in containers:
+            return True
+        events = os.path.exists(fetcher._get_event_table_path(match_id)) or \
+            os.path.exists(fetcher._get_raw_path(f"events/{match_id}.json"))
+        lineups = f"lineups_{match_id}" in fetcher.disk_cache or \
+            os.path.exists(fetcher._get_raw_path(f"lineups/{match_id}.json"))
+        return events and lineups
+
+    return [match_id for match_id in match_ids if not cached(match_id)]
+
+
+def compact_cache(fetcher, seasons: List[Tuple[int, int]] = None, keep_sources: bool = False) -> Dict:
+    """Consolidate fully cached seasons into season containers, then rewrite the disk cache manifest"""
+    seasons = seasons if seasons is not None else cached_seasons(fetcher.cache_dir)
+
+    built = []
+    skipped = []
+    for competition_id, season_id in seasons:
+        matches = fetcher.get_matches(competition_id, season_id)
+        match_ids = [] if matches.empty else [int(m) for m in matches['match_id']]
+
+        # Compaction only rearranges what is on disk; partly cached seasons are left for cache warm
+        missing = _uncached_matches(fetcher, match_ids)
+        if not match_ids or missing:
+            print(f"Skipping {competition_id}/{season_id}: {len(missing)} of {len(match_ids)} matches not cached")
+            skipped.append((competition_id, season_id))
+            continue
+
+        info = fetcher.build_season_container(competition_id, season_id, remove_sources=not keep_sources)
+        print(f"Season {competition_id}/{season_id}: {info['matches']} matches, "
+              f"{info['bytes'] / 2**20:.1f} MB, {info['removed']} per-match files removed, "
+              f"{len(info['skipped'])} matches skipped")
+        built.append(info)
+
+    return {'containers': built, 'skipped': skipped, 'manifest_entries': fetcher.disk_cache.compact()}
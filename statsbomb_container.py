@@ -0,0 +1,235 @@
+# statsbomb_container.py
+"""Per-season container files holding every match's event table and lineups behind one offset index"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from statsbomb_diskcache import atomic_write
+from statsbomb_events import EVENT_TABLE_VERSION, loads_json
+
+
+# Bumped whenever the container layout changes; containers in other versions are ignored
+CONTAINER_VERSION = 1
+
+# File header: magic, container version, offset and length of the JSON index at the end of the file
+CONTAINER_MAGIC = b'SBSC'
+CONTAINER_HEADER = struct.Struct('<4sHxxQQ')
+
+# Each match's block starts with the length of its JSON layout, followed by the layout and its data
+BLOCK_HEADER = struct.Struct('<I')
+
+# Arrays start on cache-line boundaries so they can be viewed straight from the mapping
+ALIGNMENT = 64
+
+CONTAINER_SUFFIX = '.sbs'
+
+# Everything opening a truncated, damaged or foreign container file can raise
+CONTAINER_ERRORS = (OSError, ValueError, KeyError, TypeError, struct.error)
+
+
+def _pad(size: int) -> int:
+    return -size % ALIGNMENT
+
+
+def encode_match_block(table: pd.DataFrame, lineups: List) -> bytes:
+    """Serialize one match's event table (columns as raw arrays) and lineups (as JSON)"""
+    arrays = []
+    columns = []
+    for name in table.columns:
+        column = table[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Stored like save_event_table: integer codes plus the category strings
+            values = column.cat.codes.to_numpy()
+            categories = np.asarray(column.cat.categories, dtype=str).tolist()
+        else:
+            values = column.to_numpy()
+            categories = None
+        arrays.append(np.ascontiguousarray(values))
+        columns.append([name, values.dtype.str, len(values), categories])
+
+    lineups_json = json.dumps(lineups).encode()
+
+    # Lay the arrays out first so the layout can record their offsets within the block's data
+    offset = 0
+    for column, values in zip(columns, arrays):
+        offset += _pad(offset)
+        column.append(offset)
+        offset += values.nbytes
+    layout = json.dumps({
+        'rows': len(table),
+        'columns': columns,
+        'lineups': [offset, len(lineups_json)]
+    }).encode()
+
+    head = BLOCK_HEADER.pack(len(layout)) + layout
+    parts = [head, b'\0' * _pad(len(head))]
+    written = 0
+    for column, values in zip(columns, arrays):
+        parts.append(b'\0' * (column[-1] - written))
+        parts.append(values.tobytes())
+        written = column[-1] + values.nbytes
+    parts.append(lineups_json)
+    return b''.join(parts)
+
+
+def write_season_container(path: str, competition_id: int, season_id: int,
+                           matches: Iterable[Tuple[int, pd.DataFrame, List, Optional[str], Dict[str, str]]]) -> int:
+    """Stream (match_id, event table, lineups, source fingerprint, ETags) blocks into one container file"""
+    index = []
+    with atomic_write(path) as f:
+        f.write(CONTAINER_HEADER.pack(CONTAINER_MAGIC, CONTAINER_VERSION, 0, 0))
+        f.write(b'\0' * _pad(CONTAINER_HEADER.size))
+
+        for match_id, table, lineups, source, etags in matches:
+            block = encode_match_block(table, lineups)
+            index.append([int(match_id), f.tell(), len(block), zlib.crc32(block), source, etags])
+            f.write(block)
+            f.write(b'\0' * _pad(len(block)))
+
+        index_offset = f.tell()
+        index_json = json.dumps({
+            'competition_id': int(competition_id),
+            'season_id': int(season_id),
+            'event_table_version': EVENT_TABLE_VERSION,
+            'matches': index
+        }).encode()
+        f.write(index_json)
+
+        f.seek(0)
+        f.write(CONTAINER_HEADER.pack(CONTAINER_MAGIC, CONTAINER_VERSION, index_offset, len(index_json)))
+
+    return len(index)
+
+
+class SeasonContainer:
+    """Read-only, memory-mapped view of a season container"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, index_offset, index_length = CONTAINER_HEADER.unpack_from(self._mapped)
+            if magic != CONTAINER_MAGIC or version != CONTAINER_VERSION:
+                raise ValueError(f"Unsupported container format in {path}")
+            index = json.loads(self._mapped[index_offset:index_offset + index_length])
+            if index['event_table_version'] != EVENT_TABLE_VERSION:
+                raise ValueError(f"Stale event table version in {path}")
+
+            self.competition_id = index['competition_id']
+            self.season_id = index['season_id']
+            self._matches = {}
+            self._etags = {}
+            for match_id, offset, length, crc, source, *etags in index['matches']:
+                self._matches[match_id] = (offset, length, crc, source)
+                self._etags[match_id] = etags[0] if etags else {}
+        except CONTAINER_ERRORS:
+            self._mapped.close()
+            raise
+
+    @property
+    def match_ids(self) -> List[int]:
+        return list(self._matches)
+
+    @property
+    def size(self) -> int:
+        return len(self._mapped)
+
+    def __contains__(self, match_id: int) -> bool:
+        return match_id in self._matches
+
+    def source(self, match_id: int) -> Optional[str]:
+        """Fingerprint of the per-match cache files the block was built from"""
+        return self._matches[match_id][3]
+
+    def etag(self, match_id: int, part: str) -> Optional[str]:
+        """ETag (or source version) of a match's event_table or lineups when the block was written"""
+        return self._etags[match_id].get(part)
+
+    def prefetch(self):
+        """Ask the OS to read the whole file ahead in one sequential pass"""
+        if hasattr(self._mapped, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+            self._mapped.madvise(mmap.MADV_SEQUENTIAL)
+            self._mapped.madvise(mmap.MADV_WILLNEED)
+
+    def verify(self) -> List[int]:
+        """Check every block against its checksum, returning the ids of damaged matches"""
+        damaged = []
+        for match_id, (offset, length, crc, _) in self._matches.items():
+            with memoryview(self._mapped)[offset:offset + length] as block:
+                if zlib.crc32(block) != crc:
+                    damaged.append(match_id)
+        return damaged
+
+    def _block(self, match_id: int) -> Tuple[memoryview, dict, int]:
+        """A match's verified block, its layout and where its data starts"""
+        offset, length, crc, _ = self._matches[match_id]
+        block = memoryview(self._mapped)[offset:offset + length]
+        if zlib.crc32(block) != crc:
+            block.release()
+            raise ValueError(f"Checksum mismatch for match {match_id} in {self.path}")
+
+        (layout_length,) = BLOCK_HEADER.unpack_from(block)
+        layout = json.loads(bytes(block[BLOCK_HEADER.size:BLOCK_HEADER.size + layout_length]))
+        data_start = BLOCK_HEADER.size + layout_length
+        return block, layout, data_start + _pad(data_start)
+
+    def event_table(self, match_id: int) -> pd.DataFrame:
+        """Get a match's event table, copied out of the mapping so the container can close"""
+        block, layout, data_start = self._block(match_id)
+        try:
+            columns = {}
+            for name, dtype, count, categories, offset in layout['columns']:
+                values = np.frombuffer(block, dtype=np.dtype(dtype), count=count,
+                                       offset=data_start + offset).copy()
+                if categories is not None:
+                    values = pd.Categorical.from_codes(values, np.asarray(categories, dtype=str))
+                columns[name] = values
+        finally:
+            block.release()
+        return pd.DataFrame(columns)
+
+    def lineups(self, match_id: int) -> List:
+        """Get a match's lineups"""
+        block, layout, data_start = self._block(match_id)
+        try:
+            offset, length = layout['lineups']
+            start = data_start + offset
+            return loads_json(bytes(block[start:start + length]))
+        finally:
+            block.release()
+
+    def __iter__(self) -> Iterator[Tuple[int, pd.DataFrame, List]]:
+        """Read every match in file order, a single sequential pass over the container"""
+        for match_id, _ in sorted(self._matches.items(), key=lambda item: item[1][0]):
+            yield match_id, self.event_table(match_id), self.lineups(match_id)
+
+    def close(self):
+        self._mapped.close()
+
+
+def open_containers(directory: str) -> Dict[int, SeasonContainer]:
+    """Open every readable container in a directory, keyed by the match ids each holds"""
+    containers = {}
+    if not os.path.isdir(directory):
+        return containers
+
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(CONTAINER_SUFFIX):
+            continue
+        try:
+            container = SeasonContainer(os.path.join(directory, name))
+        except CONTAINER_ERRORS as e:
+            print(f"\nIgnoring unreadable season container {name}: {type(e).__name__}: {e}")
+            continue
+        for match_id in container.match_ids:
+            containers[match_id] = container
+    return containers
@@ -0,0 +1,345 @@
+# statsbomb_diskcache.py
+"""Crash-safe disk cache: checksummed, versioned entries written atomically and tracked in a manifest"""
+
+import os
+import pickle
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows locks through msvcrt instead
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+from statsbomb_metrics import metrics
+
+
+# Bumped whenever the entry encoding changes; entries in other versions are treated as misses
+CACHE_FORMAT_VERSION = 1
+
+# Every entry starts with: magic, format version, payload length, CRC-32 of the payload
+ENTRY_MAGIC = b'SBC\x00'
+ENTRY_HEADER = struct.Struct('<4sHxxQI')
+
+# Append-only log of "key<TAB>size<TAB>crc" lines; a size of -1 marks a removed entry
+MANIFEST_NAME = 'manifest.log'
+
+# The manifest is compacted once this many lines are dead and they outnumber the live entries
+MANIFEST_COMPACT_DEAD_LINES = 10000
+
+# Missing keys look for other processes' writes at most this often (seconds); reload() forces it
+MANIFEST_REFRESH_INTERVAL = 0.5
+LOCK_NAME = '.lock'
+ENTRY_SUFFIX = '.pkl'
+
+
+# Everything np.load and its arrays raise for a truncated, damaged or foreign .npz file
+NPZ_ERRORS = (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile)
+
+
+class CacheCorruptError(ValueError):
+    """A cache file is truncated, fails its checksum or is not a cache entry at all"""
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'wb'):
+    """Write a file under a temporary name and rename it into place only once it is complete"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+
+            # Make the contents durable before the rename can make them visible
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def discard_file(path: str, reason: str):
+    """Delete a damaged cache file kept outside the DiskCache, so it is rebuilt on next use"""
+    metrics.count('disk_corrupt_entries')
+    print(f"\nDiscarding unreadable cache file {os.path.basename(path)}: {reason}")
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@contextmanager
+def file_lock(path: str):
+    """Hold an exclusive lock on a file across processes (a no-op where the OS offers none)"""
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def encode_entry(payload: bytes) -> Tuple[bytes, int]:
+    """Prefix a payload with its header, returning the header and the payload's checksum"""
+    crc = zlib.crc32(payload)
+    return ENTRY_HEADER.pack(ENTRY_MAGIC, CACHE_FORMAT_VERSION, len(payload), crc), crc
+
+
+def decode_entry(data: bytes) -> Optional[memoryview]:
+    """Check an entry's header and checksum and return its payload, or None if it is another format version"""
+    if len(data) < ENTRY_HEADER.size or data[:len(ENTRY_MAGIC)] != ENTRY_MAGIC:
+        raise CacheCorruptError("not a cache entry")
+
+    _, version, length, crc = ENTRY_HEADER.unpack_from(data)
+    if version != CACHE_FORMAT_VERSION:
+        return None
+
+    payload = memoryview(data)[ENTRY_HEADER.size:]
+    if len(payload) != length:
+        raise CacheCorruptError(f"truncated ({len(payload)} of {length} bytes)")
+    if zlib.crc32(payload) != crc:
+        raise CacheCorruptError("checksum mismatch")
+    return payload
+
+
+class DiskCache:
+    """Pickled cache entries in one directory, tracked by a manifest shared between processes"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.corrupt = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self._lock_path = os.path.join(directory, LOCK_NAME)
+        self._manifest_inode = None
+        self._manifest_offset = 0
+        self._manifest_lines = 0
+        self._manifest_stat = None
+        self._refreshed = 0.0
+
+        os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(self._manifest_path):
+            self._build_manifest()
+        self._refresh()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{ENTRY_SUFFIX}")
+
+    def _build_manifest(self):
+        """Create the manifest for a cache written before it had one; entries are verified when read"""
+        with file_lock(self._lock_path):
+            if os.path.exists(self._manifest_path):
+                return
+            lines = []
+            for name in os.listdir(self.directory):
+                if name.endswith(ENTRY_SUFFIX):
+                    size = os.path.getsize(os.path.join(self.directory, name))
+                    lines.append(f"{name[:-len(ENTRY_SUFFIX)]}\t{size}\t0\n")
+            with atomic_write(self._manifest_path, 'w') as f:
+                f.writelines(lines)
+
+    def _refresh(self):
+        """Apply manifest lines appended (by any process) since the last read"""
+        self._refreshed = time.monotonic()
+        try:
+            st = os.stat(self._manifest_path)
+        except FileNotFoundError:
+            return
+        if (st.st_ino, st.st_size, st.st_mtime_ns) == self._manifest_stat:
+            return
+
+        try:
+            with open(self._manifest_path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                self._manifest_stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+
+                # A compacted manifest is a new file, so it is read from the start
+                if st.st_ino != self._manifest_inode or st.st_size < self._manifest_offset:
+                    self._entries.clear()
+                    self._manifest_inode = st.st_ino
+                    self._manifest_offset = 0
+                    self._manifest_lines = 0
+                if st.st_size == self._manifest_offset:
+                    return
+
+                f.seek(self._manifest_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # A line still being appended is left for the next refresh
+        complete = data.rfind(b'\n') + 1
+        self._manifest_offset += complete
+        lines = data[:complete].decode(errors='replace').splitlines()
+        self._manifest_lines += len(lines)
+        for line in lines:
+            # A line torn by a crash mid-append is skipped; its entry is just fetched again
+            try:
+                key, size, crc = line.split('\t')
+                size, crc = int(size), int(crc)
+            except ValueError:
+                continue
+            if size < 0:
+                self._entries.pop(key, None)
+            else:
+                self._entries[key] = (size, crc)
+
+    def _append_manifest(self, key: str, size: int, crc: int):
+        with file_lock(self._lock_path):
+            with open(self._manifest_path, 'a+b') as f:
+                # Start a new line if a crashed append left a partial one behind
+                line = f"{key}\t{size}\t{crc}\n".encode()
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        line = b'\n' + line
+                f.write(line)
+
+    def reload(self):
+        """Pick up entries other processes wrote since the manifest was last read"""
+        with self._lock:
+            self._refresh()
+
+    def _compact_if_bloated(self):
+        """Compact the manifest once rewritten and removed entries have left it mostly dead lines"""
+        with self._lock:
+            self._refresh()
+            dead = self._manifest_lines - len(self._entries)
+            bloated = dead >= MANIFEST_COMPACT_DEAD_LINES and dead > len(self._entries)
+        if bloated:
+            self.compact()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._entries:
+                return True
+
+            # Repeated misses are answered from memory between refreshes
+            if time.monotonic() - self._refreshed >= MANIFEST_REFRESH_INTERVAL:
+                self._refresh()
+            return key in self._entries
+
+    def entries(self) -> Dict[str, Tuple[int, int]]:
+        """Map every key to its (size, crc), where a crc of 0 means not yet verified"""
+        with self._lock:
+            self._refresh()
+            return dict(self._entries)
+
+    def read(self, key: str) -> Optional[bytes]:
+        """Get a verified entry's pickled payload, or None if it is missing, stale or corrupt"""
+        if key not in self:
+            return None
+        try:
+            with open(self.path(key), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            # Removed by another process since the manifest was read
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        metrics.count('disk_read_bytes', len(data))
+
+        if not data.startswith(ENTRY_MAGIC):
+            # Plain pickles from before entries had headers are upgraded in place when intact
+            return self._upgrade_legacy(key, data)
+
+        try:
+            payload = decode_entry(data)
+        except CacheCorruptError as e:
+            self.discard(key, str(e))
+            return None
+        return payload
+
+    def _upgrade_legacy(self, key: str, data: bytes) -> Optional[bytes]:
+        try:
+            pickle.loads(data)
+        except Exception as e:
+            self.discard(key, f"unreadable legacy pickle ({type(e).__name__})")
+            return None
+        self.write(key, data)
+        return data
+
+    def get(self, key: str) -> Any:
+        """Load an entry, or None if it is missing, stale or corrupt"""
+        payload = self.read(key)
+        if payload is None:
+            return None
+        try:
+            return pickle.loads(payload)
+        except Exception as e:
+            # The checksum matched, so the pickled classes themselves changed
+            self.discard(key, f"cannot unpickle ({type(e).__name__}: {e})")
+            return None
+
+    def write(self, key: str, payload: bytes) -> int:
+        """Atomically write an already pickled payload and record it in the manifest"""
+        header, crc = encode_entry(payload)
+        with atomic_write(self.path(key)) as f:
+            f.write(header)
+            f.write(payload)
+        size = len(header) + len(payload)
+        metrics.count('disk_written_bytes', size)
+
+        self._append_manifest(key, size, crc)
+        with self._lock:
+            self._entries[key] = (size, crc)
+        self._compact_if_bloated()
+        return size
+
+    def put(self, key: str, value: Any) -> int:
+        """Pickle and atomically write an entry, returning its size on disk"""
+        return self.write(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def verify(self, key: str) -> bool:
+        """Check an entry against its header and checksum, discarding it if it is corrupt"""
+        return self.read(key) is not None
+
+    def remove(self, key: str):
+        """Delete an entry and record its removal in the manifest"""
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+        self._append_manifest(key, -1, 0)
+        with self._lock:
+            self._entries.pop(key, None)
+        self._compact_if_bloated()
+
+    def discard(self, key: str, reason: str):
+        """Remove a corrupt entry so the next read fetches it again"""
+        self.corrupt += 1
+        metrics.count('disk_corrupt_entries')
+        print(f"\nDiscarding corrupt cache entry {key}: {reason}")
+        self.remove(key)
+
+    def compact(self) -> int:
+        """Rewrite the manifest with one line per live entry, returning the number of entries"""
+        with file_lock(self._lock_path):
+            with self._lock:
+                self._refresh()
+                lines = [f"{key}\t{size}\t{crc}\n" for key, (size, crc) in self._entries.items()]
+                with atomic_write(self._manifest_path, 'w') as f:
+                    f.writelines(lines)
+                self._refresh()
+                return len(lines)
@@ -0,0 +1,320 @@
+# statsbomb_events.py
+"""Columnar event engine for StatsBomb event data"""
+
+import json
+import pandas as pd
+import numpy as np
+from typing import Dict, Iterable, List, Tuple, Union
+
+from statsbomb_metrics import metrics
+from statsbomb_diskcache import atomic_write
+
+try:
+    import orjson
+except ImportError:  # optional, several times faster than the json module
+    orjson = None
+
+
+# Sentinel used for events without a player
+MISSING_ID = -1
+
+# Bumped whenever the on-disk event table layout changes
+EVENT_TABLE_VERSION = 1
+
+# Bumped whenever the per-match stat logic changes, invalidating derived caches
+STATS_VERSION = 1
+
+# Per-player counters produced for every match, in output order
+STAT_COLUMNS = [
+    'passes', 'passes_completed', 'shots', 'shots_on_target', 'goals',
+    'assists', 'key_passes', 'dribbles', 'dribbles_completed', 'tackles',
+    'interceptions', 'clearances', 'fouls', 'cards_yellow', 'cards_red',
+    'touches', 'xg', 'xa'
+]
+
+INFO_COLUMNS = ['player_name', 'team_name', 'position', 'match_id', 'match_date', 'minutes_played']
+
+FLOAT_STATS = ['xg', 'xa']
+
+SHOTS_OFF_TARGET = ['Blocked', 'Off T', 'Wayward']
+
+# Columns flatten_events can build, each read from one path into the raw event
+EVENT_FIELDS = {
+    'type': ('type', 'name'),
+    'player_id': ('player', 'id'),
+    'player_name': ('player', 'name'),
+    'team_name': ('team', 'name'),
+    'location_x': ('location', 0),
+    'location_y': ('location', 1),
+    'pass_recipient': ('pass', 'recipient', 'name'),
+    'pass_outcome': ('pass', 'outcome', 'name'),
+    'pass_goal_assist': ('pass', 'goal_assist'),
+    'pass_shot_assist': ('pass', 'shot_assist'),
+    'shot_outcome': ('shot', 'outcome', 'name'),
+    'shot_xg': ('shot', 'statsbomb_xg'),
+    'dribble_outcome': ('dribble', 'outcome', 'name'),
+    'duel_type': ('duel', 'type', 'name'),
+    'card': ('foul_committed', 'card', 'name'),
+}
+
+
+def loads_json(data: bytes):
+    """Decode a JSON document (bytes or a memoryview), using orjson when it is installed"""
+    with metrics.timer('json_decode'):
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+def _nested(values, *keys) -> list:
+    """Walk nested dicts (or lists, for integer keys) for each value, returning None where a key is missing"""
+    out = []
+    append = out.append
+    for value in values:
+        # Most events lack most fields, so the common case skips the walk entirely
+        if value is not None:
+            try:
+                for key in keys:
+                    value = value[key]
+            except (KeyError, IndexError, TypeError):
+                value = None
+        append(value)
+    return out
+
+
+def _column(events: Union[pd.DataFrame, List[Dict]], name: str) -> list:
+    """Get one top-level field of every event as a list, or a list of None if it is absent"""
+    if isinstance(events, pd.DataFrame):
+        if name in events.columns:
+            return events[name].tolist()
+        return [None] * len(events)
+    return [event.get(name) for event in events]
+
+
+def _build_column(name: str, values: list):
+    """Convert projected values to the column's storage type"""
+    if name == 'player_id':
+        return np.array([MISSING_ID if v is None else v for v in values], dtype=np.int64)
+    if name in ('location_x', 'location_y', 'shot_xg'):
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    if name in ('pass_goal_assist', 'pass_shot_assist'):
+        return np.array([bool(v) for v in values], dtype=bool)
+    return pd.Categorical(values)
+
+
+def flatten_events(events: Union[pd.DataFrame, List[Dict]], fields: Iterable[str] = None) -> pd.DataFrame:
+    """Flatten raw event JSON into one typed column per requested field (all of EVENT_FIELDS by default)"""
+    fields = list(EVENT_FIELDS) if fields is None else [f for f in EVENT_FIELDS if f in set(fields)]
+
+    with metrics.timer('dataframe_build'):
+        # Only the top-level keys the fields read are touched, so freeze frames, tactics
+        # and related events are never walked; each key is shared by the fields under it
+        top_level = {}
+        for name in fields:
+            key = EVENT_FIELDS[name][0]
+            if key not in top_level:
+                top_level[key] = _column(events, key)
+
+        return pd.DataFrame({
+            name: _build_column(name, _nested(top_level[EVENT_FIELDS[name][0]], *EVENT_FIELDS[name][1:]))
+            for name in fields
+        }, index=pd.RangeIndex(len(events)))
+
+
+def parse_events(data: bytes, fields: Iterable[str] = None) -> pd.DataFrame:
+    """Decode an events JSON document straight into a flattened table of the requested fields"""
+    return flatten_events(loads_json(data), fields)
+
+
+def save_event_table(flat: pd.DataFrame, path: str):
+    """Write a flattened event table as a columnar .npz file"""
+    arrays = {'__version__': np.array(EVENT_TABLE_VERSION)}
+    for name in flat.columns:
+        column = flat[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Categoricals are stored as small integer codes plus a category list
+            arrays[f"{name}.codes"] = column.cat.codes.to_numpy()
+            arrays[f"{name}.categories"] = np.asarray(column.cat.categories, dtype=str)
+        else:
+            arrays[name] = column.to_numpy()
+
+    with atomic_write(path) as f:
+        np.savez(f, **arrays)
+
+
+def load_event_table(path: str) -> pd.DataFrame:
+    """Read a flattened event table written by save_event_table"""
+    with np.load(path, allow_pickle=False) as data:
+        if int(data['__version__']) != EVENT_TABLE_VERSION:
+            raise ValueError(f"Unsupported event table version in {path}")
+
+        columns = {}
+        for key in data.files:
+            if key == '__version__' or key.endswith('.categories'):
+                continue
+            if key.endswith('.codes'):
+                name = key[:-len('.codes')]
+                columns[name] = pd.Categorical.from_codes(data[key], data[f"{name}.categories"])
+            else:
+                columns[key] = data[key]
+
+    return pd.DataFrame(columns)
+
+
+def _event_counters(flat: pd.DataFrame) -> pd.DataFrame:
+    """Compute every per-event counter as a column, one row per event"""
+    event_type = flat['type']
+    is_pass = (event_type == 'Pass').to_numpy()
+    is_shot = (event_type == 'Shot').to_numpy()
+    is_dribble = (event_type == 'Dribble').to_numpy()
+    is_foul = (event_type == 'Foul Committed').to_numpy()
+
+    goal_assist = flat['pass_goal_assist'].to_numpy()
+    shot_outcome = flat['shot_outcome']
+    card = flat['card']
+
+    return pd.DataFrame({
+        'passes': is_pass,
+        'passes_completed': is_pass & (flat['pass_outcome'] != 'Incomplete').to_numpy(),
+        'shots': is_shot,
+        'shots_on_target': is_shot & ~shot_outcome.isin(SHOTS_OFF_TARGET).to_numpy(),
+        'goals': is_shot & (shot_outcome == 'Goal').to_numpy(),
+        'assists': is_pass & goal_assist,
+        'key_passes': is_pass & ~goal_assist & flat['pass_shot_assist'].to_numpy(),
+        'dribbles': is_dribble,
+        'dribbles_completed': is_dribble & (flat['dribble_outcome'] == 'Complete').to_numpy(),
+        'tackles': (event_type.isin(['Tackle', 'Duel']) & (flat['duel_type'] == 'Tackle')).to_numpy(),
+        'interceptions': (event_type == 'Interception').to_numpy(),
+        'clearances': (event_type == 'Clearance').to_numpy(),
+        'fouls': is_foul,
+        'cards_yellow': is_foul & (card == 'Yellow Card').to_numpy(),
+        'cards_red': is_foul & (card == 'Red Card').to_numpy(),
+        'touches': np.ones(len(flat), dtype=bool),
+        'xg': np.where(is_shot, np.nan_to_num(flat['shot_xg'].to_numpy()), 0.0),
+        'xa': np.zeros(len(flat)),
+    }, index=flat.index)
+
+
+def calculate_player_match_stats(flat: pd.DataFrame, lineups: List, match_info: dict) -> pd.DataFrame:
+    """Calculate per-player match statistics from flattened events"""
+    roster = {}
+
+    # Lineup players are assumed to play the full match
+    for team in lineups:
+        for player in team.get('lineup', []):
+            roster[player['player_id']] = (
+                player['player_name'],
+                team['team_name'],
+                player['positions'][0]['position'] if player['positions'] else 'Unknown',
+                90
+            )
+
+    events = flat[flat['player_id'] != MISSING_ID]
+
+    # Players missing from the lineups are assumed to be subs
+    first_seen = events.drop_duplicates('player_id')
+    for player_id, player_name, team_name in zip(first_seen['player_id'], first_seen['player_name'],
+                                                 first_seen['team_name']):
+        if player_id not in roster:
+            roster[player_id] = (player_name, team_name if not pd.isna(team_name) else 'Unknown', 'Unknown', 45)
+
+    if not roster:
+        return pd.DataFrame()
+
+    counters = _event_counters(events).groupby(events['player_id'].to_numpy(), sort=False).sum()
+    counters = counters.reindex(list(roster.keys()), fill_value=0)
+
+    names, teams, positions, minutes = zip(*roster.values())
+    stats = pd.DataFrame({
+        'player_name': list(names),
+        'team_name': list(teams),
+        'position': list(positions),
+        'match_id': match_info['match_id'],
+        'match_date': match_info['match_date'],
+        'minutes_played': np.array(minutes, dtype=np.int64),
+    }, index=list(roster.keys()))
+
+    for column in STAT_COLUMNS:
+        values = counters[column].to_numpy()
+        stats[column] = values.astype(np.float64 if column in FLOAT_STATS else np.int64)
+
+    return stats
+
+
+def pack_match_stats(stats: pd.DataFrame) -> Tuple:
+    """Reduce a match stats frame to plain arrays for cheap transfer between processes"""
+    int_stats = [c for c in STAT_COLUMNS if c not in FLOAT_STATS]
+    return (
+        stats.index.to_numpy(dtype=np.int64),
+        stats['player_name'].tolist(),
+        stats['team_name'].tolist(),
+        stats['position'].tolist(),
+        stats['match_id'].iloc[0],
+        stats['match_date'].iloc[0],
+        stats['minutes_played'].to_numpy(dtype=np.int64),
+        stats[int_stats].to_numpy(dtype=np.int64),
+        stats[FLOAT_STATS].to_numpy(dtype=np.float64)
+    )
+
+
+def unpack_match_stats(packed: Tuple) -> pd.DataFrame:
+    """Rebuild a match stats frame from pack_match_stats output"""
+    index, names, teams, positions, match_id, match_date, minutes, int_values, float_values = packed
+    int_stats = [c for c in STAT_COLUMNS if c not in FLOAT_STATS]
+
+    stats = pd.DataFrame({
+        'player_name': names,
+        'team_name': teams,
+        'position': positions,
+        'match_id': match_id,
+        'match_date': match_date,
+        'minutes_played': minutes,
+    }, index=index)
+    stats[int_stats] = int_values
+    stats[FLOAT_STATS] = float_values
+
+    return stats[INFO_COLUMNS + STAT_COLUMNS]
+
+
+def save_match_stats(stats: pd.DataFrame, path: str, source: str):
+    """Write a match stats frame and the fingerprint of the data it was derived from"""
+    index, names, teams, positions, match_id, match_date, minutes, int_values, float_values = \
+        pack_match_stats(stats)
+
+    with atomic_write(path) as f:
+        np.savez(
+            f,
+            __version__=np.array(STATS_VERSION),
+            source=np.array(source),
+            index=index,
+            player_name=np.asarray(names, dtype=str),
+            team_name=np.asarray(teams, dtype=str),
+            position=np.asarray(positions, dtype=str),
+            match_id=np.array(match_id),
+            match_date=np.array(str(match_date)),
+            minutes_played=minutes,
+            int_stats=int_values,
+            float_stats=float_values
+        )
+
+
+def load_match_stats(path: str) -> Tuple[pd.DataFrame, str]:
+    """Read a match stats frame written by save_match_stats along with its source fingerprint"""
+    with np.load(path, allow_pickle=False) as data:
+        if int(data['__version__']) != STATS_VERSION:
+            raise ValueError(f"Stale stats version in {path}")
+
+        packed = (
+            data['index'],
+            data['player_name'].tolist(),
+            data['team_name'].tolist(),
+            data['position'].tolist(),
+            data['match_id'].item(),
+            data['match_date'].item(),
+            data['minutes_played'],
+            data['int_stats'],
+            data['float_stats']
+        )
+        source = data['source'].item()
+
+    return unpack_match_stats(packed), source
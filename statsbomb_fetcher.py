@@ -2,134 +2,538 @@
 """Threaded StatsBomb data fetcher for fast performance"""
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import json
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
 import concurrent.futures
+import inspect
 from threading import Lock
 import time
 import os
 import pickle
 
+from statsbomb_events import (flatten_events, parse_events, loads_json, calculate_player_match_stats,
+                              save_event_table, load_event_table,
+                              pack_match_stats, unpack_match_stats,
+                              save_match_stats, load_match_stats)
+from statsbomb_aggregate import SeasonAggregate, player_name_mask
+from statsbomb_memcache import MemoryCache
+from statsbomb_diskcache import DiskCache, NPZ_ERRORS, atomic_write, discard_file
+from statsbomb_container import SeasonContainer, write_season_container, open_containers, CONTAINER_SUFFIX
+from statsbomb_metrics import metrics
+from statsbomb_index import PlayerIndex
+from statsbomb_prefetch import BulkDownloader
+from statsbomb_sources import DataSource, open_source, is_url
+
+
+DEFAULT_BASE_URL = "https://raw.githubusercontent.com/statsbomb/open-data/master/data"
+
+# Status codes worth retrying with exponential backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Executor backends for per-match stat computation
+BACKENDS = ('threads', 'processes', 'serial')
+
+# Matches folded into a season aggregate at a time while streaming results
+FOLD_BATCH = 16
+
+# Fetcher owned by each worker process of the 'processes' backend
+_worker_fetcher = None
+
+# Workers compute each match once and hand it back, so they keep nothing in memory
+WORKER_MEMORY_CACHE_BYTES = 0
+
+# With revalidate=True each cached document is checked upstream at most this often
+REVALIDATE_INTERVAL = 60
+
+# Per-match cache entries a season container holds, named like their cache keys
+CONTAINER_PARTS = ('event_table', 'lineups')
+
+# Process-wide fetchers handed out by get_shared_fetcher, keyed by cache directory and source,
+# each with the full constructor configuration it was created with
+_shared_fetchers = {}
+_shared_configs = {}
+_shared_lock = Lock()
+
+
+def _init_worker(config: Dict):
+    """Create the fetcher a worker process reads the disk cache through"""
+    global _worker_fetcher
+    _worker_fetcher = StatsBombFetcher(max_workers=1, memory_cache_bytes=WORKER_MEMORY_CACHE_BYTES, **config)
+
+
+def _iter_bounded(executor: concurrent.futures.Executor, fn, items: List, max_pending: int):
+    """Yield fn(item) results as they complete, keeping at most max_pending tasks submitted"""
+    items = iter(items)
+    pending = set()
+    for item in items:
+        pending.add(executor.submit(fn, item))
+        if len(pending) >= max_pending:
+            break
+    
+    # Finished futures are dropped once yielded, so results never pile up
+    while pending:
+        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        for item in items:
+            pending.add(executor.submit(fn, item))
+            if len(pending) >= max_pending:
+                break
+        for future in done:
+            yield future.result()
+
+
+def _process_match_stats(match_info: dict):
+    """Compute one match's player stats in a worker process, returning packed arrays"""
+    player_stats = _worker_fetcher._fetch_single_match_data(match_info)
+    if player_stats is None or player_stats.empty:
+        return None
+    return pack_match_stats(player_stats)
+
 
 class StatsBombFetcher:
     """Fetches and processes data from StatsBomb's open data repository with threading"""
     
-    def __init__(self, max_workers: int = 10, cache_dir: str = "statsbomb_cache"):
-        self.base_url = "https://raw.githubusercontent.com/statsbomb/open-data/master/data"
-        self._memory_cache = {}
-        self._cache_lock = Lock()
+    def __init__(self, max_workers: int = 10, cache_dir: str = "statsbomb_cache",
+                 base_url: str = DEFAULT_BASE_URL, timeout: Tuple[float, float] = (5, 60),
+                 max_retries: int = 5, backoff_factor: float = 0.5, revalidate: bool = False,
+                 backend: str = 'threads', memory_cache_bytes: int = 1 << 30,
+                 memory_budgets: Dict[str, int] = None, source: Union[str, DataSource] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        
+        # A URL source just replaces base_url; a directory or archive is read locally instead of over HTTP
+        if isinstance(source, str):
+            if is_url(source):
+                base_url, source = source, None
+            else:
+                source = open_source(source, scratch_dir=cache_dir)
+        self.source = source
+        
+        self.base_url = base_url.rstrip('/')
+        self._memory_cache = MemoryCache(memory_cache_bytes, memory_budgets)
         self.max_workers = max_workers
         self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.revalidate = revalidate
+        self.backend = backend
+        self._retry_config = {'max_retries': max_retries, 'backoff_factor': backoff_factor}
+        self.session = self._create_session(max_retries, backoff_factor)
+        self.player_index = PlayerIndex(os.path.join(cache_dir, 'player_index.json'))
         
         # Create cache directory if it doesn't exist
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
+        self.disk_cache = DiskCache(cache_dir)
+        self._containers = None
+        self._containers_lock = Lock()
+        self._revalidated = {}
+        self._revalidated_lock = Lock()
+    
+    def _create_session(self, max_retries: int, backoff_factor: float) -> requests.Session:
+        """Create a keep-alive session whose connection pool is sized to the worker count"""
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers, max_retries=retry)
+        
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def close(self):
+        """Close pooled HTTP connections and any local data source"""
+        self.session.close()
+        if self.source is not None:
+            self.source.close()
+    
+    def cache_stats(self) -> Dict:
+        """Get in-memory cache sizes, hit counters and evictions"""
+        return self._memory_cache.stats()
+    
+    def prefetch_season(self, competition_id: int, season_id: int, max_in_flight: int = 32,
+                        parse: bool = True) -> Dict:
+        """Download a season's matches, events and lineups concurrently into the cache"""
+        return BulkDownloader(self, max_in_flight, parse).run([(competition_id, season_id)])
+    
+    def prefetch_all(self, max_in_flight: int = 32, parse: bool = True) -> Dict:
+        """Download every competition and season in open-data into the cache"""
+        competitions = self.get_competitions()
+        seasons = list(zip(competitions['competition_id'], competitions['season_id']))
+        return BulkDownloader(self, max_in_flight, parse).run(seasons)
+    
+    def build_season_container(self, competition_id: int, season_id: int, remove_sources: bool = False) -> Dict:
+        """Consolidate a season's event tables and lineups into one memory-mappable container file"""
+        matches = self.get_matches(competition_id, season_id)
+        match_ids = [] if matches.empty else [int(m) for m in matches['match_id']]
+        path = self._get_container_path(competition_id, season_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        def load(match_id):
+            # A failing match is reported and left out rather than failing the whole season
+            try:
+                table = self.get_match_event_table(match_id)
+                lineups = self.get_lineups(match_id)
+                etags = {part: self._read_etag(f"{part}_{match_id}") for part in CONTAINER_PARTS}
+                return match_id, table, lineups, self._get_source_fingerprint(match_id), etags, None
+            except Exception as e:
+                return match_id, None, None, None, None, e
+        
+        # Only complete, fingerprinted matches go in; the rest stay per-match and are retried later
+        written_ids = set()
+        skipped = {}
+        
+        def complete(results):
+            for match_id, table, lineups, fingerprint, etags, error in results:
+                if error is not None:
+                    skipped[match_id] = f"error: {error}"
+                elif table.empty:
+                    skipped[match_id] = 'no events'
+                elif not lineups:
+                    skipped[match_id] = 'no lineups'
+                elif fingerprint is None:
+                    skipped[match_id] = 'not cached'
+                else:
+                    written_ids.add(match_id)
+                    yield match_id, table, lineups, fingerprint, {k: v for k, v in etags.items() if v}
+                    continue
+                print(f"\nSkipping match {match_id} in season container: {skipped[match_id]}")
+        
+        # Matches load concurrently and are streamed into the file as they finish
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = _iter_bounded(executor, load, match_ids, 2 * self.max_workers)
+            written = write_season_container(path, competition_id, season_id, complete(results))
+        
+        # Later lookups see the new container; readers of the old one keep their own mapping
+        with self._containers_lock:
+            self._containers = None
+        containers = self._season_containers()
+        
+        # The container now serves these matches (and holds their ETags), so their per-match files
+        # are only taking space
+        removed = 0
+        if remove_sources:
+            for match_id in (m for m in written_ids if m in containers):
+                try:
+                    os.remove(self._get_event_table_path(match_id))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                if f"lineups_{match_id}" in self.disk_cache:
+                    self.disk_cache.remove(f"lineups_{match_id}")
+                for part in CONTAINER_PARTS:
+                    try:
+                        os.remove(self._get_etag_path(f"{part}_{match_id}"))
+                    except FileNotFoundError:
+                        pass
+        
+        return {'path': path, 'matches': written, 'bytes': os.path.getsize(path), 'removed': removed,
+                'skipped': skipped}
     
     def _get_cache_path(self, cache_key: str) -> str:
         """Get file path for cache"""
-        return os.path.join(self.cache_dir, f"{cache_key}.pkl")
+        return self.disk_cache.path(cache_key)
+    
+    def _get_etag_path(self, cache_key: str) -> str:
+        """Get file path for the ETag of a cached entry"""
+        return os.path.join(self.cache_dir, f"{cache_key}.etag")
+    
+    def _read_etag(self, cache_key: str) -> Optional[str]:
+        """Get the stored ETag of a cached entry, falling back to the season container that holds it"""
+        try:
+            with open(self._get_etag_path(cache_key)) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            pass
+        part, _, match_id = cache_key.rpartition('_')
+        if part in CONTAINER_PARTS and match_id.isdigit():
+            container = self._season_containers().get(int(match_id))
+            if container is not None:
+                return container.etag(int(match_id), part)
+        return None
     
     def _load_from_disk_cache(self, cache_key: str):
         """Load data from disk cache if available"""
-        cache_path = self._get_cache_path(cache_key)
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, 'rb') as f:
-                    return pickle.load(f)
-            except:
-                pass
-        return None
+        # The manifest answers for missing keys, and damaged entries are discarded rather than returned
+        with metrics.timer('disk_load'):
+            data = self.disk_cache.get(cache_key)
+        metrics.hit('disk', data is not None)
+        return data
     
     def _save_to_disk_cache(self, cache_key: str, data):
         """Save data to disk cache"""
-        cache_path = self._get_cache_path(cache_key)
         try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(data, f)
-        except:
-            pass
+            with metrics.timer('disk_save'):
+                self.disk_cache.put(cache_key, data)
+        except (OSError, pickle.PicklingError) as e:
+            # The data is still served from memory; only the next run has to fetch it again
+            print(f"\nCould not cache {cache_key}: {e}")
     
-    def get_competitions(self) -> pd.DataFrame:
-        """Get all available competitions"""
-        cache_key = 'competitions'
+    def _get_container_path(self, competition_id: int, season_id: int) -> str:
+        """Get file path for a season's consolidated container"""
+        return os.path.join(self.cache_dir, 'seasons', f"season_{competition_id}_{season_id}{CONTAINER_SUFFIX}")
+    
+    def _season_containers(self) -> Dict[int, SeasonContainer]:
+        """Open the cache's season containers on first use, keyed by the match ids they hold"""
+        with self._containers_lock:
+            if self._containers is None:
+                self._containers = open_containers(os.path.join(self.cache_dir, 'seasons'))
+            return self._containers
+    
+    def _load_from_container(self, match_id: int, part: str):
+        """Load a match's event_table or lineups from its season container, if one holds it"""
+        container = self._season_containers().get(match_id)
+        if container is None:
+            return None
+        try:
+            with metrics.timer('disk_load'):
+                data = getattr(container, part)(match_id)
+        except (ValueError, KeyError) as e:
+            print(f"\nSkipping damaged container entry for match {match_id}: {e}")
+            data = None
+        metrics.hit('container', data is not None)
+        return data
+    
+    def _get_raw_path(self, path: str) -> str:
+        """Get file path for a raw JSON document downloaded by the bulk prefetcher"""
+        return os.path.join(self.cache_dir, 'raw', *path.split('/'))
+    
+    def _fetch_json(self, path: str, cache_key: str, revalidate: bool = False, decode=loads_json):
+        """Fetch a JSON document and decode its bytes, returning None if a revalidated cached copy is still current"""
+        # Prefer raw JSON already downloaded by prefetch_season/prefetch_all
+        raw_path = self._get_raw_path(path)
+        if not revalidate and os.path.exists(raw_path):
+            try:
+                with metrics.timer('raw_read'), open(raw_path, 'rb') as f:
+                    data = f.read()
+                metrics.count('raw_read_bytes', len(data))
+                metrics.hit('raw', True)
+                return decode(data)
+            except (OSError, ValueError):
+                pass
+        if not revalidate:
+            metrics.hit('raw', False)
         
-        # Check memory cache
-        if cache_key in self._memory_cache:
-            return self._memory_cache[cache_key]
+        if self.source is not None:
+            return self._read_source(path, cache_key, revalidate, decode)
         
-        # Check disk cache
-        cached_data = self._load_from_disk_cache(cache_key)
-        if cached_data is not None:
-            self._memory_cache[cache_key] = cached_data
-            return cached_data
+        headers = {}
+        etag_path = self._get_etag_path(cache_key)
         
-        # Fetch from API
-        response = requests.get(f"{self.base_url}/competitions.json")
-        response.raise_for_status()
+        # Send the stored ETag so unchanged data transfers nothing
+        etag = self._read_etag(cache_key) if revalidate else None
+        if etag:
+            headers['If-None-Match'] = etag
         
-        competitions = pd.DataFrame(response.json())
+        with metrics.timer('http_fetch'):
+            response = self.session.get(f"{self.base_url}/{path}", headers=headers, timeout=self.timeout)
+        metrics.count('http_requests')
+        if response.status_code == 304:
+            metrics.count('http_not_modified')
+            return None
+        response.raise_for_status()
+        metrics.count('http_bytes', len(response.content))
         
-        # Cache the data
-        self._memory_cache[cache_key] = competitions
-        self._save_to_disk_cache(cache_key, competitions)
+        etag = response.headers.get('ETag')
+        if etag:
+            try:
+                with atomic_write(etag_path, 'w') as f:
+                    f.write(etag)
+            except OSError:
+                pass
         
-        return competitions
+        return decode(response.content)
     
-    def get_matches(self, competition_id: int, season_id: int) -> pd.DataFrame:
-        """Get all matches for a specific competition and season"""
-        cache_key = f"matches_{competition_id}_{season_id}"
+    def _read_source(self, path: str, cache_key: str, revalidate: bool, decode):
+        """Decode a document from the local data source, returning None if a revalidated cached copy is still current"""
+        etag_path = self._get_etag_path(cache_key)
+        version = self.source.version(path)
         
-        # Check memory cache
-        if cache_key in self._memory_cache:
-            return self._memory_cache[cache_key]
+        # The source's version token plays the part of an ETag
+        if revalidate and version is not None and self._read_etag(cache_key) == version:
+            return None
         
-        # Check disk cache
-        cached_data = self._load_from_disk_cache(cache_key)
-        if cached_data is not None:
-            self._memory_cache[cache_key] = cached_data
-            return cached_data
+        data = self.source.read(path, decode)
+        metrics.count('source_reads')
         
-        # Fetch from API
-        url = f"{self.base_url}/matches/{competition_id}/{season_id}.json"
-        response = requests.get(url)
-        response.raise_for_status()
+        if version is not None:
+            try:
+                with atomic_write(etag_path, 'w') as f:
+                    f.write(version)
+            except OSError:
+                pass
         
-        matches = pd.DataFrame(response.json())
+        return data
+    
+    def _revalidate(self, path: str, cache_key: str, decode=loads_json):
+        """Return fresh data if a disk-cached entry changed upstream, otherwise None"""
+        if not self.revalidate:
+            return None
         
-        # Cache the data
-        self._memory_cache[cache_key] = matches
-        self._save_to_disk_cache(cache_key, matches)
+        # A document just checked (e.g. before its derived stats were trusted) is not asked about again
+        with self._revalidated_lock:
+            now = time.monotonic()
+            if now - self._revalidated.get(cache_key, -REVALIDATE_INTERVAL) < REVALIDATE_INTERVAL:
+                return None
+            self._revalidated[cache_key] = now
+        try:
+            return self._fetch_json(path, cache_key, revalidate=True, decode=decode)
+        except (requests.RequestException, OSError):
+            # Keep serving the cached copy when the source is unreachable
+            return None
+    
+    def get_competitions(self) -> pd.DataFrame:
+        """Get all available competitions"""
+        cache_key = 'competitions'
+        path = "competitions.json"
         
-        return matches
+        # Check memory cache, waiting for any load of this key already in flight
+        with self._memory_cache.loading(cache_key) as cached:
+            if cached is not None:
+                return cached
+            
+            # Check disk cache
+            cached_data = self._load_from_disk_cache(cache_key)
+            if cached_data is not None:
+                data = self._revalidate(path, cache_key)
+                if data is None:
+                    self._memory_cache[cache_key] = cached_data
+                    return cached_data
+            else:
+                # Fetch from API
+                data = self._fetch_json(path, cache_key)
+            
+            with metrics.timer('dataframe_build'):
+                competitions = pd.DataFrame(data)
+            
+            # Cache the data
+            self._memory_cache[cache_key] = competitions
+            self._save_to_disk_cache(cache_key, competitions)
+            
+            return competitions
+    
+    def get_matches(self, competition_id: int, season_id: int) -> pd.DataFrame:
+        """Get all matches for a specific competition and season"""
+        cache_key = f"matches_{competition_id}_{season_id}"
+        path = f"matches/{competition_id}/{season_id}.json"
+        
+        # Check memory cache, waiting for any load of this key already in flight
+        with self._memory_cache.loading(cache_key) as cached:
+            if cached is not None:
+                return cached
+            
+            # Check disk cache
+            cached_data = self._load_from_disk_cache(cache_key)
+            if cached_data is not None:
+                data = self._revalidate(path, cache_key)
+                if data is None:
+                    self._memory_cache[cache_key] = cached_data
+                    return cached_data
+            else:
+                # Fetch from API
+                data = self._fetch_json(path, cache_key)
+            
+            with metrics.timer('dataframe_build'):
+                matches = pd.DataFrame(data)
+            
+            # Cache the data
+            self._memory_cache[cache_key] = matches
+            self._save_to_disk_cache(cache_key, matches)
+            
+            return matches
     
     def get_match_events(self, match_id: int) -> pd.DataFrame:
         """Get all events from a specific match"""
         cache_key = f"events_{match_id}"
+        path = f"events/{match_id}.json"
         
-        # Check memory cache
-        if cache_key in self._memory_cache:
-            return self._memory_cache[cache_key]
-        
-        # Check disk cache
-        cached_data = self._load_from_disk_cache(cache_key)
-        if cached_data is not None:
-            self._memory_cache[cache_key] = cached_data
-            return cached_data
-        
-        # Fetch from API
-        url = f"{self.base_url}/events/{match_id}.json"
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        events = pd.DataFrame(response.json())
-        
-        # Cache the data
-        self._memory_cache[cache_key] = events
-        self._save_to_disk_cache(cache_key, events)
+        # Check memory cache, waiting for any load of this key already in flight
+        with self._memory_cache.loading(cache_key) as cached:
+            if cached is not None:
+                return cached
+            
+            # Check disk cache
+            cached_data = self._load_from_disk_cache(cache_key)
+            if cached_data is not None:
+                data = self._revalidate(path, cache_key)
+                if data is None:
+                    self._memory_cache[cache_key] = cached_data
+                    return cached_data
+            else:
+                # Fetch from API
+                data = self._fetch_json(path, cache_key)
+            
+            with metrics.timer('dataframe_build'):
+                events = pd.DataFrame(data)
+            
+            # Cache the data
+            self._memory_cache[cache_key] = events
+            self._save_to_disk_cache(cache_key, events)
+            
+            return events
+    
+    def _get_event_table_path(self, match_id: int) -> str:
+        """Get file path for a match's columnar event table"""
+        return os.path.join(self.cache_dir, f"events_{match_id}.npz")
+    
+    def get_match_event_table(self, match_id: int) -> pd.DataFrame:
+        """Get a match's events as a flattened, categorical-encoded table"""
+        cache_key = f"event_table_{match_id}"
+        path = f"events/{match_id}.json"
         
-        return events
+        # Check memory cache, waiting for any load of this key already in flight
+        with self._memory_cache.loading(cache_key) as cached:
+            if cached is not None:
+                return cached
+            
+            # Check disk cache; a per-match table is newer than any season container holding the match
+            fresh_table = None
+            table = None
+            table_path = self._get_event_table_path(match_id)
+            if os.path.exists(table_path):
+                try:
+                    with metrics.timer('disk_load'):
+                        table = load_event_table(table_path)
+                except NPZ_ERRORS as e:
+                    discard_file(table_path, f"{type(e).__name__}: {e}")
+                    table = None
+            if table is None:
+                table = self._load_from_container(match_id, 'event_table')
+            if table is not None:
+                fresh_table = self._revalidate(path, cache_key, parse_events)
+                if fresh_table is None:
+                    metrics.hit('event_table', True)
+                    self._memory_cache[cache_key] = table
+                    return table
+            
+            metrics.hit('event_table', False)
+            
+            # Flatten raw events already in memory, otherwise decode only the needed fields
+            raw_events = self._memory_cache.peek(f"events_{match_id}")
+            if fresh_table is not None:
+                table = fresh_table
+            elif raw_events is not None:
+                table = flatten_events(raw_events)
+            else:
+                table = self._fetch_json(path, cache_key, decode=parse_events)
+            
+            # Cache the data
+            self._memory_cache[cache_key] = table
+            try:
+                with metrics.timer('disk_save'):
+                    save_event_table(table, table_path)
+            except OSError:
+                pass
+            
+            return table
     
     def _fetch_single_match_events(self, match_id: int) -> Tuple[int, pd.DataFrame]:
         """Fetch events for a single match (used by thread pool)"""
@@ -140,21 +544,125 @@ class StatsBombFetcher:
             print(f"\nError fetching match {match_id}: {e}")
             return match_id, pd.DataFrame()
     
+    def _get_match_stats_path(self, match_id: int) -> str:
+        """Get file path for a match's derived player stats"""
+        return os.path.join(self.cache_dir, f"stats_{match_id}.npz")
+    
+    def _get_source_fingerprint(self, match_id: int) -> Optional[str]:
+        """Fingerprint the cached events and lineups a match's stats are derived from"""
+        parts = []
+        for path in (self._get_event_table_path(match_id), self._get_cache_path(f"lineups_{match_id}")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            parts.append(f"{st.st_mtime_ns}:{st.st_size}")
+        if len(parts) == 2:
+            return '|'.join(parts)
+        
+        # Matches compacted into a season container keep the fingerprint of the files they replaced
+        container = self._season_containers().get(match_id)
+        if not parts and container is not None:
+            return container.source(match_id)
+        return None
+    
+    def _revalidate_match(self, match_id: int):
+        """Refresh a match's cached events and lineups if they changed upstream, so derived tiers can be trusted"""
+        if not self.revalidate:
+            return
+        
+        table_path = self._get_event_table_path(match_id)
+        lineups_key = f"lineups_{match_id}"
+        container = self._season_containers().get(match_id)
+        
+        changed = False
+        if container is not None or os.path.exists(table_path):
+            table = self._revalidate(f"events/{match_id}.json", f"event_table_{match_id}", parse_events)
+            if table is not None:
+                changed = True
+                self._memory_cache[f"event_table_{match_id}"] = table
+                try:
+                    save_event_table(table, table_path)
+                except OSError:
+                    pass
+        if container is not None or lineups_key in self.disk_cache:
+            lineups = self._revalidate(f"lineups/{match_id}.json", lineups_key)
+            if lineups is not None:
+                changed = True
+                self._memory_cache[lineups_key] = lineups
+                self._save_to_disk_cache(lineups_key, lineups)
+        
+        # A changed half of a compacted match moves out of its container, so the other half follows it
+        # and the match is fingerprinted from its per-match files again
+        if changed and container is not None:
+            if not os.path.exists(table_path):
+                table = self._load_from_container(match_id, 'event_table')
+                if table is not None:
+                    try:
+                        save_event_table(table, table_path)
+                    except OSError:
+                        pass
+            if lineups_key not in self.disk_cache:
+                lineups = self._load_from_container(match_id, 'lineups')
+                if lineups is not None:
+                    self._save_to_disk_cache(lineups_key, lineups)
+    
+    def _revalidate_matches(self, match_ids: List[int]):
+        """Revalidate many matches concurrently before their cached stats or aggregates are reused"""
+        if not self.revalidate or not match_ids:
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(self._revalidate_match, match_ids))
+    
+    def _get_match_stats(self, match_info: dict) -> Optional[pd.DataFrame]:
+        """Get a match's player stats from the derived cache, computing them on a miss"""
+        match_id = match_info['match_id']
+        stats_path = self._get_match_stats_path(match_id)
+        
+        # Upstream changes must reach the events and lineups before their fingerprint is compared
+        self._revalidate_match(match_id)
+        
+        # Check derived cache, which is only valid for unchanged source data
+        if os.path.exists(stats_path):
+            try:
+                with metrics.timer('disk_load'):
+                    player_stats, source = load_match_stats(stats_path)
+            except NPZ_ERRORS as e:
+                discard_file(stats_path, f"{type(e).__name__}: {e}")
+                player_stats, source = None, None
+            if player_stats is not None and source == self._get_source_fingerprint(match_id):
+                metrics.hit('match_stats', True)
+                player_stats['match_date'] = match_info['match_date']
+                return player_stats
+        metrics.hit('match_stats', False)
+        
+        events = self.get_match_event_table(match_id)
+        
+        if events.empty:
+            return None
+        
+        # Get lineups
+        lineups = self.get_lineups(match_id)
+        
+        # Calculate player stats
+        with metrics.timer('stat_computation'):
+            player_stats = calculate_player_match_stats(events, lineups, match_info)
+        
+        # Only cache stats derived from data that is itself cached on disk
+        source = self._get_source_fingerprint(match_id)
+        if source is not None and not player_stats.empty:
+            try:
+                with metrics.timer('disk_save'):
+                    save_match_stats(player_stats, stats_path, source)
+            except OSError:
+                pass
+        
+        return player_stats
+    
     def _fetch_single_match_data(self, match_info: dict) -> Optional[pd.DataFrame]:
         """Fetch and process a single match's player stats"""
         try:
-            match_id = match_info['match_id']
-            events = self.get_match_events(match_id)
-            
-            if events.empty:
-                return None
-            
-            # Get lineups
-            lineups = self.get_lineups(match_id)
-            
-            # Calculate player stats
-            player_stats = self._calculate_player_match_stats(events, lineups, match_info)
-            return player_stats
+            return self._get_match_stats(match_info)
             
         except Exception as e:
             print(f"\nError processing match {match_info['match_id']}: {e}")
@@ -163,252 +671,309 @@ class StatsBombFetcher:
     def get_lineups(self, match_id: int) -> Dict:
         """Get lineups for a specific match"""
         cache_key = f"lineups_{match_id}"
+        path = f"lineups/{match_id}.json"
         
-        # Check memory cache
-        if cache_key in self._memory_cache:
-            return self._memory_cache[cache_key]
-        
-        # Check disk cache
-        cached_data = self._load_from_disk_cache(cache_key)
-        if cached_data is not None:
-            self._memory_cache[cache_key] = cached_data
-            return cached_data
-        
-        # Fetch from API
-        url = f"{self.base_url}/lineups/{match_id}.json"
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            lineups = response.json()
-            
-            # Cache the data
-            self._memory_cache[cache_key] = lineups
-            self._save_to_disk_cache(cache_key, lineups)
+        # Check memory cache, waiting for any load of this key already in flight
+        with self._memory_cache.loading(cache_key) as cached:
+            if cached is not None:
+                return cached
             
-            return lineups
-        except:
-            return []
+            # Check disk cache, then any season container holding the match
+            cached_data = self._load_from_disk_cache(cache_key)
+            if cached_data is None:
+                cached_data = self._load_from_container(match_id, 'lineups')
+            try:
+                if cached_data is not None:
+                    lineups = self._revalidate(path, cache_key)
+                    if lineups is None:
+                        self._memory_cache[cache_key] = cached_data
+                        return cached_data
+                else:
+                    # Fetch from API
+                    lineups = self._fetch_json(path, cache_key)
+                
+                # Cache the data
+                self._memory_cache[cache_key] = lineups
+                self._save_to_disk_cache(cache_key, lineups)
+                
+                return lineups
+            except (requests.RequestException, OSError, ValueError) as e:
+                print(f"\nError fetching lineups for match {match_id}: {e}")
+                return cached_data if cached_data is not None else []
     
     def _calculate_player_match_stats(self, events: pd.DataFrame, lineups: List, match_info: dict) -> pd.DataFrame:
         """Calculate player statistics from match events"""
-        player_stats = {}
-        
-        # Initialize stats for all players in lineups
-        for team in lineups:
-            for player in team.get('lineup', []):
-                player_id = player['player_id']
-                player_stats[player_id] = {
-                    'player_name': player['player_name'],
-                    'team_name': team['team_name'],
-                    'position': player['positions'][0]['position'] if player['positions'] else 'Unknown',
-                    'match_id': match_info['match_id'],
-                    'match_date': match_info['match_date'],
-                    'minutes_played': 90,  # Default, will adjust for subs
-                    'passes': 0,
-                    'passes_completed': 0,
-                    'shots': 0,
-                    'shots_on_target': 0,
-                    'goals': 0,
-                    'assists': 0,
-                    'key_passes': 0,
-                    'dribbles': 0,
-                    'dribbles_completed': 0,
-                    'tackles': 0,
-                    'interceptions': 0,
-                    'clearances': 0,
-                    'fouls': 0,
-                    'cards_yellow': 0,
-                    'cards_red': 0,
-                    'touches': 0,
-                    'xg': 0.0,
-                    'xa': 0.0
-                }
-        
-        # Process events
-        for _, event in events.iterrows():
-            if 'player' not in event or pd.isna(event['player']):
-                continue
-                
-            player_id = event['player']['id']
-            if player_id not in player_stats:
-                # Player not in starting lineup (might be a sub)
-                player_stats[player_id] = {
-                    'player_name': event['player']['name'],
-                    'team_name': event.get('team', {}).get('name', 'Unknown'),
-                    'position': 'Unknown',
-                    'match_id': match_info['match_id'],
-                    'match_date': match_info['match_date'],
-                    'minutes_played': 45,  # Assume sub
-                    'passes': 0,
-                    'passes_completed': 0,
-                    'shots': 0,
-                    'shots_on_target': 0,
-                    'goals': 0,
-                    'assists': 0,
-                    'key_passes': 0,
-                    'dribbles': 0,
-                    'dribbles_completed': 0,
-                    'tackles': 0,
-                    'interceptions': 0,
-                    'clearances': 0,
-                    'fouls': 0,
-                    'cards_yellow': 0,
-                    'cards_red': 0,
-                    'touches': 0,
-                    'xg': 0.0,
-                    'xa': 0.0
-                }
-            
-            event_type = event['type']['name']
-            
-            # Count different event types
-            if event_type == 'Pass':
-                player_stats[player_id]['passes'] += 1
-                if event.get('pass', {}).get('outcome', {}).get('name') != 'Incomplete':
-                    player_stats[player_id]['passes_completed'] += 1
-                
-                # Check for assists
-                if event.get('pass', {}).get('goal_assist'):
-                    player_stats[player_id]['assists'] += 1
-                elif event.get('pass', {}).get('shot_assist'):
-                    player_stats[player_id]['key_passes'] += 1
-                    
-            elif event_type == 'Shot':
-                player_stats[player_id]['shots'] += 1
-                if event.get('shot', {}).get('outcome', {}).get('name') == 'Goal':
-                    player_stats[player_id]['goals'] += 1
-                    player_stats[player_id]['shots_on_target'] += 1
-                elif not event.get('shot', {}).get('outcome', {}).get('name') in ['Blocked', 'Off T', 'Wayward']:
-                    player_stats[player_id]['shots_on_target'] += 1
-                
-                # Add xG if available
-                if 'shot' in event and 'statsbomb_xg' in event['shot']:
-                    player_stats[player_id]['xg'] += event['shot']['statsbomb_xg']
-                    
-            elif event_type == 'Dribble':
-                player_stats[player_id]['dribbles'] += 1
-                if event.get('dribble', {}).get('outcome', {}).get('name') == 'Complete':
-                    player_stats[player_id]['dribbles_completed'] += 1
-                    
-            elif event_type in ['Tackle', 'Duel'] and event.get('duel', {}).get('type', {}).get('name') == 'Tackle':
-                player_stats[player_id]['tackles'] += 1
-                
-            elif event_type == 'Interception':
-                player_stats[player_id]['interceptions'] += 1
-                
-            elif event_type == 'Clearance':
-                player_stats[player_id]['clearances'] += 1
-                
-            elif event_type == 'Foul Committed':
-                player_stats[player_id]['fouls'] += 1
-                
-                # Check for cards
-                if 'foul_committed' in event:
-                    if event['foul_committed'].get('card', {}).get('name') == 'Yellow Card':
-                        player_stats[player_id]['cards_yellow'] += 1
-                    elif event['foul_committed'].get('card', {}).get('name') == 'Red Card':
-                        player_stats[player_id]['cards_red'] += 1
-            
-            # Count all events as touches
-            player_stats[player_id]['touches'] += 1
-        
-        return pd.DataFrame.from_dict(player_stats, orient='index')
+        return calculate_player_match_stats(flatten_events(events), lineups, match_info)
     
     def get_player_match_stats(self, match_id: int) -> pd.DataFrame:
         """Get player statistics for a specific match"""
-        events = self.get_match_events(match_id)
-        lineups = self.get_lineups(match_id)
-        
         # Get match info (simplified)
         match_info = {'match_id': match_id, 'match_date': ''}
         
-        return self._calculate_player_match_stats(events, lineups, match_info)
+        player_stats = self._get_match_stats(match_info)
+        return player_stats if player_stats is not None else pd.DataFrame()
     
-    def get_player_season_stats(self, competition_id: int, season_id: int, 
-                               player_name: str = None) -> pd.DataFrame:
-        """Aggregate player statistics across a season using parallel processing"""
+    def _worker_config(self) -> Dict:
+        """Settings needed to rebuild an equivalent fetcher in a worker process"""
+        return {
+            'cache_dir': self.cache_dir,
+            'base_url': self.base_url,
+            'source': self.source.location if self.source is not None else None,
+            'timeout': self.timeout,
+            # Matches are revalidated before they are handed to workers
+            'revalidate': False,
+            **self._retry_config
+        }
+    
+    def _iter_match_stats(self, matches: pd.DataFrame, backend: str):
+        """Yield each match's player stats (or None) using the selected executor backend"""
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        
+        # Workers only need the id and date, which keeps process payloads small
+        match_infos = [] if matches.empty else [
+            {'match_id': match_id, 'match_date': match_date}
+            for match_id, match_date in zip(matches['match_id'], matches['match_date'])
+        ]
+        if not match_infos:
+            return
+        
+        if backend == 'serial':
+            print(f"Processing {len(match_infos)} matches serially...")
+            for match_info in match_infos:
+                yield self._fetch_single_match_data(match_info)
+        
+        elif backend == 'threads':
+            print(f"Processing {len(match_infos)} matches using {self.max_workers} threads...")
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                yield from _iter_bounded(executor, self._fetch_single_match_data, match_infos,
+                                         2 * self.max_workers)
+        
+        else:
+            # Worker processes read straight from the disk cache and return packed arrays
+            print(f"Processing {len(match_infos)} matches using {self.max_workers} processes...")
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self._worker_config(),)
+            ) as executor:
+                for packed in _iter_bounded(executor, _process_match_stats, match_infos, 2 * self.max_workers):
+                    yield unpack_match_stats(packed) if packed is not None else None
+            
+            # The workers cached events and lineups through their own view of the manifest
+            self.disk_cache.reload()
+    
+    def _get_season_aggregate_path(self, competition_id: int, season_id: int) -> str:
+        """Get file path for a season's materialized aggregate"""
+        return os.path.join(self.cache_dir, f"season_{competition_id}_{season_id}.npz")
+    
+    def _load_season_aggregate(self, competition_id: int, season_id: int) -> SeasonAggregate:
+        """Load a season's materialized aggregate, or start an empty one"""
+        cache_key = f"season_{competition_id}_{season_id}"
+        with self._memory_cache.loading(cache_key) as cached:
+            # Callers fold new matches into what they get, so the cached aggregate is never handed out
+            if cached is not None:
+                return cached.covered()
+            
+            aggregate_path = self._get_season_aggregate_path(competition_id, season_id)
+            if os.path.exists(aggregate_path):
+                try:
+                    with metrics.timer('disk_load'):
+                        aggregate = SeasonAggregate.load(aggregate_path)
+                    metrics.hit('season_aggregate', True)
+                    self._memory_cache[cache_key] = aggregate
+                    return aggregate.covered()
+                except NPZ_ERRORS as e:
+                    discard_file(aggregate_path, f"{type(e).__name__}: {e}")
+            metrics.hit('season_aggregate', False)
+            return SeasonAggregate()
+    
+    def _save_season_aggregate(self, competition_id: int, season_id: int, aggregate: SeasonAggregate):
+        """Keep a season's aggregate in memory and on disk"""
+        self._memory_cache[f"season_{competition_id}_{season_id}"] = aggregate.covered()
+        try:
+            with metrics.timer('disk_save'):
+                aggregate.save(self._get_season_aggregate_path(competition_id, season_id))
+        except OSError:
+            pass
+    
+    def _fold_season_matches(self, pending: Dict[Tuple[int, int], pd.DataFrame],
+                             aggregates: Dict[Tuple[int, int], SeasonAggregate], backend: str = None,
+                             player_name: Union[str, List[str]] = None) -> set:
+        """Fold several seasons' matches into their aggregates as one shared worker pool completes them"""
         start_time = time.time()
         
-        matches = self.get_matches(competition_id, season_id)
+        frames = [matches.assign(competition_id=c, season_id=s)
+                  for (c, s), matches in pending.items() if not matches.empty]
+        matches = pd.concat(frames) if frames else pd.DataFrame()
+        match_season = {} if matches.empty else dict(zip(
+            matches['match_id'], zip(matches['competition_id'], matches['season_id'])
+        ))
         total_matches = len(matches)
         
-        print(f"Processing {total_matches} matches using {self.max_workers} threads...")
+        buffers = {}
+        changed = set()
         
-        all_player_stats = []
+        def fold(key):
+            stats = buffers.pop(key)
+            match_ids = [int(match_stats['match_id'].iloc[0]) for match_stats in stats]
+            fingerprints = {} if player_name else {m: self._get_source_fingerprint(m) for m in match_ids}
+            with metrics.timer('aggregation'):
+                aggregates[key].add(stats, fingerprints)
+            changed.add(key)
         
-        # Use ThreadPoolExecutor for parallel processing
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all match processing tasks
-            future_to_match = {
-                executor.submit(self._fetch_single_match_data, match.to_dict()): idx 
-                for idx, match in matches.iterrows()
-            }
+        # Matches are folded in small batches as they arrive, so memory stays flat however many there are
+        completed = 0
+        for result in self._iter_match_stats(matches, backend or self.backend):
+            if result is not None and not result.empty:
+                key = match_season[result['match_id'].iloc[0]]
+                if player_name:
+                    result = result[player_name_mask(result['player_name'], player_name)]
+                buffers.setdefault(key, []).append(result)
+                if len(buffers[key]) >= FOLD_BATCH:
+                    fold(key)
             
-            # Process completed tasks with progress bar
-            completed = 0
-            for future in concurrent.futures.as_completed(future_to_match):
-                result = future.result()
-                if result is not None:
-                    all_player_stats.append(result)
-                
-                completed += 1
-                print(f"Progress: {completed}/{total_matches} matches processed", end='\r')
+            completed += 1
+            print(f"Progress: {completed}/{total_matches} matches processed", end='\r')
+        
+        for key in list(buffers):
+            fold(key)
         
         print(f"\nCompleted in {time.time() - start_time:.2f} seconds")
         
-        if not all_player_stats:
+        return changed
+    
+    def _index_season_lineups(self, competition_id: int, season_id: int, match_ids: List[int]):
+        """Add the lineups of any not yet indexed matches to the player index"""
+        for match_id in match_ids:
+            if not self.player_index.has_match(competition_id, season_id, match_id):
+                lineups = self.get_lineups(match_id)
+                if lineups:
+                    self.player_index.add_lineups(competition_id, season_id, match_id, lineups)
+    
+    def _update_season_aggregates(self, season_matches: Dict[Tuple[int, int], pd.DataFrame],
+                                  backend: str = None) -> Dict[Tuple[int, int], SeasonAggregate]:
+        """Bring several seasons' aggregates up to date through one shared worker pool"""
+        aggregates = {}
+        pending = {}
+        for (competition_id, season_id), matches in season_matches.items():
+            match_ids = [] if matches.empty else matches['match_id'].tolist()
+            self._revalidate_matches(match_ids)
+            
+            # Reuse the materialized aggregate unless a covered match changed or disappeared
+            aggregate = self._load_season_aggregate(competition_id, season_id)
+            if not aggregate.is_current({m: self._get_source_fingerprint(m) for m in match_ids}):
+                aggregate = SeasonAggregate()
+            aggregates[(competition_id, season_id)] = aggregate
+            
+            if match_ids:
+                pending[(competition_id, season_id)] = matches[~matches['match_id'].isin(aggregate.match_ids)]
+        
+        reused = sum(len(aggregate.match_ids) for aggregate in aggregates.values())
+        if reused:
+            print(f"Reusing aggregates for {reused} matches")
+        
+        # Consolidated seasons are paged in with one sequential read ahead of their matches
+        containers = self._season_containers()
+        for matches in pending.values():
+            for container in {containers[m] for m in matches['match_id'] if m in containers}:
+                container.prefetch()
+        
+        # Fold only the new matches into each season's totals
+        for key in self._fold_season_matches(pending, aggregates, backend):
+            self._save_season_aggregate(*key, aggregates[key])
+        
+        # Keep the player index in step with every season that was processed
+        for key, matches in season_matches.items():
+            if not matches.empty:
+                self._index_season_lineups(*key, matches['match_id'].tolist())
+        self._save_player_index()
+        
+        return aggregates
+    
+    def _save_player_index(self):
+        """Persist the player index, ignoring write failures like the other cache tiers"""
+        try:
+            self.player_index.save()
+        except OSError:
+            pass
+    
+    def _aggregate_player_matches(self, season_matches: Dict[Tuple[int, int], pd.DataFrame],
+                                  player_name: Union[str, List[str]],
+                                  backend: str = None) -> Dict[Tuple[int, int], SeasonAggregate]:
+        """Aggregate a player's stats from only the given matches of each season"""
+        aggregates = {key: SeasonAggregate() for key in season_matches}
+        self._revalidate_matches([m for matches in season_matches.values() if not matches.empty
+                                  for m in matches['match_id'].tolist()])
+        self._fold_season_matches(season_matches, aggregates, backend, player_name)
+        return aggregates
+    
+    def get_season_aggregate(self, competition_id: int, season_id: int, backend: str = None) -> SeasonAggregate:
+        """Bring a season's aggregate up to date with its matches and return it"""
+        matches = self.get_matches(competition_id, season_id)
+        return self._update_season_aggregates({(competition_id, season_id): matches}, backend)[
+            (competition_id, season_id)
+        ]
+    
+    def get_player_season_stats(self, competition_id: int, season_id: int, 
+                               player_name: str = None, backend: str = None) -> pd.DataFrame:
+        """Aggregate player statistics across a season using parallel processing"""
+        aggregate = self.get_season_aggregate(competition_id, season_id, backend)
+        
+        if aggregate.empty:
             return pd.DataFrame()
         
-        # Combine all match stats
-        season_stats = pd.concat(all_player_stats)
+        with metrics.timer('aggregation'):
+            return aggregate.to_frame(player_name)
+    
+    def get_multi_season_stats(self, competitions: pd.DataFrame, player_name: Union[str, List[str]] = None,
+                               backend: str = None) -> pd.DataFrame:
+        """Aggregate player statistics for many seasons in one pass, tagged by competition and season"""
+        seasons = list(zip(competitions['competition_id'], competitions['season_id'],
+                           competitions['competition_name'], competitions['season_name']))
+        
+        # Fetch all match lists concurrently, skipping seasons that fail
+        season_matches = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.get_matches, c, s): (c, s) for c, s, _, _ in seasons}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    season_matches[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"\nError fetching matches for {futures[future]}: {e}")
         
-        # Filter by player if specified
+        # Fully indexed seasons without a complete aggregate only need the matches the player appeared in
+        targeted = {}
         if player_name:
-            season_stats = season_stats[
-                season_stats['player_name'].str.contains(player_name, case=False, na=False)
-            ]
-        
-        # Aggregate stats
-        aggregated = season_stats.groupby(['player_name', 'team_name', 'position']).agg({
-            'match_id': 'count',  # Games played
-            'minutes_played': 'sum',
-            'goals': 'sum',
-            'assists': 'sum',
-            'shots': 'sum',
-            'shots_on_target': 'sum',
-            'passes': 'sum',
-            'passes_completed': 'sum',
-            'key_passes': 'sum',
-            'dribbles': 'sum',
-            'dribbles_completed': 'sum',
-            'tackles': 'sum',
-            'interceptions': 'sum',
-            'clearances': 'sum',
-            'fouls': 'sum',
-            'cards_yellow': 'sum',
-            'cards_red': 'sum',
-            'touches': 'sum',
-            'xg': 'sum',
-            'xa': 'sum'
-        }).rename(columns={'match_id': 'games_played'})
-        
-        # Calculate per 90 stats
-        aggregated['goals_per_90'] = (aggregated['goals'] / aggregated['minutes_played']) * 90
-        aggregated['assists_per_90'] = (aggregated['assists'] / aggregated['minutes_played']) * 90
-        aggregated['shots_per_90'] = (aggregated['shots'] / aggregated['minutes_played']) * 90
-        aggregated['key_passes_per_90'] = (aggregated['key_passes'] / aggregated['minutes_played']) * 90
-        aggregated['tackles_per_90'] = (aggregated['tackles'] / aggregated['minutes_played']) * 90
-        aggregated['pass_completion'] = (aggregated['passes_completed'] / aggregated['passes']) * 100
-        aggregated['dribble_success'] = (aggregated['dribbles_completed'] / aggregated['dribbles']) * 100
-        aggregated['shot_accuracy'] = (aggregated['shots_on_target'] / aggregated['shots']) * 100
-        aggregated['xg_per_90'] = (aggregated['xg'] / aggregated['minutes_played']) * 90
-        aggregated['xa_per_90'] = (aggregated['xa'] / aggregated['minutes_played']) * 90
-        
-        # Handle division by zero
-        aggregated = aggregated.fillna(0)
-        aggregated = aggregated.replace([float('inf'), -float('inf')], 0)
-        
-        return aggregated.reset_index()
+            player_matches = self.player_index.find_matches(player_name)
+            for key, matches in list(season_matches.items()):
+                match_ids = [] if matches.empty else matches['match_id'].tolist()
+                if not match_ids or set(match_ids) <= self._load_season_aggregate(*key).match_ids:
+                    continue
+                if self.player_index.covers(*key, match_ids):
+                    targeted[key] = matches[matches['match_id'].isin(player_matches.get(key, set()))]
+                    del season_matches[key]
+        
+        aggregates = self._update_season_aggregates(season_matches, backend) if season_matches else {}
+        if targeted:
+            aggregates.update(self._aggregate_player_matches(targeted, player_name, backend))
+        
+        all_stats = []
+        for competition_id, season_id, competition_name, season_name in seasons:
+            aggregate = aggregates.get((competition_id, season_id))
+            if aggregate is None or aggregate.empty:
+                continue
+            
+            stats = aggregate.to_frame(player_name)
+            if not stats.empty:
+                stats['competition'] = competition_name
+                stats['season'] = season_name
+                all_stats.append(stats)
+        
+        if not all_stats:
+            return pd.DataFrame()
+        
+        return pd.concat(all_stats)
     
     def get_team_stats(self, competition_id: int, season_id: int) -> pd.DataFrame:
         """Get aggregated team statistics for a season"""
@@ -464,27 +1029,25 @@ class StatsBombFetcher:
     
     def get_player_heatmap_data(self, match_id: int, player_name: str) -> List[Dict]:
         """Get location data for player heatmap"""
-        events = self.get_match_events(match_id)
+        events = self.get_match_event_table(match_id)
         
         # Filter events by player
         player_events = events[
-            events['player'].apply(lambda x: x.get('name', '') if isinstance(x, dict) else '') == player_name
+            (events['player_name'] == player_name) & events['location_x'].notna()
         ]
         
-        locations = []
-        for _, event in player_events.iterrows():
-            if 'location' in event and event['location'] is not None:
-                locations.append({
-                    'x': event['location'][0],
-                    'y': event['location'][1],
-                    'event_type': event['type']['name']
-                })
+        locations = [
+            {'x': x, 'y': y, 'event_type': event_type}
+            for x, y, event_type in zip(player_events['location_x'].tolist(),
+                                        player_events['location_y'].tolist(),
+                                        player_events['type'].tolist())
+        ]
         
         return locations
     
     def get_passing_network(self, match_id: int, team_name: str) -> Dict:
         """Generate passing network data for a team in a match"""
-        events = self.get_match_events(match_id)
+        events = self.get_match_event_table(match_id)
         lineups = self.get_lineups(match_id)
         
         # Get team lineup
@@ -508,24 +1071,46 @@ class StatsBombFetcher:
         # Count passes between players
         pass_network = {}
         
-        passes = events[events['type'].apply(lambda x: x['name']) == 'Pass']
+        passes = events[
+            (events['type'] == 'Pass') &
+            events['player_name'].isin(list(player_positions)) &
+            events['pass_recipient'].isin(list(player_positions))
+        ]
         
-        for _, pass_event in passes.iterrows():
-            if 'player' not in pass_event or pd.isna(pass_event['player']):
-                continue
-            
-            passer = pass_event['player']['name']
-            
-            # Check if pass has recipient
-            if 'pass' in pass_event and 'recipient' in pass_event['pass']:
-                recipient = pass_event['pass']['recipient']['name']
-                
-                # Only count if both players are from the team
-                if passer in player_positions and recipient in player_positions:
-                    key = f"{passer}->{recipient}"
-                    pass_network[key] = pass_network.get(key, 0) + 1
+        # Only count passes where both players are from the team
+        counts = passes.groupby(
+            [passes['player_name'].astype(str), passes['pass_recipient'].astype(str)], sort=False
+        ).size()
+        for (passer, recipient), count in counts.items():
+            pass_network[f"{passer}->{recipient}"] = int(count)
         
         return {
             'players': player_positions,
             'passes': pass_network
         }
+
+
+def get_shared_fetcher(cache_dir: str = "statsbomb_cache", base_url: str = DEFAULT_BASE_URL,
+                       **kwargs) -> StatsBombFetcher:
+    """Get the process-wide fetcher for a cache directory and data source, creating it on first use"""
+    source = kwargs.get('source')
+    key = (os.path.abspath(cache_dir), getattr(source, 'location', source) or base_url.rstrip('/'))
+    
+    # Compare every constructor argument, defaults included; source and cache_dir are already in the key
+    config = inspect.signature(StatsBombFetcher).bind(cache_dir=cache_dir, base_url=base_url, **kwargs)
+    config.apply_defaults()
+    config = {name: value for name, value in config.arguments.items() if name not in ('source', 'cache_dir')}
+    config['base_url'] = config['base_url'].rstrip('/')
+    
+    with _shared_lock:
+        if key not in _shared_fetchers:
+            _shared_fetchers[key] = StatsBombFetcher(cache_dir=cache_dir, base_url=base_url, **kwargs)
+            _shared_configs[key] = config
+        elif config != _shared_configs[key]:
+            differences = ', '.join(
+                f"{name}={value!r} (live: {_shared_configs[key][name]!r})"
+                for name, value in config.items() if value != _shared_configs[key][name]
+            )
+            raise ValueError(f"Shared fetcher for {cache_dir} already exists with a different configuration: "
+                             f"{differences}; pass the same arguments or create a StatsBombFetcher directly")
+        return _shared_fetchers[key]
@@ -0,0 +1,113 @@
+# statsbomb_index.py
+"""Persistent player → matches inverted index built from lineups"""
+
+import json
+import os
+from threading import Lock
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+import pandas as pd
+
+from statsbomb_aggregate import player_name_mask
+from statsbomb_diskcache import atomic_write
+
+
+class PlayerIndex:
+    """Maps each player to the (competition, season, match, team) entries they appear in"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._players = None
+        self._seasons = None
+        self._lock = Lock()
+        self._dirty = False
+
+    def _ensure_loaded(self):
+        """Read the index from disk on first use"""
+        if self._players is not None:
+            return
+
+        players, seasons = {}, {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                players = {
+                    int(player_id): {'name': entry['name'], 'matches': {tuple(m) for m in entry['matches']}}
+                    for player_id, entry in data['players'].items()
+                }
+                seasons = {
+                    tuple(int(part) for part in key.split('_')): set(match_ids)
+                    for key, match_ids in data['seasons'].items()
+                }
+            except (OSError, ValueError, KeyError):
+                players, seasons = {}, {}
+
+        self._players, self._seasons = players, seasons
+
+    def has_match(self, competition_id: int, season_id: int, match_id: int) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            return match_id in self._seasons.get((competition_id, season_id), ())
+
+    def covers(self, competition_id: int, season_id: int, match_ids: Iterable[int]) -> bool:
+        """Check whether every given match of a season has been indexed"""
+        with self._lock:
+            self._ensure_loaded()
+            return set(match_ids) <= self._seasons.get((competition_id, season_id), set())
+
+    def add_lineups(self, competition_id: int, season_id: int, match_id: int, lineups: List):
+        """Record every player listed in a match's lineups"""
+        with self._lock:
+            self._ensure_loaded()
+            for team in lineups:
+                for player in team.get('lineup', []):
+                    entry = self._players.setdefault(
+                        int(player['player_id']), {'name': player['player_name'], 'matches': set()}
+                    )
+                    entry['matches'].add((int(competition_id), int(season_id), int(match_id), team['team_name']))
+            self._seasons.setdefault((int(competition_id), int(season_id)), set()).add(int(match_id))
+            self._dirty = True
+
+    def find_player_ids(self, player_name: Union[str, List[str]]) -> Set[int]:
+        """Find players whose name matches the query like player_name_mask does on season stats"""
+        with self._lock:
+            self._ensure_loaded()
+            player_ids = list(self._players)
+            names = pd.Series([self._players[pid]['name'] for pid in player_ids], dtype=object)
+
+        # The same matcher as the full scan, so the targeted path finds exactly the same players
+        mask = player_name_mask(names, player_name)
+        return {pid for pid, matched in zip(player_ids, mask) if matched}
+
+    def find_matches(self, player_name: Union[str, List[str]]) -> Dict[Tuple[int, int], Set[int]]:
+        """Get the match ids, grouped by (competition_id, season_id), of players matching a name"""
+        player_ids = self.find_player_ids(player_name)
+
+        matches = {}
+        with self._lock:
+            for player_id in player_ids:
+                for competition_id, season_id, match_id, _ in self._players[player_id]['matches']:
+                    matches.setdefault((competition_id, season_id), set()).add(match_id)
+        return matches
+
+    def save(self):
+        """Write the index to disk if it changed since it was loaded"""
+        with self._lock:
+            if not self._dirty:
+                return
+
+            data = {
+                'players': {
+                    str(player_id): {'name': entry['name'], 'matches': sorted(entry['matches'])}
+                    for player_id, entry in self._players.items()
+                },
+                'seasons': {
+                    f"{competition_id}_{season_id}": sorted(match_ids)
+                    for (competition_id, season_id), match_ids in self._seasons.items()
+                }
+            }
+
+            with atomic_write(self.path, 'w') as f:
+                json.dump(data, f)
+            self._dirty = False
@@ -2,20 +2,54 @@
 """Main application using only StatsBomb data"""
 
 import argparse
-import pandas as pd
-from statsbomb_fetcher import StatsBombFetcher
-from statsbomb_analyzer import StatsBombAnalyzer
-import matplotlib.pyplot as plt
+import json
+import os
+import shlex
+import sys
+from typing import Dict, List, Tuple
+from statsbomb_metrics import metrics
+from statsbomb_server import DEFAULT_HOST, DEFAULT_PORT, InvalidParamsError, serve, query_server, to_jsonable
+
+
+# Parameters each command cannot run without, and the types checked for any that are given
+REQUIRED_PARAMS = {
+    'player': ('player',),
+    'similar': ('player',),
+    'compare': ('players',),
+    'match': ('home', 'away')
+}
+PARAM_TYPES = {
+    'competition': str, 'season': str, 'player': str, 'players': list, 'home': str, 'away': str,
+    'metric': str, 'position': str, 'top_n': int
+}
+
+
+def _check_params(command: str, params: Dict):
+    """Raise InvalidParamsError naming any missing or mistyped parameter of a command"""
+    missing = [name for name in REQUIRED_PARAMS.get(command, ()) if not params.get(name)]
+    if missing:
+        raise InvalidParamsError(f"Command '{command}' requires {', '.join(missing)}")
+    for name, expected in PARAM_TYPES.items():
+        value = params.get(name)
+        if value is not None and (not isinstance(value, expected) or isinstance(value, bool)):
+            raise InvalidParamsError(f"Parameter '{name}' must be {expected.__name__}, got {type(value).__name__}")
 
 
 class StatsBombTransferAnalyzer:
     """Transfer analyzer using only StatsBomb data"""
     
-    def __init__(self):
-        self.fetcher = StatsBombFetcher(max_workers=10)  # Use threading
-        self.analyzer = StatsBombAnalyzer()
+    def __init__(self, fetcher: 'StatsBombFetcher' = None):
+        # The data stack is imported here rather than at module level, so --help and --connect start instantly
+        from statsbomb_fetcher import get_shared_fetcher
+        from statsbomb_analyzer import StatsBombAnalyzer
+        
+        # One fetcher serves both this class and the analyzer, so data is cached once
+        self.fetcher = fetcher if fetcher is not None else get_shared_fetcher(max_workers=10)
+        self.analyzer = StatsBombAnalyzer(self.fetcher)
         self.current_competition = None
         self.current_season = None
+        self.visualize = True
+        self._batch_stats = None
     
     def list_competitions(self):
         """List all available competitions"""
@@ -30,6 +64,8 @@ class StatsBombTransferAnalyzer:
             print(f"\n{comp['competition_name']}:")
             for season in comp['season_name']:
                 print(f"  - {season}")
+        
+        return grouped
     
     def set_competition(self, competition_name: str, season_name: str):
         """Set the current competition and season to analyze"""
@@ -50,7 +86,7 @@ class StatsBombTransferAnalyzer:
     
     def analyze_player(self, player_name: str):
         """Detailed analysis of a specific player"""
-        if not self.current_competition:
+        if self.current_competition is None:
             print("Please set competition first using --competition and --season")
             return
         
@@ -111,18 +147,28 @@ class StatsBombTransferAnalyzer:
             print(f"\nPlaying Style:")
             for trait in report['style_traits']:
                 print(f"  • {trait}")
+        
+        return analysis
+    
+    def _season_stats(self):
+        """Get the current season's player stats, computed once per batch of queries"""
+        key = (self.current_competition['competition_id'], self.current_competition['season_id'])
+        if self._batch_stats is not None and key in self._batch_stats:
+            return self._batch_stats[key]
+        
+        stats = self.fetcher.get_player_season_stats(*key)
+        if self._batch_stats is not None:
+            self._batch_stats[key] = stats
+        return stats
     
     def find_top_performers(self, metric: str = 'goals', position: str = None, top_n: int = 10):
         """Find top performers in current competition"""
-        if not self.current_competition:
+        if self.current_competition is None:
             print("Please set competition first")
             return
         
         # Get all player stats
-        all_players = self.fetcher.get_player_season_stats(
-            self.current_competition['competition_id'],
-            self.current_competition['season_id']
-        )
+        all_players = self._season_stats()
         
         if all_players.empty:
             print("No player data available")
@@ -158,18 +204,29 @@ class StatsBombTransferAnalyzer:
             display_cols.extend(['goals', 'xg_per_90'])
         
         print(top_players[display_cols].to_string(index=False))
+        return top_players[display_cols]
     
-    def find_similar_players(self, player_name: str, top_n: int = 5):
+    def find_similar_players(self, player_name: str, position: str = None, top_n: int = 5):
         """Find players with similar playing styles"""
-        if not self.current_competition:
-            print("Please set competition first")
+        # The cross-competition index answers without a competition being set
+        if self.current_competition is not None:
+            similar = self.analyzer.find_similar_players_statsbomb(
+                player_name,
+                position_filter=position,
+                top_n=top_n,
+                competition_id=self.current_competition['competition_id'],
+                season_id=self.current_competition['season_id']
+            )
+        elif self.analyzer.get_similarity_index() is not None:
+            similar = self.analyzer.find_similar_players_statsbomb(
+                player_name,
+                position_filter=position,
+                top_n=top_n
+            )
+        else:
+            print("Please set competition first, or build the index with --build-similarity-index")
             return
         
-        similar = self.analyzer.find_similar_players_statsbomb(
-            player_name, 
-            top_n=top_n
-        )
-        
         if similar.empty:
             print(f"Could not find similar players to {player_name}")
             return
@@ -177,54 +234,65 @@ class StatsBombTransferAnalyzer:
         print(f"\nPlayers similar to {player_name}:")
         print("="*60)
         print(similar.to_string(index=False))
+        return similar
+    
+    def build_similarity_index(self):
+        """Build the cross-competition similarity index over every available season"""
+        self.analyzer.build_similarity_index()
     
     def analyze_shooters(self, min_shots: int = 20):
         """Analyze shooting efficiency"""
-        if not self.current_competition:
+        if self.current_competition is None:
             print("Please set competition first")
             return
         
         shooters = self.analyzer.analyze_shooting_efficiency(
             self.current_competition['competition_id'],
             self.current_competition['season_id'],
-            min_shots=min_shots
+            min_shots=min_shots,
+            player_stats=self._season_stats()
         )
         
         print(f"\nShooting Efficiency Analysis (min {min_shots} shots):")
         print("="*80)
         print(shooters.head(15).to_string(index=False))
+        return shooters.head(15)
     
     def analyze_creators(self, min_passes: int = 300):
         """Analyze creative players"""
-        if not self.current_competition:
+        if self.current_competition is None:
             print("Please set competition first")
             return
         
         creators = self.analyzer.analyze_creative_players(
             self.current_competition['competition_id'],
             self.current_competition['season_id'],
-            min_passes=min_passes
+            min_passes=min_passes,
+            player_stats=self._season_stats()
         )
         
         print(f"\nCreative Players Analysis (min {min_passes} passes):")
         print("="*80)
         print(creators.head(15).to_string(index=False))
+        return creators.head(15)
     
     def analyze_defenders(self, min_minutes: int = 900):
         """Analyze defensive players"""
-        if not self.current_competition:
+        if self.current_competition is None:
             print("Please set competition first")
             return
         
         defenders = self.analyzer.analyze_defensive_players(
             self.current_competition['competition_id'],
             self.current_competition['season_id'],
-            min_minutes=min_minutes
+            min_minutes=min_minutes,
+            player_stats=self._season_stats()
         )
         
         print(f"\nDefensive Players Analysis (min {min_minutes} minutes):")
         print("="*80)
         print(defenders.head(15).to_string(index=False))
+        return defenders.head(15)
     
     def compare_players(self, player_names: list):
         """Compare multiple players"""
@@ -238,12 +306,15 @@ class StatsBombTransferAnalyzer:
         print("="*80)
         print(comparison.to_string(index=False))
         
-        # Create visualization
-        self.analyzer.visualize_player_radar(player_names)
+        # Create visualization from the same comparison
+        if self.visualize:
+            self.analyzer.visualize_player_radar(player_names, comparison)
+        
+        return comparison
     
     def analyze_match(self, home_team: str, away_team: str):
         """Analyze a specific match"""
-        if not self.current_competition:
+        if self.current_competition is None:
             print("Please set competition first")
             return
         
@@ -278,12 +349,299 @@ class StatsBombTransferAnalyzer:
         print(top_performers.to_string(index=False))
         
         # Generate visualizations
-        print("\nGenerating passing network...")
-        self.analyzer.visualize_passing_network(match_id, home_team)
+        if self.visualize:
+            print("\nGenerating passing network...")
+            self.analyzer.visualize_passing_network(match_id, home_team)
+        
+        return top_performers
+
+    
+    def run(self, command: str, params: Dict):
+        """Run one CLI operation by name with its parameters, returning its result"""
+        if command == 'list':
+            return self.list_competitions()
+        _check_params(command, params)
+        
+        # Every run starts from the competition it names, so served queries stay independent
+        self.current_competition = None
+        if params.get('competition') and params.get('season'):
+            if not self.set_competition(params['competition'], params['season']):
+                return None
+        
+        if command == 'build-similarity-index':
+            return self.build_similarity_index()
+        elif command == 'player':
+            return self.analyze_player(params['player'])
+        elif command == 'top':
+            return self.find_top_performers(
+                metric=params.get('metric', 'goals'),
+                position=params.get('position'),
+                top_n=params.get('top_n', 10)
+            )
+        elif command == 'similar':
+            return self.find_similar_players(
+                params['player'], position=params.get('position'), top_n=params.get('top_n', 10)
+            )
+        elif command == 'compare':
+            return self.compare_players(params['players'])
+        elif command == 'shooters':
+            return self.analyze_shooters()
+        elif command == 'creators':
+            return self.analyze_creators()
+        elif command == 'defenders':
+            return self.analyze_defenders()
+        elif command == 'match':
+            return self.analyze_match(params['home'], params['away'])
+        
+        raise ValueError(f"Unknown command '{command}'")
+    
+    def run_batch(self, queries: List[Tuple[str, Dict]]) -> List[Tuple[str, Dict, object]]:
+        """Run several operations, computing each season's player stats only once"""
+        self._batch_stats = {}
+        try:
+            return [(command, params, self.run(command, params)) for command, params in queries]
+        finally:
+            self._batch_stats = None
+
+
+def _commands_from_args(args: argparse.Namespace) -> List[Tuple[str, Dict]]:
+    """Translate parsed CLI flags into (command, parameters) pairs, one per requested operation"""
+    params = {'competition': args.competition, 'season': args.season}
+    
+    if args.list:
+        return [('list', {})]
+    if args.build_similarity_index:
+        return [('build-similarity-index', params)]
+    
+    commands = []
+    if args.player:
+        commands.append(('player', dict(params, player=args.player)))
+    if args.top:
+        commands.append(('top', dict(params, metric=args.top, position=args.position, top_n=args.top_n)))
+    if args.similar:
+        commands.append(('similar', dict(params, player=args.similar, position=args.position, top_n=args.top_n)))
+    if args.compare:
+        commands.append(('compare', dict(params, players=args.compare)))
+    if args.shooters:
+        commands.append(('shooters', params))
+    if args.creators:
+        commands.append(('creators', params))
+    if args.defenders:
+        commands.append(('defenders', params))
+    if args.match:
+        commands.append(('match', dict(params, home=args.match[0], away=args.match[1])))
+    return commands
+
+
+def _read_queries(parser: argparse.ArgumentParser, args: argparse.Namespace) -> List[Tuple[str, Dict]]:
+    """Read a queries file of CLI flags, one query per line, inheriting the command line's competition"""
+    queries = []
+    with open(args.queries) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            
+            query_args = parser.parse_args(shlex.split(line))
+            if not query_args.competition:
+                query_args.competition, query_args.season = args.competition, args.season
+            queries.extend(_commands_from_args(query_args))
+    return queries
+
+
+def _query_label(command: str, params: Dict) -> str:
+    """Short description of a query used to tag its rows in output files"""
+    values = [v for k, v in params.items() if k not in ('competition', 'season') and v is not None]
+    return ' '.join([command] + [' vs '.join(v) if isinstance(v, list) else str(v) for v in values])
+
+
+def _write_results(path: str, results: List[Tuple[str, Dict, object]]):
+    """Write query results to a .json file (one entry per query) or a .csv file (rows tagged by query)"""
+    if path.endswith('.csv'):
+        import pandas as pd
+        
+        frames = []
+        for command, params, result in results:
+            if result is None:
+                continue
+            if isinstance(result, dict):
+                frame = pd.json_normalize(result)
+            else:
+                frame = pd.DataFrame(result)
+            frame.insert(0, 'query', _query_label(command, params))
+            frame.insert(1, 'competition', params.get('competition'))
+            frame.insert(2, 'season', params.get('season'))
+            frames.append(frame)
+        
+        (pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()).to_csv(path, index=False)
+    else:
+        with open(path, 'w') as f:
+            json.dump([
+                {'query': _query_label(command, params), 'command': command, 'params': params,
+                 'result': to_jsonable(result)}
+                for command, params, result in results
+            ], f, indent=2)
+    
+    print(f"\nWrote {len(results)} query results to {path}")
+
+
+def _start_profiling(args: argparse.Namespace):
+    """Turn on stage metrics if profiling was requested, returning a running cProfile profiler if one was"""
+    if not (args.profile or args.profile_output or args.cprofile):
+        return None
+    metrics.enable()
+    
+    if not args.cprofile:
+        return None
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _finish_profiling(args: argparse.Namespace, fetcher: 'StatsBombFetcher', profiler):
+    """Report the run's stage metrics and write them, and any cProfile stats, to the requested files"""
+    if profiler is not None:
+        profiler.disable()
+    if not metrics.enabled:
+        return
+    
+    snapshot = metrics.snapshot(memory_cache=fetcher.cache_stats())
+    metrics.report(snapshot)
+    if args.profile_output:
+        metrics.write(args.profile_output, snapshot)
+        print(f"\nProfile written to {args.profile_output}")
+    
+    if profiler is not None:
+        import pstats
+        profiler.dump_stats(args.cprofile)
+        print("\nTop functions by cumulative time:")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+        print(f"cProfile stats written to {args.cprofile}")
+
+
+def _parse_size(text: str) -> int:
+    """Parse a size such as 500M or 20G into bytes"""
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def _select_seasons(competitions, args: argparse.Namespace):
+    """Rows of the competitions table named by --competition and --season, or all of them with --all"""
+    if getattr(args, 'all', False):
+        return competitions
+    selected = competitions[competitions['competition_name'].isin(args.competition or [])]
+    if args.season:
+        selected = selected[selected['season_name'].isin(args.season)]
+    return selected
+
+
+def _print_totals(title: str, totals: Dict):
+    print(f"\n{title}:")
+    for name, total in sorted(totals.items(), key=lambda item: -item[1]['bytes']):
+        print(f"  {name:<32} {total['entries']:8d} entries {total['bytes'] / 2**20:10.1f} MB")
+
+
+def _cache_main(argv: List[str]):
+    """Warm, inspect, verify, prune or compact the cache directory"""
+    parser = argparse.ArgumentParser(prog='statsbomb_main.py cache',
+                                     description='Maintain the StatsBomb cache directory')
+    parser.add_argument('--cache-dir', type=str, default='statsbomb_cache', help='Cache directory')
+    parser.add_argument('--data-source', type=str, metavar='PATH_OR_URL',
+                       help='Read open-data from a local checkout, a tar/zip archive of one, or another URL')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+    
+    warm = subparsers.add_parser('warm', help='Prefetch competitions into the cache in parallel')
+    warm.add_argument('--competition', action='append', help='Competition to warm (repeatable)')
+    warm.add_argument('--season', action='append', help='Only these seasons of it (repeatable, default all)')
+    warm.add_argument('--all', action='store_true', help='Warm every competition and season in open-data')
+    warm.add_argument('--concurrency', type=int, default=32, help='Downloads in flight at once')
+    warm.add_argument('--no-parse', action='store_true', help='Only download raw JSON, without building event tables')
+    warm.add_argument('--aggregates', action='store_true',
+                     help='Also compute season aggregates, so first queries only read them')
+    warm.add_argument('--backend', type=str, choices=['threads', 'processes', 'serial'], default='threads',
+                     help='How matches are processed for --aggregates')
+    
+    stats = subparsers.add_parser('stats', help='Show entry counts and bytes by type and by competition')
+    stats.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    
+    subparsers.add_parser('verify', help='Check every entry\'s checksum, removing damaged entries')
+    
+    prune = subparsers.add_parser('prune', help='Evict least recently used entries')
+    prune.add_argument('--max-age-days', type=float, help='Evict entries not used in this many days')
+    prune.add_argument('--max-size', type=_parse_size, metavar='SIZE',
+                      help='Then evict least recently used entries until the cache fits, e.g. 500M or 20G')
+    prune.add_argument('--dry-run', action='store_true', help='Only report what would be evicted')
+    
+    compact = subparsers.add_parser('compact', help='Consolidate each fully cached season into one container file')
+    compact.add_argument('--competition', action='append', help='Only this competition (repeatable)')
+    compact.add_argument('--season', action='append', help='Only these seasons of it (repeatable)')
+    compact.add_argument('--keep-sources', action='store_true', help='Keep the per-match files after compacting')
+    
+    args = parser.parse_args(argv)
+    if args.action == 'warm' and not (args.competition or args.all):
+        parser.error('cache warm needs --competition or --all')
+    
+    # The data stack is only loaded by the subcommands that read through a fetcher
+    from statsbomb_cacheadmin import cache_summary, verify_cache, prune_cache, warm_cache, compact_cache
+    
+    if args.action in ('stats', 'verify', 'prune'):
+        if not os.path.isdir(args.cache_dir):
+            print(f"No cache at {args.cache_dir}")
+            return
+        
+        if args.action == 'stats':
+            summary = cache_summary(args.cache_dir)
+            if args.json:
+                print(json.dumps(summary, indent=2))
+                return
+            print(f"Cache {args.cache_dir}: {summary['entries']} entries, {summary['bytes'] / 2**20:.1f} MB")
+            _print_totals('By type', summary['types'])
+            _print_totals('By competition', summary['competitions'])
+        elif args.action == 'verify':
+            result = verify_cache(args.cache_dir)
+            print(f"\nChecked {result['checked']} entries, {len(result['damaged'])} damaged")
+        else:
+            result = prune_cache(args.cache_dir, args.max_age_days, args.max_size, args.dry_run)
+            print(f"{'Would remove' if args.dry_run else 'Removed'} {result['removed']} entries "
+                  f"({result['bytes'] / 2**20:.1f} MB), {result['remaining_bytes'] / 2**20:.1f} MB remain")
+            if result['types']:
+                _print_totals('Evicted by type', result['types'])
+        return
+    
+    from statsbomb_fetcher import get_shared_fetcher
+    fetcher = get_shared_fetcher(args.cache_dir, max_workers=10, source=args.data_source,
+                                 backend=getattr(args, 'backend', 'threads'))
+    try:
+        if args.action == 'warm':
+            selected = _select_seasons(fetcher.get_competitions(), args)
+            print(f"Warming {len(selected)} seasons with {args.concurrency} downloads in flight...")
+            summary = warm_cache(fetcher, selected, args.concurrency, not args.no_parse, args.aggregates)
+            if summary['failed']:
+                print(f"{len(summary['failed'])} files failed, rerun to retry them")
+        else:
+            seasons = None
+            if args.competition:
+                selected = _select_seasons(fetcher.get_competitions(), args)
+                seasons = list(zip(selected['competition_id'], selected['season_id']))
+            result = compact_cache(fetcher, seasons, args.keep_sources)
+            print(f"\nBuilt {len(result['containers'])} season containers, skipped {len(result['skipped'])}; "
+                  f"manifest holds {result['manifest_entries']} entries")
+    finally:
+        fetcher.close()
 
 
 def main():
-    parser = argparse.ArgumentParser(description='StatsBomb Soccer Analysis Tool')
+    # Cache maintenance has its own subcommands: cache warm|stats|verify|prune|compact
+    if sys.argv[1:2] == ['cache']:
+        _cache_main(sys.argv[2:])
+        return
+    
+    parser = argparse.ArgumentParser(description='StatsBomb Soccer Analysis Tool',
+                                     epilog='Cache maintenance: %(prog)s cache {warm,stats,verify,prune,compact} -h')
     
     # Commands
     parser.add_argument('--list', action='store_true', help='List available competitions')
@@ -297,58 +655,91 @@ def main():
     parser.add_argument('--position', type=str, help='Filter by position')
     parser.add_argument('--similar', type=str, help='Find similar players')
     parser.add_argument('--compare', nargs='+', help='Compare multiple players')
+    parser.add_argument('--build-similarity-index', action='store_true',
+                       help='Build the cross-competition similarity index used by --similar')
     parser.add_argument('--shooters', action='store_true', help='Analyze shooting efficiency')
     parser.add_argument('--creators', action='store_true', help='Analyze creative players')
     parser.add_argument('--defenders', action='store_true', help='Analyze defensive players')
     parser.add_argument('--match', nargs=2, metavar=('HOME', 'AWAY'), help='Analyze specific match')
     parser.add_argument('--top-n', type=int, default=10, help='Number of results to show')
     
-    args = parser.parse_args()
+    # Batch mode
+    parser.add_argument('--queries', type=str, metavar='FILE',
+                       help='Run every query in FILE (one line of CLI flags each) sharing one season computation')
+    parser.add_argument('--output', type=str, metavar='FILE', help='Also write results to a .json or .csv file')
     
-    # Initialize analyzer
-    analyzer = StatsBombTransferAnalyzer()
+    parser.add_argument('--cache-dir', type=str, default='statsbomb_cache', help='Cache directory')
+    parser.add_argument('--data-source', type=str, metavar='PATH_OR_URL',
+                       help='Read open-data from a local checkout, a tar/zip archive of one, or another URL')
+    parser.add_argument('--backend', type=str, choices=['threads', 'processes', 'serial'], default='threads',
+                       help='How matches are processed; processes parses local data on every core')
+    parser.add_argument('--memory-cache-mb', type=int, default=1024,
+                       help='Maximum size of the in-memory cache in megabytes')
+    parser.add_argument('--cache-stats', action='store_true', help='Print cache hit counters when done')
     
-    # List competitions
-    if args.list:
-        analyzer.list_competitions()
-        return
+    # Profiling
+    parser.add_argument('--profile', action='store_true',
+                       help='Time each pipeline stage and count cache hits and bytes, printed when done')
+    parser.add_argument('--profile-output', type=str, metavar='FILE',
+                       help='Write the profile as JSON, or Prometheus text for .prom/.txt (implies --profile)')
+    parser.add_argument('--cprofile', type=str, metavar='FILE',
+                       help='Also run under cProfile and write its stats to FILE (implies --profile)')
     
-    # Set competition if specified
-    if args.competition and args.season:
-        if not analyzer.set_competition(args.competition, args.season):
-            return
-    
-    # Execute analysis commands
-    if args.player:
-        analyzer.analyze_player(args.player)
+    # Server mode
+    parser.add_argument('--serve', action='store_true', help='Run a query server that keeps caches warm')
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST, help='Server host')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Server port')
+    parser.add_argument('--connect', type=str, metavar='URL',
+                       help='Send the command to a running server, e.g. http://127.0.0.1:8765')
     
-    elif args.top:
-        analyzer.find_top_performers(
-            metric=args.top,
-            position=args.position,
-            top_n=args.top_n
-        )
-    
-    elif args.similar:
-        analyzer.find_similar_players(args.similar, top_n=args.top_n)
+    args = parser.parse_args()
+    queries = _read_queries(parser, args) if args.queries else _commands_from_args(args)
     
-    elif args.compare:
-        analyzer.compare_players(args.compare)
+    if not queries and not args.serve:
+        print("No analysis command specified. Use -h for help.")
+        return
     
-    elif args.shooters:
-        analyzer.analyze_shooters()
+    # Forward the queries to a running server instead of loading anything locally
+    if args.connect:
+        results = []
+        for command, params in queries:
+            response = query_server(args.connect, command, params)
+            print(response['output'], end='')
+            if 'error' in response:
+                print(f"Server error: {response['error']}")
+            results.append((command, params, response.get('result')))
+        if args.output:
+            _write_results(args.output, results)
+        return
     
-    elif args.creators:
-        analyzer.analyze_creators()
+    # Initialize analyzer
+    from statsbomb_fetcher import get_shared_fetcher
+    fetcher = get_shared_fetcher(args.cache_dir, max_workers=10, memory_cache_bytes=args.memory_cache_mb << 20,
+                                 source=args.data_source, backend=args.backend)
+    analyzer = StatsBombTransferAnalyzer(fetcher)
     
-    elif args.defenders:
-        analyzer.analyze_defenders()
+    if args.serve:
+        if args.profile:
+            metrics.enable()
+        serve(analyzer, args.host, args.port)
+        return
     
-    elif args.match:
-        analyzer.analyze_match(args.match[0], args.match[1])
+    # Execute analysis commands, sharing season stats between them
+    profiler = _start_profiling(args)
+    results = analyzer.run_batch(queries)
+    _finish_profiling(args, fetcher, profiler)
+    if args.output:
+        _write_results(args.output, results)
     
-    else:
-        print("No analysis command specified. Use -h for help.")
+    if args.cache_stats:
+        stats = fetcher.cache_stats()
+        print(f"\nMemory cache: {stats['entries']} entries, "
+              f"{stats['bytes'] / 2**20:.1f}/{stats['max_bytes'] / 2**20:.0f} MB, "
+              f"{stats['hits']} hits, {stats['misses']} misses ({stats['hit_ratio']:.1%}), "
+              f"{stats['coalesced']} coalesced, {stats['evictions']} evictions")
+        for entry_type, type_stats in sorted(stats['types'].items()):
+            print(f"  {entry_type}: {type_stats['entries']} entries, {type_stats['bytes'] / 2**20:.1f} MB, "
+                  f"{type_stats['evictions']} evictions")
 
 
 if __name__ == "__main__":
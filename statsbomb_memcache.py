@@ -0,0 +1,228 @@
+# statsbomb_memcache.py
+"""Bounded in-memory cache shared by everything reading through one fetcher"""
+
+import re
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock, RLock
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+
+# Share of the total byte capacity each cache entry type may hold on its own
+DEFAULT_BUDGET_SHARES = {
+    'events': 0.4,
+    'event_table': 0.3,
+    'lineups': 0.1,
+    'matches': 0.1
+}
+
+
+# Object cells sampled per column to estimate the nested dicts and lists they hold
+OBJECT_SAMPLE_CELLS = 256
+
+
+def cache_type(key: str) -> str:
+    """Get an entry's type from its cache key, e.g. 'events_123' -> 'events'"""
+    return re.sub(r'(_-?\d+)+$', '', key)
+
+
+def estimate_size(value: Any, _seen: set = None) -> int:
+    """Estimate the bytes held by a cached value, including nested containers"""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        frame = value.to_frame() if isinstance(value, pd.Series) else value
+        size = int(frame.memory_usage(deep=True).sum())
+
+        # deep=True only counts each object cell itself, not the dicts and lists nested inside it
+        for _, column in frame.items():
+            if column.dtype == object and len(column):
+                size += _nested_cell_bytes(column.to_numpy(), _seen)
+        return size
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(item, _seen) for item in value)
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + estimate_size(vars(value), _seen)
+    return sys.getsizeof(value)
+
+
+def _nested_cell_bytes(cells: np.ndarray, _seen: set) -> int:
+    """Estimate the bytes nested inside an object column's cells from an even sample of them"""
+    sample = cells[::max(1, len(cells) // OBJECT_SAMPLE_CELLS)]
+    nested = sum(max(0, estimate_size(cell, _seen) - sys.getsizeof(cell)) for cell in sample
+                 if isinstance(cell, (dict, list, tuple, set, frozenset)))
+    return int(nested * len(cells) / len(sample))
+
+
+class MemoryCache:
+    """Thread-safe least-recently-used cache bounded by total and per-type byte budgets"""
+
+    def __init__(self, max_bytes: int = 1 << 30, budgets: Dict[str, int] = None):
+        self.max_bytes = max_bytes
+        self.budgets = {t: int(max_bytes * share) for t, share in DEFAULT_BUDGET_SHARES.items()}
+        self.budgets.update(budgets or {})
+
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._type_bytes = {}
+        self._lock = RLock()
+        self._inflight = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.evictions = {}
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._type_bytes.values())
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Look up a key, counting the hit or miss and marking it recently used"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """Look up a key without touching counters or recency"""
+        with self._lock:
+            return self._entries.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                raise KeyError(key)
+            return self.get(key)
+
+    def __setitem__(self, key: str, value: Any):
+        # A cache with no capacity skips sizing values it could never hold
+        if self.max_bytes <= 0:
+            with self._lock:
+                self.rejected += 1
+            return
+
+        entry_type = cache_type(key)
+        size = estimate_size(value)
+
+        with self._lock:
+            self._remove(key)
+
+            # Values that could never fit are not cached at all
+            if size > min(self.max_bytes, self.budgets.get(entry_type, self.max_bytes)):
+                self.rejected += 1
+                return
+
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._type_bytes[entry_type] = self._type_bytes.get(entry_type, 0) + size
+
+            # Evict the type's own least recently used entries first, then anything over the total
+            budget = self.budgets.get(entry_type)
+            if budget is not None:
+                while self._type_bytes[entry_type] > budget:
+                    self._evict(next(k for k in self._entries if cache_type(k) == entry_type))
+            while self.total_bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> bool:
+        """Drop an entry and its byte accounting, returning whether it existed"""
+        if key not in self._entries:
+            return False
+        del self._entries[key]
+        self._type_bytes[cache_type(key)] -= self._sizes.pop(key)
+        return True
+
+    def _evict(self, key: str):
+        self._remove(key)
+        entry_type = cache_type(key)
+        self.evictions[entry_type] = self.evictions.get(entry_type, 0) + 1
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            value = self._entries.get(key, default)
+            self._remove(key)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._type_bytes.clear()
+
+    @contextmanager
+    def loading(self, key: str):
+        """Single-flight loading: callers for one key wait for the first load, then see its result"""
+        with self._lock:
+            entry = self._inflight.setdefault(key, [Lock(), 0])
+            entry[1] += 1
+
+        waited = not entry[0].acquire(blocking=False)
+        if waited:
+            entry[0].acquire()
+        try:
+            value = self.get(key)
+            if waited and value is not None:
+                with self._lock:
+                    self.coalesced += 1
+            yield value
+        finally:
+            entry[0].release()
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._inflight[key]
+
+    def stats(self) -> Dict:
+        """Get sizes, hit counters and evictions, overall and per entry type"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            types = {entry_type: {'entries': 0, 'bytes': 0} for entry_type in self.evictions}
+            for key in self._entries:
+                entry_type = cache_type(key)
+                types.setdefault(entry_type, {'entries': 0, 'bytes': 0})
+                types[entry_type]['entries'] += 1
+                types[entry_type]['bytes'] += self._sizes[key]
+            for entry_type, stats in types.items():
+                stats['budget'] = self.budgets.get(entry_type)
+                stats['evictions'] = self.evictions.get(entry_type, 0)
+
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'coalesced': self.coalesced,
+                'rejected': self.rejected,
+                'evictions': sum(self.evictions.values()),
+                'types': types
+            }
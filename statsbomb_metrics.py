@@ -0,0 +1,159 @@
+# statsbomb_metrics.py
+"""Process-wide stage timers and counters for profiling where a run spends its time"""
+
+import json
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict
+
+
+# Hot-path stages timed by the fetcher, event engine and analyzer
+STAGES = (
+    'http_fetch', 'raw_read', 'disk_load', 'disk_save', 'json_decode', 'dataframe_build',
+    'stat_computation', 'aggregation', 'similarity_build', 'similarity_search'
+)
+
+# Cache tiers whose hits and misses are counted as cache_<tier>_hits / cache_<tier>_misses
+CACHE_TIERS = ('raw', 'disk', 'container', 'event_table', 'match_stats', 'season_aggregate', 'embedding')
+
+PROMETHEUS_PREFIX = 'statsbomb'
+
+
+class Metrics:
+    """Thread-safe stage timers and counters, recorded only while enabled"""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = Lock()
+        self._timers = {}
+        self._counters = {}
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Time the enclosed block under a stage name"""
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def add_time(self, stage: str, seconds: float):
+        with self._lock:
+            timer = self._timers.setdefault(stage, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def count(self, name: str, value: int = 1):
+        """Add to a counter, e.g. bytes transferred or cache hits"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def hit(self, tier: str, hit: bool):
+        """Count a lookup in one cache tier"""
+        self.count(f"cache_{tier}_{'hits' if hit else 'misses'}")
+
+    def snapshot(self, memory_cache: Dict = None) -> Dict:
+        """Get every timer, counter and per-tier hit ratio; memory_cache adds a fetcher's cache_stats()"""
+        with self._lock:
+            timers = {
+                stage: {'count': count, 'seconds': total, 'max_seconds': longest,
+                        'mean_seconds': total / count if count else 0.0}
+                for stage, (count, total, longest) in self._timers.items()
+            }
+            counters = dict(self._counters)
+
+        tiers = {}
+        if memory_cache is not None:
+            tiers['memory'] = (memory_cache['hits'], memory_cache['misses'])
+        for tier in CACHE_TIERS:
+            hits, misses = counters.get(f"cache_{tier}_hits", 0), counters.get(f"cache_{tier}_misses", 0)
+            if hits or misses:
+                tiers[tier] = (hits, misses)
+
+        return {
+            'timers': timers,
+            'counters': counters,
+            'cache': {
+                tier: {'hits': hits, 'misses': misses, 'hit_ratio': hits / (hits + misses) if hits + misses else 0.0}
+                for tier, (hits, misses) in tiers.items()
+            }
+        }
+
+    def to_json(self, snapshot: Dict = None) -> str:
+        return json.dumps(snapshot if snapshot is not None else self.snapshot(), indent=2)
+
+    def to_prometheus(self, snapshot: Dict = None) -> str:
+        """Render a snapshot in the Prometheus text exposition format"""
+        snapshot = snapshot if snapshot is not None else self.snapshot()
+        p = PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {p}_stage_seconds_total Wall time spent in each pipeline stage",
+            f"# TYPE {p}_stage_seconds_total counter"
+        ]
+        lines += [f'{p}_stage_seconds_total{{stage="{stage}"}} {timer["seconds"]:.6f}'
+                  for stage, timer in sorted(snapshot['timers'].items())]
+        lines += [f"# HELP {p}_stage_calls_total Times each pipeline stage ran", f"# TYPE {p}_stage_calls_total counter"]
+        lines += [f'{p}_stage_calls_total{{stage="{stage}"}} {timer["count"]}'
+                  for stage, timer in sorted(snapshot['timers'].items())]
+
+        lines += [f"# HELP {p}_cache_lookups_total Cache lookups by tier and result",
+                  f"# TYPE {p}_cache_lookups_total counter"]
+        for tier, stats in sorted(snapshot['cache'].items()):
+            lines.append(f'{p}_cache_lookups_total{{tier="{tier}",result="hit"}} {stats["hits"]}')
+            lines.append(f'{p}_cache_lookups_total{{tier="{tier}",result="miss"}} {stats["misses"]}')
+
+        # Remaining counters (requests, bytes) are exported under their own names
+        for name, value in sorted(snapshot['counters'].items()):
+            if name.startswith('cache_'):
+                continue
+            lines += [f"# TYPE {p}_{name}_total counter", f"{p}_{name}_total {value}"]
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str, snapshot: Dict = None):
+        """Write a snapshot as Prometheus text for .prom/.txt paths, JSON otherwise"""
+        text = self.to_prometheus(snapshot) if path.endswith(('.prom', '.txt')) else self.to_json(snapshot)
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def report(self, snapshot: Dict = None):
+        """Print stage times, cache hit ratios and byte counters"""
+        snapshot = snapshot if snapshot is not None else self.snapshot()
+
+        print("\nProfile by stage:")
+        print("="*60)
+        for stage, timer in sorted(snapshot['timers'].items(), key=lambda item: -item[1]['seconds']):
+            print(f"  {stage:<20} {timer['seconds']:9.3f}s  {timer['count']:7d} calls  "
+                  f"max {timer['max_seconds'] * 1000:8.1f}ms")
+
+        if snapshot['cache']:
+            print("\nCache tiers:")
+            for tier, stats in snapshot['cache'].items():
+                print(f"  {tier:<20} {stats['hits']:7d} hits {stats['misses']:7d} misses  ({stats['hit_ratio']:.1%})")
+
+        counters = {k: v for k, v in snapshot['counters'].items() if not k.startswith('cache_')}
+        if counters:
+            print("\nCounters:")
+            for name, value in sorted(counters.items()):
+                shown = f"{value / 2**20:.2f} MB" if name.endswith('bytes') else f"{value}"
+                print(f"  {name:<20} {shown}")
+
+
+# Shared by every module; worker processes of the 'processes' backend keep their own copy
+metrics = Metrics()
@@ -0,0 +1,141 @@
+# statsbomb_prefetch.py
+"""asyncio bulk downloader for warming the StatsBomb cache"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+from statsbomb_diskcache import atomic_write
+from statsbomb_events import parse_events, save_event_table
+from statsbomb_metrics import metrics
+
+
+def _parse_events_file(raw_path: str, table_path: str):
+    """Build a columnar event table from a downloaded events file (runs in a worker process)"""
+    with open(raw_path, 'rb') as f:
+        save_event_table(parse_events(f.read()), table_path)
+
+
+class BulkDownloader:
+    """Streams raw JSON for whole seasons into a fetcher's cache with a bounded in-flight limit"""
+
+    def __init__(self, fetcher, max_in_flight: int = 32, parse: bool = True):
+        self.fetcher = fetcher
+        self.max_in_flight = max_in_flight
+        self.parse = parse
+        self.downloaded = 0
+        self.skipped = 0
+        self.failed = []
+
+    def run(self, seasons: List[Tuple[int, int]]) -> Dict:
+        """Prefetch every (competition_id, season_id) pair and return a summary"""
+        return asyncio.run(self._run(seasons))
+
+    async def _run(self, seasons: List[Tuple[int, int]]) -> Dict:
+        """Schedule all seasons on one event loop and wait for downloads and parsing"""
+        start_time = time.time()
+
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._parsing = []
+
+        # Blocking socket reads release the GIL, so downloads share a thread pool
+        # while parsing runs in separate processes and overlaps with the network
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_in_flight) as io_pool, \
+                concurrent.futures.ProcessPoolExecutor() as parse_pool:
+            self._io_pool = io_pool
+            self._parse_pool = parse_pool
+
+            await asyncio.gather(*(self._prefetch_season(c, s) for c, s in seasons))
+
+            paths, futures = zip(*self._parsing) if self._parsing else ((), ())
+            for path, result in zip(paths, await asyncio.gather(*futures, return_exceptions=True)):
+                if isinstance(result, Exception):
+                    print(f"\nError parsing {path}: {result}")
+                    self.failed.append(path)
+
+        print(f"\nPrefetched {self.downloaded} files ({self.skipped} already cached) "
+              f"in {time.time() - start_time:.2f} seconds")
+
+        return {
+            'downloaded': self.downloaded,
+            'skipped': self.skipped,
+            'failed': self.failed
+        }
+
+    async def _download(self, path: str) -> str:
+        """Download a single document to the raw cache, returning its local path"""
+        # Files of a local checkout are parsed where they are instead of being copied
+        source = self.fetcher.source
+        local_path = source.local_path(path) if source is not None else None
+        if local_path is not None:
+            self.skipped += 1
+            return local_path
+
+        raw_path = self.fetcher._get_raw_path(path)
+        if os.path.exists(raw_path):
+            self.skipped += 1
+            return raw_path
+
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._io_pool, self._stream_to_disk, path, raw_path)
+
+        self.downloaded += 1
+        print(f"Progress: {self.downloaded} files downloaded", end='\r')
+        return raw_path
+
+    def _stream_to_disk(self, path: str, raw_path: str):
+        """Stream a document to disk in chunks, renaming into place once complete"""
+        os.makedirs(os.path.dirname(raw_path), exist_ok=True)
+
+        # Members of a local archive are extracted rather than downloaded
+        if self.fetcher.source is not None:
+            with atomic_write(raw_path) as f:
+                self.fetcher.source.read(path, f.write)
+            return
+
+        url = f"{self.fetcher.base_url}/{path}"
+        with metrics.timer('http_fetch'), \
+                self.fetcher.session.get(url, stream=True, timeout=self.fetcher.timeout) as response:
+            response.raise_for_status()
+
+            # A failed download removes its partial file instead of leaving it behind
+            with atomic_write(raw_path) as f:
+                for chunk in response.iter_content(chunk_size=1 << 16):
+                    f.write(chunk)
+                metrics.count('http_requests')
+                metrics.count('http_bytes', f.tell())
+
+    async def _prefetch_season(self, competition_id: int, season_id: int):
+        """Download a season's match list, then all of its events and lineups"""
+        try:
+            matches_path = await self._download(f"matches/{competition_id}/{season_id}.json")
+            with open(matches_path, 'rb') as f:
+                match_ids = [match['match_id'] for match in json.load(f)]
+        except Exception as e:
+            print(f"\nError fetching matches for {competition_id}/{season_id}: {e}")
+            self.failed.append(f"matches/{competition_id}/{season_id}.json")
+            return
+
+        await asyncio.gather(*(self._prefetch_match(match_id) for match_id in match_ids))
+
+    async def _prefetch_match(self, match_id: int):
+        """Download one match's events and lineups and queue the events for parsing"""
+        paths = [f"events/{match_id}.json", f"lineups/{match_id}.json"]
+        results = await asyncio.gather(*(self._download(path) for path in paths), return_exceptions=True)
+
+        for path, result in zip(paths, results):
+            if isinstance(result, Exception):
+                print(f"\nError fetching {path}: {result}")
+                self.failed.append(path)
+
+        events_path = results[0]
+        table_path = self.fetcher._get_event_table_path(match_id)
+        if self.parse and not isinstance(events_path, Exception) and not os.path.exists(table_path):
+            loop = asyncio.get_running_loop()
+            self._parsing.append((
+                paths[0], loop.run_in_executor(self._parse_pool, _parse_events_file, events_path, table_path)
+            ))
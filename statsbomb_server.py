@@ -0,0 +1,154 @@
+# statsbomb_server.py
+"""Local HTTP/JSON query server that keeps analyzer caches warm between CLI calls"""
+
+import io
+import json
+import urllib.error
+import urllib.request
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from typing import Dict
+
+from statsbomb_metrics import metrics
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# CLI operations exposed as POST /<command> endpoints
+COMMANDS = (
+    'list', 'player', 'top', 'similar', 'compare', 'shooters', 'creators',
+    'defenders', 'match', 'build-similarity-index'
+)
+
+
+class InvalidParamsError(ValueError):
+    """A command was sent without a parameter it needs, or with one of the wrong type"""
+
+
+def to_jsonable(result):
+    """Convert an operation's result (DataFrame, dict or None) to plain JSON types"""
+    if result is None:
+        return None
+    if hasattr(result, 'to_json'):
+        # pandas writes NaN as null, which plain json.dumps would not
+        return json.loads(result.to_json(orient='records'))
+    return json.loads(json.dumps(result, default=_json_default))
+
+
+def _json_default(value):
+    """Serialize numpy scalars and arrays found inside result dicts"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+class QueryServer(ThreadingHTTPServer):
+    """HTTP server answering CLI operations from one long-lived analyzer"""
+
+    daemon_threads = True
+
+    def __init__(self, address, analyzer):
+        super().__init__(address, QueryHandler)
+        self.analyzer = analyzer
+        self._lock = Lock()
+
+    def execute(self, command: str, params: Dict) -> Dict:
+        """Run one operation, capturing what the CLI would have printed"""
+        output = io.StringIO()
+
+        # Operations share the analyzer's current competition and stdout, so they run one at a time
+        with self._lock, redirect_stdout(output):
+            try:
+                result = self.analyzer.run(command, params)
+            except InvalidParamsError as e:
+                return {'command': command, 'output': output.getvalue(), 'error': str(e), 'status': 400}
+            except Exception as e:
+                return {'command': command, 'output': output.getvalue(), 'error': f"{type(e).__name__}: {e}"}
+
+        return {'command': command, 'output': output.getvalue(), 'result': to_jsonable(result)}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """Routes GET /health, GET /stats and POST /<command> requests"""
+
+    def _send_json(self, status: int, body: Dict):
+        self._send(status, json.dumps(body).encode(), 'application/json')
+
+    def _send(self, status: int, data: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'commands': list(COMMANDS)})
+        elif self.path == '/stats':
+            self._send_json(200, self.server.analyzer.fetcher.cache_stats())
+        elif self.path == '/metrics':
+            # Prometheus scrape endpoint; stage timers are only recorded when started with --profile
+            snapshot = metrics.snapshot(memory_cache=self.server.analyzer.fetcher.cache_stats())
+            self._send(200, metrics.to_prometheus(snapshot).encode(), 'text/plain; version=0.0.4')
+        else:
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        command = self.path.strip('/')
+        if command not in COMMANDS:
+            self._send_json(404, {'error': f"Unknown command '{command}'"})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            params = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            self._send_json(400, {'error': f"Invalid JSON body: {e}"})
+            return
+
+        if not isinstance(params, dict):
+            self._send_json(400, {'error': "Body must be a JSON object of parameters"})
+            return
+
+        response = self.server.execute(command, params)
+        self._send_json(response.pop('status', 500 if 'error' in response else 200), response)
+
+
+def serve(analyzer, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """Serve CLI operations over HTTP until interrupted"""
+    # Charts cannot be shown from a server, so operations only return their tables
+    analyzer.visualize = False
+
+    # Load the similarity index up front so the first --similar query is as fast as the rest
+    analyzer.analyzer.get_similarity_index()
+
+    server = QueryServer((host, port), analyzer)
+    print(f"Serving StatsBomb queries on http://{host}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+        analyzer.fetcher.close()
+
+
+def query_server(url: str, command: str, params: Dict, timeout: float = 600) -> Dict:
+    """Send one CLI operation to a running server and return its JSON response"""
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/{command}",
+        data=json.dumps(params).encode(),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        body = json.loads(e.read() or b'{}')
+        body.setdefault('output', '')
+        return body
+    except urllib.error.URLError as e:
+        return {'command': command, 'output': '', 'error': f"Could not reach server at {url}: {e.reason}"}
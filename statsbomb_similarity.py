@@ -0,0 +1,232 @@
+# statsbomb_similarity.py
+"""Precomputed player feature matrices for vectorized similarity search"""
+
+import json
+import os
+import shutil
+import pandas as pd
+import numpy as np
+from typing import Dict, List
+
+from statsbomb_events import STATS_VERSION
+from statsbomb_diskcache import atomic_write
+
+
+# Every metric any position group compares on, in matrix column order
+FEATURE_METRICS = [
+    'goals_per_90', 'assists_per_90', 'xg_per_90', 'xa_per_90', 'shots_per_90',
+    'key_passes_per_90', 'tackles_per_90', 'pass_completion', 'touches',
+    'interceptions', 'clearances'
+]
+
+# Similarity metrics for each position group, chosen from the target's position
+POSITION_GROUP_METRICS = [
+    ['goals_per_90', 'xg_per_90', 'shots_per_90', 'touches'],
+    ['assists_per_90', 'xa_per_90', 'key_passes_per_90', 'pass_completion'],
+    ['tackles_per_90', 'interceptions', 'clearances', 'pass_completion'],
+    ['goals_per_90', 'assists_per_90', 'xg_per_90', 'xa_per_90']
+]
+
+# Season totals (rather than rates) shown as integers in results
+COUNT_METRICS = ['touches', 'interceptions', 'clearances']
+
+# Descriptive columns kept alongside the matrix for display
+META_COLUMNS = ['player_name', 'team_name', 'position', 'games_played', 'competition', 'season']
+
+# Number of targets scored together in one batched matrix operation
+QUERY_BLOCK = 32
+
+
+def position_group(position: str) -> int:
+    """Map a position to its row in POSITION_GROUP_METRICS"""
+    position = str(position)
+    if 'Forward' in position:
+        return 0
+    elif 'Midfield' in position:
+        return 1
+    elif 'Back' in position:
+        return 2
+    return 3
+
+
+class PlayerEmbedding:
+    """Standardized float32 feature matrix over a set of player-seasons"""
+
+    def __init__(self, players: pd.DataFrame, values: np.ndarray,
+                 features: np.ndarray = None, scale: np.ndarray = None):
+        self.players = players.reset_index(drop=True)
+        self.values = np.asarray(values, dtype=np.float64)
+
+        if features is None:
+            # Scale every metric by its spread so distances are comparable across metrics
+            scale = self.values.std(axis=0, ddof=1) if len(self.values) > 1 else np.zeros(len(FEATURE_METRICS))
+            scale = np.nan_to_num(scale)
+            safe_scale = np.where(scale > 0, scale, 1.0)
+            features = ((self.values - self.values.mean(axis=0)) / safe_scale).astype(np.float32)
+
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.features = features
+
+        # Digest of the season aggregate the matrix was built from, when there is one
+        self.coverage = None
+
+        self._position_masks = {}
+        self._name_rows = None
+
+    @classmethod
+    def from_season_stats(cls, season_stats: pd.DataFrame) -> 'PlayerEmbedding':
+        """Build an embedding from a get_player_season_stats frame"""
+        meta = [c for c in META_COLUMNS if c in season_stats.columns]
+        return cls(season_stats[meta], season_stats[FEATURE_METRICS].to_numpy(dtype=np.float64))
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def position_mask(self, position_filter: str = None) -> np.ndarray:
+        """Rows whose position contains the filter, cached per filter string"""
+        if not position_filter:
+            return np.ones(len(self), dtype=bool)
+        if position_filter not in self._position_masks:
+            self._position_masks[position_filter] = self.players['position'].str.contains(
+                position_filter, case=False, na=False
+            ).to_numpy()
+        return self._position_masks[position_filter]
+
+    def _first_row(self, player_name: str, mask: np.ndarray) -> int:
+        """Position of a player's first row within the masked rows, or -1"""
+        if self._name_rows is None:
+            self._name_rows = {}
+            for row, name in enumerate(self.players['player_name']):
+                self._name_rows.setdefault(name, []).append(row)
+
+        for row in self._name_rows.get(player_name, []):
+            if mask[row]:
+                return int(np.count_nonzero(mask[:row]))
+        return -1
+
+    def query_many(self, target_players: List[str], position_filter: str = None,
+                   top_n: int = 10) -> Dict[str, pd.DataFrame]:
+        """Find the top_n most similar players for each target in batched matrix operations"""
+        mask = self.position_mask(position_filter)
+        rows = np.flatnonzero(mask)
+        players = self.players.iloc[rows].reset_index(drop=True)
+        features = self.features[rows]
+
+        # Metrics are scaled by their spread within the filtered population
+        subset_std = np.nan_to_num(self.values[rows].std(axis=0, ddof=1)) if len(rows) > 1 \
+            else np.zeros(len(FEATURE_METRICS))
+        weights = np.where(subset_std > 0, self.scale / np.where(subset_std > 0, subset_std, 1.0), 0.0)
+        names = players['player_name'].to_numpy()
+        display_columns = [c for c in META_COLUMNS if c in players.columns]
+
+        targets = {name: self._first_row(name, mask) for name in target_players}
+        results = {name: pd.DataFrame() for name in target_players}
+
+        # Targets sharing a position group share metrics, so they are scored together
+        by_group = {}
+        for name, row in targets.items():
+            if row >= 0:
+                by_group.setdefault(position_group(players['position'].iloc[row]), []).append((name, row))
+
+        for group, group_targets in by_group.items():
+            metrics = POSITION_GROUP_METRICS[group]
+            columns = [FEATURE_METRICS.index(m) for m in metrics]
+            group_features = features[:, columns]
+            group_weights = weights[columns].astype(np.float32)
+
+            for start in range(0, len(group_targets), QUERY_BLOCK):
+                block = group_targets[start:start + QUERY_BLOCK]
+                target_rows = np.array([row for _, row in block])
+
+                # (targets, players, metrics) weighted L1 distances in one operation
+                scores = np.abs(group_features[None, :, :] - group_features[target_rows, None, :]) @ group_weights
+
+                for (name, _), target_scores in zip(block, scores.astype(np.float64)):
+                    candidates = np.flatnonzero(names != name)
+                    k = min(top_n, len(candidates))
+                    if k == 0:
+                        continue
+                    candidate_scores = target_scores[candidates]
+                    top = np.argpartition(candidate_scores, k - 1)[:k] if k < len(candidates) else np.arange(k)
+                    top = top[np.argsort(candidate_scores[top], kind='stable')]
+
+                    similar = players.iloc[candidates[top]].copy()
+                    similar[metrics] = self.values[rows[candidates[top]]][:, columns]
+                    for metric in set(metrics) & set(COUNT_METRICS):
+                        similar[metric] = similar[metric].astype(np.int64)
+                    similar['similarity_score'] = candidate_scores[top]
+                    results[name] = similar[display_columns + metrics + ['similarity_score']]
+
+        return results
+
+    def query(self, target_player: str, position_filter: str = None, top_n: int = 10) -> pd.DataFrame:
+        """Find the top_n players most similar to one target"""
+        return self.query_many([target_player], position_filter, top_n)[target_player]
+
+    def save(self, path: str):
+        """Write the embedding as an .npz file"""
+        with atomic_write(path) as f:
+            np.savez(
+                f,
+                __version__=np.array(STATS_VERSION),
+                __coverage__=np.array(self.coverage or ''),
+                **{f"meta.{column}": self.players[column].to_numpy(dtype=str)
+                   for column in self.players.columns if self.players[column].dtype.kind not in 'iuf'},
+                **{f"num.{column}": self.players[column].to_numpy()
+                   for column in self.players.columns if self.players[column].dtype.kind in 'iuf'},
+                values=self.values
+            )
+
+    @classmethod
+    def load(cls, path: str) -> 'PlayerEmbedding':
+        """Read an embedding written by save"""
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['__version__']) != STATS_VERSION:
+                raise ValueError(f"Stale stats version in {path}")
+
+            players = pd.DataFrame({
+                key.split('.', 1)[1]: data[key] for key in data.files if key.startswith(('meta.', 'num.'))
+            })
+            values = data['values']
+            coverage = str(data['__coverage__']) if '__coverage__' in data.files else ''
+
+        embedding = cls(players, values)
+        embedding.coverage = coverage or None
+        return embedding
+
+    def save_index(self, directory: str):
+        """Write the embedding as a directory of .npy arrays that can be memory-mapped"""
+        tmp_dir = f"{directory}.{os.getpid()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        np.save(os.path.join(tmp_dir, 'features.npy'), self.features)
+        np.save(os.path.join(tmp_dir, 'values.npy'), self.values)
+        np.save(os.path.join(tmp_dir, 'scale.npy'), self.scale)
+        for column in self.players.columns:
+            values = self.players[column]
+            values = values.to_numpy() if values.dtype.kind in 'iuf' else values.to_numpy(dtype=str)
+            np.save(os.path.join(tmp_dir, f"meta.{column}.npy"), values)
+
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump({'version': STATS_VERSION, 'columns': list(self.players.columns), 'rows': len(self)}, f)
+
+        # Swap the finished index into place so readers never see a partial one
+        old_dir = f"{directory}.{os.getpid()}.old"
+        if os.path.exists(directory):
+            os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    @classmethod
+    def load_index(cls, directory: str) -> 'PlayerEmbedding':
+        """Memory-map an index written by save_index"""
+        with open(os.path.join(directory, 'manifest.json')) as f:
+            manifest = json.load(f)
+        if manifest['version'] != STATS_VERSION:
+            raise ValueError(f"Stale stats version in {directory}")
+
+        def load(name):
+            return np.load(os.path.join(directory, name), mmap_mode='r', allow_pickle=False)
+
+        players = pd.DataFrame({column: load(f"meta.{column}.npy") for column in manifest['columns']})
+        return cls(players, load('values.npy'), features=load('features.npy'), scale=load('scale.npy'))
@@ -0,0 +1,236 @@
+# statsbomb_sources.py
+"""Local data sources: an open-data checkout on disk or a tar/zip archive of one"""
+
+import bz2
+import glob
+import gzip
+import lzma
+import mmap
+import os
+import shutil
+import struct
+import tarfile
+import tempfile
+import zipfile
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from statsbomb_diskcache import atomic_write
+
+
+# Fixed-size part of a zip local file header, followed by the name and extra field
+ZIP_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+
+# Leading bytes of gzip, bzip2 and xz streams, with the opener that decompresses each
+DECOMPRESSORS = {b'\x1f\x8b': gzip.open, b'BZh': bz2.open, b'\xfd7zXZ': lzma.open}
+
+# Directory under the scratch directory holding decompressed copies of compressed tars
+SCRATCH_SUBDIR = 'sources'
+
+
+def _map_file(f) -> Optional[mmap.mmap]:
+    """Memory-map a whole file read-only, or None for files mmap cannot map (e.g. empty ones)"""
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        return None
+
+
+def _decompressor(f) -> Optional[Callable]:
+    """Opener for a compressed file, or None if it does not start with a known compression magic"""
+    head = f.read(6)
+    f.seek(0)
+    for magic, opener in DECOMPRESSORS.items():
+        if head.startswith(magic):
+            return opener
+    return None
+
+
+def _decompressed_copy(location: str, opener: Callable, scratch_dir: Optional[str]):
+    """Decompress an archive in one pass to a plain file, reused while the archive is unchanged"""
+    if scratch_dir is None:
+        copy = tempfile.TemporaryFile()
+        with opener(location, 'rb') as f:
+            shutil.copyfileobj(f, copy, 1 << 20)
+        copy.seek(0)
+        return copy
+
+    # Named by the archive's size and mtime, so later runs and worker processes share one copy
+    st = os.stat(location)
+    name = os.path.basename(location)
+    directory = os.path.join(scratch_dir, SCRATCH_SUBDIR)
+    path = os.path.join(directory, f"{name}.{st.st_size}.{st.st_mtime_ns}.tar")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        print(f"Decompressing {location} to {path} for random access...")
+        with opener(location, 'rb') as f, atomic_write(path) as copy:
+            shutil.copyfileobj(f, copy, 1 << 20)
+
+        # Copies of earlier versions of the archive are never read again
+        for stale in glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(name)}.*.tar")):
+            if stale != path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+    return open(path, 'rb')
+
+
+class DataSource:
+    """Reads open-data documents by their path relative to the data/ directory"""
+
+    def __init__(self, location: str):
+        self.location = location
+
+    def read(self, path: str, decode: Callable[[Any], Any]) -> Any:
+        """Decode a document, raising FileNotFoundError if the source lacks it"""
+        raise NotImplementedError
+
+    def version(self, path: str) -> Optional[str]:
+        """Token that changes whenever a document does, used like an HTTP ETag"""
+        raise NotImplementedError
+
+    def local_path(self, path: str) -> Optional[str]:
+        """Path of a document as a plain file on disk, if the source has one"""
+        return None
+
+    def close(self):
+        pass
+
+
+class DirectorySource(DataSource):
+    """A checkout of statsbomb/open-data (or its data/ directory) read through mmap"""
+
+    def __init__(self, location: str):
+        super().__init__(location)
+        nested = os.path.join(location, 'data')
+        self.root = nested if os.path.isfile(os.path.join(nested, 'competitions.json')) else location
+        if not os.path.isfile(os.path.join(self.root, 'competitions.json')):
+            raise ValueError(f"No competitions.json found under {location}")
+
+    def _path(self, path: str) -> str:
+        return os.path.join(self.root, *path.split('/'))
+
+    def local_path(self, path: str) -> Optional[str]:
+        local = self._path(path)
+        return local if os.path.isfile(local) else None
+
+    def read(self, path: str, decode: Callable[[Any], Any]) -> Any:
+        with open(self._path(path), 'rb') as f:
+            mapped = _map_file(f)
+            if mapped is None:
+                return decode(f.read())
+
+            # Decode straight from the page cache; the view is released before the map closes
+            with mapped, memoryview(mapped) as view:
+                return decode(view)
+
+    def version(self, path: str) -> Optional[str]:
+        try:
+            st = os.stat(self._path(path))
+        except OSError:
+            return None
+        return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+class ArchiveSource(DataSource):
+    """A tar or zip archive of open-data; uncompressed members are decoded in place from one mmap"""
+
+    def __init__(self, location: str, scratch_dir: str = None):
+        super().__init__(location)
+        self._lock = Lock()
+        self._file = open(location, 'rb')
+
+        # A compressed tar can only reach a member by decompressing everything before it, so it is
+        # decompressed once up front (into scratch_dir, or an anonymous temp file) and mapped instead
+        opener = _decompressor(self._file)
+        if opener is not None:
+            self._file.close()
+            self._file = _decompressed_copy(location, opener, scratch_dir)
+        self._mapped = _map_file(self._file)
+
+        if zipfile.is_zipfile(self._file):
+            self._zip = zipfile.ZipFile(self._file)
+            self._tar = None
+            members = {info.filename: info for info in self._zip.infolist() if not info.is_dir()}
+        else:
+            self._zip = None
+            try:
+                self._file.seek(0)
+                self._tar = tarfile.open(fileobj=self._file)
+            except tarfile.ReadError:
+                if self._mapped is not None:
+                    self._mapped.close()
+                self._file.close()
+                raise ValueError(f"{location} is not a tar or zip archive") from None
+            members = {info.name: info for info in self._tar.getmembers() if info.isfile()}
+
+        # Archives of the repository nest data/ under a top-level folder, so find its prefix
+        roots = [name[:-len('competitions.json')] for name in members
+                 if name == 'competitions.json' or name.endswith('/competitions.json')]
+        if not roots:
+            self.close()
+            raise ValueError(f"No competitions.json found in {location}")
+        prefix = min(roots, key=len)
+        self._members = {name[len(prefix):]: info for name, info in members.items() if name.startswith(prefix)}
+
+    def _member(self, path: str):
+        try:
+            return self._members[path]
+        except KeyError:
+            raise FileNotFoundError(f"{path} not in {self.location}") from None
+
+    def _data_span(self, info) -> Optional[slice]:
+        """Byte range of an uncompressed member inside the archive, or None if it must be decompressed"""
+        if self._mapped is None:
+            return None
+        if self._zip is not None:
+            if info.compress_type != zipfile.ZIP_STORED:
+                return None
+            header = ZIP_LOCAL_HEADER.unpack_from(self._mapped, info.header_offset)
+            start = info.header_offset + ZIP_LOCAL_HEADER.size + header[-2] + header[-1]
+            return slice(start, start + info.file_size)
+        return slice(info.offset_data, info.offset_data + info.size)
+
+    def read(self, path: str, decode: Callable[[Any], Any]) -> Any:
+        info = self._member(path)
+        span = self._data_span(info)
+        if span is not None:
+            with memoryview(self._mapped)[span] as view:
+                return decode(view)
+
+        if self._zip is not None:
+            return decode(self._zip.read(info))
+        with self._lock:
+            data = self._tar.extractfile(info).read()
+        return decode(data)
+
+    def version(self, path: str) -> Optional[str]:
+        info = self._members.get(path)
+        if info is None:
+            return None
+        if self._zip is not None:
+            return f"{info.CRC}:{info.file_size}"
+        return f"{info.mtime}:{info.size}:{info.chksum}"
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+        if self._mapped is not None:
+            self._mapped.close()
+        self._file.close()
+
+
+def open_source(location: str, scratch_dir: str = None) -> DataSource:
+    """Open a local open-data directory or archive, decompressing compressed tars into scratch_dir"""
+    if os.path.isdir(location):
+        return DirectorySource(location)
+    if os.path.isfile(location):
+        return ArchiveSource(location, scratch_dir)
+    raise ValueError(f"Data source {location} is neither a directory nor an archive")
+
+
+def is_url(location: str) -> bool:
+    return location.startswith(('http://', 'https://'))
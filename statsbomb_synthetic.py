@@ -0,0 +1,243 @@
+# statsbomb_synthetic.py
+"""Deterministic synthetic StatsBomb open-data documents for benchmarks"""
+
+import json
+import os
+import numpy as np
+from typing import Dict, List, Tuple
+
+
+# Starting positions in formation order (a 4-2-3-1)
+POSITIONS = [
+    'Goalkeeper', 'Right Back', 'Right Center Back', 'Left Center Back', 'Left Back',
+    'Right Defensive Midfield', 'Left Defensive Midfield', 'Right Wing',
+    'Center Attacking Midfield', 'Left Wing', 'Center Forward'
+]
+
+# Players per squad: the starting eleven plus substitutes
+SQUAD_SIZE = 16
+
+# Event types and their rough share of a real open-data match
+EVENT_MIX = {
+    'Pass': 0.29, 'Ball Receipt*': 0.27, 'Carry': 0.23, 'Pressure': 0.08,
+    'Ball Recovery': 0.025, 'Duel': 0.015, 'Clearance': 0.012, 'Block': 0.008,
+    'Dribble': 0.007, 'Shot': 0.007, 'Interception': 0.006, 'Foul Committed': 0.006,
+    'Foul Won': 0.006, 'Miscontrol': 0.006, 'Dispossessed': 0.005, 'Goal Keeper': 0.005,
+    'Dribbled Past': 0.005, 'Tackle': 0.001
+}
+
+EVENT_TYPE_IDS = {name: i + 1 for i, name in enumerate(EVENT_MIX)}
+
+
+def team_name(team: int) -> str:
+    return f"Synthetic {team + 1:02d} FC"
+
+
+def player_id(team: int, slot: int) -> int:
+    return 1000 * (team + 1) + slot
+
+
+def player_name(team: int, slot: int) -> str:
+    return f"{team_name(team)} Player {slot + 1:02d}"
+
+
+def season_fixtures(n_matches: int, n_teams: int) -> List[Tuple[int, int]]:
+    """Home and away team indices for each match, cycling through every pairing"""
+    if n_teams < 2:
+        raise ValueError("A league needs at least two teams")
+    
+    fixtures = []
+    offset = 1
+    while len(fixtures) < n_matches:
+        for home in range(n_teams):
+            fixtures.append((home, (home + offset) % n_teams))
+            if len(fixtures) == n_matches:
+                break
+        offset = offset % (n_teams - 1) + 1
+    return fixtures
+
+
+def synthetic_lineups(home: int, away: int) -> List[Dict]:
+    """Lineups for both teams, with positions for the starters and late ones for substitutes"""
+    lineups = []
+    for team in (home, away):
+        players = []
+        for slot in range(SQUAD_SIZE):
+            starter = slot < len(POSITIONS)
+            positions = [{
+                'position_id': (slot % len(POSITIONS)) + 1,
+                'position': POSITIONS[slot % len(POSITIONS)],
+                'from': '00:00' if starter else '70:00',
+                'to': None,
+                'from_period': 1 if starter else 2,
+                'to_period': None,
+                'start_reason': 'Starting XI' if starter else 'Substitution - On',
+                'end_reason': 'Final Whistle'
+            }] if starter or slot < len(POSITIONS) + 3 else []
+            players.append({
+                'player_id': player_id(team, slot),
+                'player_name': player_name(team, slot),
+                'player_nickname': None,
+                'jersey_number': slot + 1,
+                'country': {'id': 68, 'name': 'England'},
+                'cards': [],
+                'positions': positions
+            })
+        lineups.append({'team_id': team + 1, 'team_name': team_name(team), 'lineup': players})
+    return lineups
+
+
+def _starting_xi(team: int, index: int) -> Dict:
+    return {
+        'id': f"xi-{team}-{index}", 'index': index, 'period': 1, 'timestamp': '00:00:00.000',
+        'minute': 0, 'second': 0, 'type': {'id': 35, 'name': 'Starting XI'},
+        'possession': 1, 'possession_team': {'id': team + 1, 'name': team_name(team)},
+        'play_pattern': {'id': 1, 'name': 'Regular Play'},
+        'team': {'id': team + 1, 'name': team_name(team)}, 'duration': 0.0,
+        'tactics': {'formation': 4231, 'lineup': [
+            {'player': {'id': player_id(team, slot), 'name': player_name(team, slot)},
+             'position': {'id': slot + 1, 'name': position}, 'jersey_number': slot + 1}
+            for slot, position in enumerate(POSITIONS)
+        ]}
+    }
+
+
+def synthetic_events(match_id: int, home: int, away: int, n_events: int, seed: int) -> List[Dict]:
+    """A match's events in open-data shape, fully determined by the seed"""
+    rng = np.random.default_rng(seed)
+    names = list(EVENT_MIX)
+    weights = np.array(list(EVENT_MIX.values()))
+    event_types = rng.choice(len(names), size=n_events, p=weights / weights.sum())
+
+    events = [_starting_xi(home, 1), _starting_xi(away, 2)]
+    team, possession = home, 1
+    for i, type_index in enumerate(event_types):
+        # Possession changes hands every few events
+        if rng.random() < 0.12:
+            team = away if team == home else home
+            possession += 1
+
+        event_type = names[type_index]
+        slot = int(rng.integers(len(POSITIONS))) if rng.random() < 0.97 else int(rng.integers(len(POSITIONS), SQUAD_SIZE))
+        seconds = i * 5400 / n_events
+        period = 1 if seconds < 2700 else 2
+        location = [round(float(rng.uniform(0, 120)), 1), round(float(rng.uniform(0, 80)), 1)]
+
+        event = {
+            'id': f"{match_id}-{i}", 'index': i + 3, 'period': period,
+            'timestamp': f"00:{int(seconds % 2700) // 60:02d}:{seconds % 60:06.3f}",
+            'minute': int(seconds // 60), 'second': int(seconds % 60),
+            'type': {'id': EVENT_TYPE_IDS[event_type], 'name': event_type},
+            'possession': possession, 'possession_team': {'id': team + 1, 'name': team_name(team)},
+            'play_pattern': {'id': 1, 'name': 'Regular Play'},
+            'team': {'id': team + 1, 'name': team_name(team)},
+            'player': {'id': player_id(team, slot), 'name': player_name(team, slot)},
+            'position': {'id': slot % len(POSITIONS) + 1, 'name': POSITIONS[slot % len(POSITIONS)]},
+            'location': location, 'duration': round(float(rng.exponential(1.2)), 3),
+            'related_events': [f"{match_id}-{i + 1}"] if i + 1 < n_events else []
+        }
+
+        if event_type == 'Pass':
+            recipient = int(rng.integers(len(POSITIONS)))
+            event['pass'] = {
+                'recipient': {'id': player_id(team, recipient), 'name': player_name(team, recipient)},
+                'length': round(float(rng.uniform(2, 50)), 2), 'angle': round(float(rng.uniform(-3.14, 3.14)), 3),
+                'height': {'id': 1, 'name': 'Ground Pass'},
+                'end_location': [round(float(rng.uniform(0, 120)), 1), round(float(rng.uniform(0, 80)), 1)],
+                'body_part': {'id': 40, 'name': 'Right Foot'}
+            }
+            roll = rng.random()
+            if roll < 0.18:
+                event['pass']['outcome'] = {'id': 9, 'name': 'Incomplete'}
+            elif roll < 0.21:
+                event['pass']['outcome'] = {'id': 75, 'name': 'Out'}
+            if rng.random() < 0.003:
+                event['pass']['goal_assist'] = True
+            elif rng.random() < 0.02:
+                event['pass']['shot_assist'] = True
+        elif event_type == 'Shot':
+            event['shot'] = {
+                'statsbomb_xg': round(float(rng.beta(1.2, 9)), 6),
+                'end_location': [120.0, round(float(rng.uniform(30, 50)), 1), round(float(rng.uniform(0, 3)), 1)],
+                'outcome': {'name': str(rng.choice(['Goal', 'Saved', 'Blocked', 'Off T', 'Wayward', 'Post'],
+                                                   p=[0.11, 0.3, 0.27, 0.25, 0.04, 0.03]))},
+                'technique': {'id': 93, 'name': 'Normal'},
+                'body_part': {'id': 40, 'name': 'Right Foot'},
+                'type': {'id': 87, 'name': 'Open Play'},
+                'freeze_frame': [
+                    {'location': [round(float(rng.uniform(60, 120)), 1), round(float(rng.uniform(0, 80)), 1)],
+                     'player': {'id': player_id(t, s), 'name': player_name(t, s)},
+                     'position': {'id': s + 1, 'name': POSITIONS[s]}, 'teammate': t == team}
+                    for t in (home, away) for s in range(1, len(POSITIONS), 2)
+                ]
+            }
+        elif event_type == 'Dribble':
+            event['dribble'] = {'outcome': {'name': 'Complete' if rng.random() < 0.55 else 'Incomplete'}}
+        elif event_type == 'Duel':
+            event['duel'] = {'type': {'name': 'Tackle' if rng.random() < 0.4 else 'Aerial Lost'}}
+            if event['duel']['type']['name'] == 'Tackle':
+                event['duel']['outcome'] = {'name': str(rng.choice(['Won', 'Lost In Play', 'Success In Play']))}
+        elif event_type == 'Foul Committed':
+            event['foul_committed'] = {}
+            if rng.random() < 0.15:
+                event['foul_committed']['card'] = {'name': 'Yellow Card' if rng.random() < 0.93 else 'Red Card'}
+        elif event_type == 'Carry':
+            event['carry'] = {'end_location': [round(float(rng.uniform(0, 120)), 1),
+                                               round(float(rng.uniform(0, 80)), 1)]}
+
+        events.append(event)
+
+    return events
+
+
+def write_synthetic_corpus(directory: str, n_matches: int = 380, events_per_match: int = 3500,
+                           n_teams: int = 20, seed: int = 0, competition_id: int = 9001,
+                           season_id: int = 1) -> Dict:
+    """Write one synthetic season in the open-data directory layout and return a summary"""
+    os.makedirs(os.path.join(directory, 'matches', str(competition_id)), exist_ok=True)
+    os.makedirs(os.path.join(directory, 'events'), exist_ok=True)
+    os.makedirs(os.path.join(directory, 'lineups'), exist_ok=True)
+
+    def dump(data, *parts) -> int:
+        with open(os.path.join(directory, *parts), 'w') as f:
+            json.dump(data, f)
+            return f.tell()
+
+    total_bytes = dump([{
+        'competition_id': competition_id, 'season_id': season_id, 'country_name': 'Synthetic',
+        'competition_name': 'Synthetic League', 'competition_gender': 'male',
+        'season_name': f"Season {season_id}", 'match_updated': '2024-01-01T00:00:00',
+        'match_available': '2024-01-01T00:00:00'
+    }], 'competitions.json')
+
+    matches = []
+    rng = np.random.default_rng(seed)
+    for index, (home, away) in enumerate(season_fixtures(n_matches, n_teams)):
+        match_id = competition_id * 100000 + season_id * 1000 + index
+        home_score, away_score = (int(goals) for goals in rng.poisson(1.4, size=2))
+        matches.append({
+            'match_id': match_id,
+            'match_date': f"2024-{index // 28 % 12 + 1:02d}-{index % 28 + 1:02d}",
+            'kick_off': '15:00:00.000',
+            'competition': {'competition_id': competition_id, 'competition_name': 'Synthetic League'},
+            'season': {'season_id': season_id, 'season_name': f"Season {season_id}"},
+            'home_team': {'home_team_id': home + 1, 'home_team_name': team_name(home)},
+            'away_team': {'away_team_id': away + 1, 'away_team_name': team_name(away)},
+            'home_score': home_score, 'away_score': away_score,
+            'match_status': 'available', 'match_week': index // max(n_teams // 2, 1) + 1
+        })
+
+        # Each match has its own seed so any one can be regenerated on its own
+        total_bytes += dump(synthetic_events(match_id, home, away, events_per_match, seed * 100003 + index),
+                            'events', f"{match_id}.json")
+        total_bytes += dump(synthetic_lineups(home, away), 'lineups', f"{match_id}.json")
+
+    total_bytes += dump(matches, 'matches', str(competition_id), f"{season_id}.json")
+
+    return {
+        'competition_id': competition_id,
+        'season_id': season_id,
+        'match_ids': [match['match_id'] for match in matches],
+        'home_teams': [match['home_team']['home_team_name'] for match in matches],
+        'bytes': total_bytes
+    }
@@ -0,0 +1,191 @@
+"""Cached, revalidated and incrementally folded season stats must match a full recompute"""
+
+import glob
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from statsbomb_analyzer import StatsBombAnalyzer
+from statsbomb_fetcher import StatsBombFetcher
+from statsbomb_similarity import FEATURE_METRICS
+from statsbomb_synthetic import write_synthetic_corpus
+
+
+def season_stats(cache_dir: str, raw_dir: str, corpus: dict, **kwargs) -> pd.DataFrame:
+    fetcher = StatsBombFetcher(max_workers=4, cache_dir=cache_dir, source=raw_dir, **kwargs)
+    try:
+        stats = fetcher.get_player_season_stats(corpus['competition_id'], corpus['season_id'])
+    finally:
+        fetcher.close()
+    return stats.sort_values('player_name').reset_index(drop=True)
+
+
+def test_revalidate_picks_up_upstream_event_changes():
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_dir = os.path.join(workdir, 'raw')
+        corpus = write_synthetic_corpus(raw_dir, n_matches=6, events_per_match=400, n_teams=4, seed=1)
+        cache_dir = os.path.join(workdir, 'cache')
+        before = season_stats(cache_dir, raw_dir, corpus)
+
+        # Upstream now records every shot of one match as a goal
+        events_path = os.path.join(raw_dir, 'events', f"{corpus['match_ids'][0]}.json")
+        with open(events_path) as f:
+            events = json.load(f)
+        for event in events:
+            if event['type']['name'] == 'Shot':
+                event['shot']['outcome'] = {'name': 'Goal'}
+        with open(events_path, 'w') as f:
+            json.dump(events, f)
+
+        # Without revalidation the cached tiers are trusted as they are
+        pd.testing.assert_frame_equal(season_stats(cache_dir, raw_dir, corpus), before)
+
+        revalidated = season_stats(cache_dir, raw_dir, corpus, revalidate=True)
+        expected = season_stats(os.path.join(workdir, 'fresh'), raw_dir, corpus)
+        assert revalidated['goals'].sum() > before['goals'].sum()
+        pd.testing.assert_frame_equal(revalidated, expected)
+
+
+def test_fold_after_failed_lineups_matches_full_recompute():
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_dir = os.path.join(workdir, 'raw')
+        corpus = write_synthetic_corpus(raw_dir, n_matches=6, events_per_match=400, n_teams=4, seed=2)
+        cache_dir = os.path.join(workdir, 'cache')
+
+        # One match's lineups cannot be fetched, so its stats are built without them
+        lineups_path = os.path.join(raw_dir, 'lineups', f"{corpus['match_ids'][0]}.json")
+        os.rename(lineups_path, lineups_path + '.missing')
+        degraded = season_stats(cache_dir, raw_dir, corpus)
+        os.rename(lineups_path + '.missing', lineups_path)
+
+        incremental = season_stats(cache_dir, raw_dir, corpus)
+        expected = season_stats(os.path.join(workdir, 'fresh'), raw_dir, corpus)
+        assert (degraded['position'] == 'Unknown').any()
+        pd.testing.assert_frame_equal(incremental, expected)
+
+        # The corrected aggregate is what later runs reuse
+        pd.testing.assert_frame_equal(season_stats(cache_dir, raw_dir, corpus), expected)
+
+
+def test_embedding_follows_season_aggregate():
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_dir = os.path.join(workdir, 'raw')
+        corpus = write_synthetic_corpus(raw_dir, n_matches=6, events_per_match=400, n_teams=4, seed=3)
+        key = (corpus['competition_id'], corpus['season_id'])
+        expected = season_stats(os.path.join(workdir, 'fresh'), raw_dir, corpus)
+
+        # The first matrix is built while one match's lineups cannot be fetched
+        lineups_path = os.path.join(raw_dir, 'lineups', f"{corpus['match_ids'][0]}.json")
+        os.rename(lineups_path, lineups_path + '.missing')
+        fetcher = StatsBombFetcher(max_workers=4, cache_dir=os.path.join(workdir, 'cache'), source=raw_dir)
+        try:
+            analyzer = StatsBombAnalyzer(fetcher)
+            degraded = analyzer.get_player_embedding(*key)
+            os.rename(lineups_path + '.missing', lineups_path)
+            restored = analyzer.get_player_embedding(*key)
+            assert analyzer.get_player_embedding(*key) is restored
+        finally:
+            fetcher.close()
+
+        assert (degraded.players['position'] == 'Unknown').any()
+        rows = restored.players.sort_values('player_name').index
+        assert restored.players.loc[rows, 'player_name'].tolist() == expected['player_name'].tolist()
+        np.testing.assert_allclose(
+            restored.values[rows], expected[FEATURE_METRICS].to_numpy()
+        )
+
+
+def test_container_skips_incomplete_matches():
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_dir = os.path.join(workdir, 'raw')
+        corpus = write_synthetic_corpus(raw_dir, n_matches=6, events_per_match=400, n_teams=4, seed=4)
+        cache_dir = os.path.join(workdir, 'cache')
+        expected = season_stats(os.path.join(workdir, 'fresh'), raw_dir, corpus)
+
+        # One match's lineups cannot be fetched while the season is compacted
+        missing = corpus['match_ids'][0]
+        lineups_path = os.path.join(raw_dir, 'lineups', f"{missing}.json")
+        os.rename(lineups_path, lineups_path + '.missing')
+        fetcher = StatsBombFetcher(max_workers=4, cache_dir=cache_dir, source=raw_dir)
+        try:
+            info = fetcher.build_season_container(corpus['competition_id'], corpus['season_id'], remove_sources=True)
+        finally:
+            fetcher.close()
+        os.rename(lineups_path + '.missing', lineups_path)
+
+        assert list(info['skipped']) == [missing]
+        assert info['matches'] == len(corpus['match_ids']) - 1
+        pd.testing.assert_frame_equal(season_stats(cache_dir, raw_dir, corpus), expected)
+
+
+def test_compacted_season_keeps_its_etags():
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_dir = os.path.join(workdir, 'raw')
+        corpus = write_synthetic_corpus(raw_dir, n_matches=6, events_per_match=400, n_teams=4, seed=9)
+        cache_dir = os.path.join(workdir, 'cache')
+        expected = season_stats(cache_dir, raw_dir, corpus)
+
+        fetcher = StatsBombFetcher(max_workers=4, cache_dir=cache_dir, source=raw_dir)
+        try:
+            fetcher.build_season_container(corpus['competition_id'], corpus['season_id'], remove_sources=True)
+        finally:
+            fetcher.close()
+        assert not glob.glob(os.path.join(cache_dir, 'event_table_*.etag'))
+        assert not glob.glob(os.path.join(cache_dir, 'lineups_*.etag'))
+
+        # A damaged container next to it is ignored rather than breaking every lookup
+        with open(os.path.join(cache_dir, 'seasons', 'season_1_1.sbs'), 'wb') as f:
+            f.write(b'SBSC\x01\x00')
+
+        # Unchanged matches revalidate against the ETags kept in the container and stay in it
+        pd.testing.assert_frame_equal(season_stats(cache_dir, raw_dir, corpus, revalidate=True), expected)
+        assert not glob.glob(os.path.join(cache_dir, 'events_*.npz'))
+
+
+def test_truncated_npz_tiers_are_rebuilt():
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_dir = os.path.join(workdir, 'raw')
+        corpus = write_synthetic_corpus(raw_dir, n_matches=6, events_per_match=400, n_teams=4, seed=7)
+        cache_dir = os.path.join(workdir, 'cache')
+        expected = season_stats(cache_dir, raw_dir, corpus)
+
+        # Cut every cached table short, as a crash or a full disk would
+        for pattern in ['events_*.npz', 'stats_*.npz', 'season_*.npz']:
+            for path in glob.glob(os.path.join(cache_dir, pattern)):
+                with open(path, 'r+b') as f:
+                    f.truncate(os.path.getsize(path) // 2)
+
+        pd.testing.assert_frame_equal(season_stats(cache_dir, raw_dir, corpus), expected)
+        pd.testing.assert_frame_equal(season_stats(cache_dir, raw_dir, corpus), expected)
+
+
+def test_truncated_embedding_is_rebuilt():
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_dir = os.path.join(workdir, 'raw')
+        corpus = write_synthetic_corpus(raw_dir, n_matches=4, events_per_match=400, n_teams=4, seed=8)
+        key = (corpus['competition_id'], corpus['season_id'])
+        fetcher = StatsBombFetcher(max_workers=4, cache_dir=os.path.join(workdir, 'cache'), source=raw_dir)
+        try:
+            built = StatsBombAnalyzer(fetcher).get_player_embedding(*key)
+            embedding_path = os.path.join(fetcher.cache_dir, f"embedding_{key[0]}_{key[1]}.npz")
+            with open(embedding_path, 'r+b') as f:
+                f.truncate(os.path.getsize(embedding_path) // 2)
+
+            rebuilt = StatsBombAnalyzer(fetcher).get_player_embedding(*key)
+        finally:
+            fetcher.close()
+        np.testing.assert_array_equal(rebuilt.values, built.values)
+
+
+if __name__ == "__main__":
+    test_revalidate_picks_up_upstream_event_changes()
+    test_fold_after_failed_lineups_matches_full_recompute()
+    test_embedding_follows_season_aggregate()
+    test_container_skips_incomplete_matches()
+    test_compacted_season_keeps_its_etags()
+    test_truncated_npz_tiers_are_rebuilt()
+    test_truncated_embedding_is_rebuilt()
+    print("Cached season stats match a full recompute")
@@ -0,0 +1,105 @@
+"""Disk cache entries must reject damage and the manifest must survive restarts and compaction"""
+
+import os
+import tempfile
+
+import statsbomb_diskcache
+from statsbomb_diskcache import DiskCache, ENTRY_HEADER, MANIFEST_NAME
+
+
+def damage(path: str, offset: int, data: bytes = None):
+    """Overwrite bytes at an offset, or truncate the file there when no data is given"""
+    with open(path, 'r+b') as f:
+        if data is None:
+            f.truncate(offset)
+        else:
+            f.seek(offset)
+            f.write(data)
+
+
+def test_corrupt_entries_are_discarded():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = DiskCache(cache_dir)
+        value = {'events': list(range(1000))}
+        cases = {
+            'bad_magic': (0, b'XXXX'),
+            'bad_crc': (ENTRY_HEADER.size + 10, b'\xff\xfe'),
+            'truncated': (ENTRY_HEADER.size + 10, None)
+        }
+        for key, (offset, data) in cases.items():
+            cache.put(key, value)
+            damage(cache.path(key), offset, data)
+        cache.put('intact', value)
+
+        for key in cases:
+            assert cache.get(key) is None
+            assert key not in cache
+            assert not os.path.exists(cache.path(key))
+        assert cache.get('intact') == value
+        assert cache.corrupt == len(cases)
+
+        # Removals are in the manifest, so a restarted cache does not look for them again
+        assert set(DiskCache(cache_dir).entries()) == {'intact'}
+
+
+def test_manifest_replays_after_restart():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = DiskCache(cache_dir)
+        for index in range(20):
+            cache.put(f"entry_{index}", index)
+        cache.put('entry_0', 'rewritten')
+        cache.remove('entry_1')
+        expected = cache.entries()
+
+        restarted = DiskCache(cache_dir)
+        assert restarted.entries() == expected
+        assert restarted.get('entry_0') == 'rewritten'
+        assert restarted.get('entry_1') is None
+
+        # Each instance sees entries the other one writes afterwards once it reloads
+        restarted.put('late', 'value')
+        cache.reload()
+        assert cache.get('late') == 'value'
+
+
+def test_torn_manifest_line_is_skipped():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = DiskCache(cache_dir)
+        cache.put('before', 1)
+
+        # A crash in the middle of an append leaves a partial line with no newline
+        with open(os.path.join(cache_dir, MANIFEST_NAME), 'a') as f:
+            f.write('torn\t12')
+        restarted = DiskCache(cache_dir)
+        restarted.put('after', 2)
+
+        for instance in (restarted, DiskCache(cache_dir)):
+            assert set(instance.entries()) == {'before', 'after'}
+            assert instance.get('after') == 2
+
+
+def test_manifest_compacts_itself():
+    limit = statsbomb_diskcache.MANIFEST_COMPACT_DEAD_LINES
+    statsbomb_diskcache.MANIFEST_COMPACT_DEAD_LINES = 50
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = DiskCache(cache_dir)
+            cache.put('kept', 'value')
+            for index in range(200):
+                cache.put('churn', index)
+
+            with open(os.path.join(cache_dir, MANIFEST_NAME)) as f:
+                lines = f.readlines()
+            assert len(lines) <= 52
+            assert DiskCache(cache_dir).get('churn') == 199
+            assert DiskCache(cache_dir).get('kept') == 'value'
+    finally:
+        statsbomb_diskcache.MANIFEST_COMPACT_DEAD_LINES = limit
+
+
+if __name__ == "__main__":
+    test_corrupt_entries_are_discarded()
+    test_manifest_replays_after_restart()
+    test_torn_manifest_line_is_skipped()
+    test_manifest_compacts_itself()
+    print("Disk cache detects damage and keeps its manifest consistent")
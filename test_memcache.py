@@ -0,0 +1,47 @@
+"""Memory cache budgets must bound what cached values actually hold, nested objects included"""
+
+import gc
+import tracemalloc
+
+import pandas as pd
+
+from statsbomb_memcache import MemoryCache, estimate_size
+
+
+def raw_events(n_events: int) -> pd.DataFrame:
+    """Events shaped like decoded open-data JSON, with nested dicts and lists in object columns"""
+    return pd.DataFrame([{
+        'type': {'id': 30, 'name': 'Pass'},
+        'location': [float(i % 120), float(i % 80)],
+        'pass': {'end_location': [60.0, 40.0], 'recipient': {'id': i, 'name': f"Player {i}"}}
+    } for i in range(n_events)])
+
+
+def test_size_matches_traced_allocations():
+    gc.collect()
+    tracemalloc.start()
+    try:
+        events = raw_events(5000)
+        gc.collect()
+        resident = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert abs(estimate_size(events) - resident) < 0.2 * resident
+
+
+def test_events_budget_rejects_oversized_frames():
+    events = raw_events(5000)
+    shallow = int(events.memory_usage(deep=True).sum())
+    cache = MemoryCache(max_bytes=10 * shallow, budgets={'events': int(1.5 * shallow)})
+
+    # Counted shallowly the frame would fit its budget; counted fully it does not
+    cache['events_1'] = events
+    assert 'events_1' not in cache
+    assert cache.rejected == 1
+
+
+if __name__ == "__main__":
+    test_size_matches_traced_allocations()
+    test_events_budget_rejects_oversized_frames()
+    print("Memory cache sizes include nested objects")
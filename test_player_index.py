@@ -0,0 +1,88 @@
+"""Player lookups through the index must find the same players as a full season scan"""
+
+import os
+import tempfile
+
+import pandas as pd
+import pytest
+
+from statsbomb_aggregate import player_name_mask
+from statsbomb_analyzer import StatsBombAnalyzer
+from statsbomb_fetcher import StatsBombFetcher
+from statsbomb_index import PlayerIndex
+from statsbomb_synthetic import write_synthetic_corpus, synthetic_lineups
+
+# Plain names, a pattern and several queries at once
+QUERIES = ['Player 04', 'synthetic 02 fc player 1', '01 FC Player 0[1-3]', ['Player 07', '03 FC Player 11']]
+
+
+def test_index_lookup_matches_name_mask():
+    with tempfile.TemporaryDirectory() as workdir:
+        index = PlayerIndex(os.path.join(workdir, 'player_index.json'))
+        names = {}
+        for match_id, (home, away) in enumerate([(0, 1), (2, 3)]):
+            lineups = synthetic_lineups(home, away)
+            index.add_lineups(1, 1, match_id, lineups)
+            names.update({player['player_id']: player['player_name']
+                          for team in lineups for player in team['lineup']})
+        index.save()
+
+        reloaded = PlayerIndex(index.path)
+        for query in QUERIES:
+            expected = {pid for pid, matched in zip(names, player_name_mask(pd.Series(list(names.values())), query))
+                        if matched}
+            assert reloaded.find_player_ids(query) == expected, query
+
+
+def test_targeted_lookup_matches_full_scan():
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_dir = os.path.join(workdir, 'raw')
+        corpus = write_synthetic_corpus(raw_dir, n_matches=6, events_per_match=400, n_teams=4, seed=3)
+        cache_dir = os.path.join(workdir, 'cache')
+        competitions = pd.DataFrame([{'competition_id': corpus['competition_id'], 'season_id': corpus['season_id'],
+                                      'competition_name': 'Synthetic League', 'season_name': 'Season 1'}])
+
+        fetcher = StatsBombFetcher(max_workers=4, cache_dir=cache_dir, source=raw_dir)
+        full_scan = {query if isinstance(query, str) else '|'.join(query):
+                     fetcher.get_player_season_stats(corpus['competition_id'], corpus['season_id'], query)
+                     for query in QUERIES}
+        fetcher.close()
+
+        # Without the season aggregate, lookups go through the index to just the player's matches
+        os.remove(os.path.join(cache_dir, f"season_{corpus['competition_id']}_{corpus['season_id']}.npz"))
+        for query in QUERIES:
+            fetcher = StatsBombFetcher(max_workers=4, cache_dir=cache_dir, source=raw_dir)
+            targeted = fetcher.get_multi_season_stats(competitions, player_name=query)
+            fetcher.close()
+
+            expected = full_scan[query if isinstance(query, str) else '|'.join(query)]
+            assert not expected.empty
+            pd.testing.assert_frame_equal(
+                targeted[expected.columns].sort_values('player_name').reset_index(drop=True),
+                expected.sort_values('player_name').reset_index(drop=True)
+            )
+
+
+def test_career_stats_match_season_totals():
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_dir = os.path.join(workdir, 'raw')
+        corpus = write_synthetic_corpus(raw_dir, n_matches=6, events_per_match=400, n_teams=4, seed=4)
+        fetcher = StatsBombFetcher(max_workers=4, cache_dir=os.path.join(workdir, 'cache'), source=raw_dir)
+        try:
+            season = fetcher.get_player_season_stats(corpus['competition_id'], corpus['season_id'])
+            name = season.sort_values('minutes_played').iloc[-1]['player_name']
+            career = StatsBombAnalyzer(fetcher).analyze_player_performance(name)['career_stats']
+        finally:
+            fetcher.close()
+
+        row = season[season['player_name'] == name].iloc[0]
+        for column in ['games_played', 'minutes_played', 'goals', 'shots', 'passes']:
+            assert type(career[column]) is int and career[column] == row[column], column
+        assert career['xg'] == pytest.approx(row['xg'])
+
+
+if __name__ == "__main__":
+    test_index_lookup_matches_name_mask()
+    test_targeted_lookup_matches_full_scan()
+    test_career_stats_match_season_totals()
+    print("Index lookups find the same players as a full scan")
@@ -0,0 +1,79 @@
+"""Every kind of local data source must give the same season stats as the raw-file path"""
+
+import os
+import tarfile
+import tempfile
+import zipfile
+
+import pandas as pd
+
+from statsbomb_fetcher import StatsBombFetcher
+from statsbomb_synthetic import write_synthetic_corpus
+
+
+def season_stats(cache_dir: str, corpus: dict, source: str = None) -> pd.DataFrame:
+    fetcher = StatsBombFetcher(max_workers=4, cache_dir=cache_dir, source=source)
+    try:
+        stats = fetcher.get_player_season_stats(corpus['competition_id'], corpus['season_id'])
+    finally:
+        fetcher.close()
+    return stats.sort_values('player_name').reset_index(drop=True)
+
+
+def write_archives(raw_dir: str, workdir: str) -> dict:
+    """Pack the corpus under a top-level folder, as repository archives do"""
+    names = [os.path.relpath(os.path.join(root, name), raw_dir)
+             for root, _, files in os.walk(raw_dir) for name in files]
+    archives = {}
+    for label, compression in [('zip_stored', zipfile.ZIP_STORED), ('zip_deflated', zipfile.ZIP_DEFLATED)]:
+        archives[label] = os.path.join(workdir, f"{label}.zip")
+        with zipfile.ZipFile(archives[label], 'w', compression) as archive:
+            for name in names:
+                archive.write(os.path.join(raw_dir, name), f"open-data-master/data/{name}")
+    for label, mode in [('tar', 'w'), ('tar_gz', 'w:gz'), ('tar_xz', 'w:xz')]:
+        archives[label] = os.path.join(workdir, f"{label}.tar")
+        with tarfile.open(archives[label], mode) as archive:
+            archive.add(raw_dir, 'open-data-master/data')
+    return archives
+
+
+def test_local_sources_match_raw_path():
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_dir = os.path.join(workdir, 'corpus')
+        corpus = write_synthetic_corpus(raw_dir, n_matches=6, events_per_match=400, n_teams=4, seed=5)
+
+        # The raw-file path is what the HTTP source leaves behind in the cache
+        raw_cache = os.path.join(workdir, 'raw_cache')
+        os.makedirs(raw_cache)
+        os.symlink(raw_dir, os.path.join(raw_cache, 'raw'))
+        expected = season_stats(raw_cache, corpus)
+        assert not expected.empty
+
+        sources = {'directory': raw_dir, **write_archives(raw_dir, workdir)}
+        for label, source in sources.items():
+            stats = season_stats(os.path.join(workdir, f"cache_{label}"), corpus, source)
+            pd.testing.assert_frame_equal(stats, expected, obj=label)
+
+
+def test_compressed_tar_is_decompressed_once():
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_dir = os.path.join(workdir, 'corpus')
+        corpus = write_synthetic_corpus(raw_dir, n_matches=4, events_per_match=200, n_teams=4, seed=6)
+        archive = write_archives(raw_dir, workdir)['tar_gz']
+        cache_dir = os.path.join(workdir, 'cache')
+
+        first = season_stats(cache_dir, corpus, archive)
+        copies = os.listdir(os.path.join(cache_dir, 'sources'))
+        assert len(copies) == 1
+        mtime = os.path.getmtime(os.path.join(cache_dir, 'sources', copies[0]))
+
+        # A second run reads the same decompressed copy instead of decompressing again
+        pd.testing.assert_frame_equal(season_stats(cache_dir, corpus, archive), first)
+        assert os.listdir(os.path.join(cache_dir, 'sources')) == copies
+        assert os.path.getmtime(os.path.join(cache_dir, 'sources', copies[0])) == mtime
+
+
+if __name__ == "__main__":
+    test_local_sources_match_raw_path()
+    test_compressed_tar_is_decompressed_once()
+    print("Every data source matches the raw-file path")
@@ -0,0 +1,158 @@
+"""Parity check between the columnar stats engine and the original iterrows loop"""
+
+import numpy as np
+import pandas as pd
+
+from statsbomb_events import flatten_events, calculate_player_match_stats
+
+
+def reference_player_match_stats(events: pd.DataFrame, lineups: list, match_info: dict) -> pd.DataFrame:
+    """Original per-event loop, kept verbatim as the parity reference"""
+    def empty_stats(player_name, team_name, position, minutes):
+        return {
+            'player_name': player_name,
+            'team_name': team_name,
+            'position': position,
+            'match_id': match_info['match_id'],
+            'match_date': match_info['match_date'],
+            'minutes_played': minutes,
+            'passes': 0, 'passes_completed': 0, 'shots': 0, 'shots_on_target': 0,
+            'goals': 0, 'assists': 0, 'key_passes': 0, 'dribbles': 0,
+            'dribbles_completed': 0, 'tackles': 0, 'interceptions': 0,
+            'clearances': 0, 'fouls': 0, 'cards_yellow': 0, 'cards_red': 0,
+            'touches': 0, 'xg': 0.0, 'xa': 0.0
+        }
+
+    player_stats = {}
+    for team in lineups:
+        for player in team.get('lineup', []):
+            position = player['positions'][0]['position'] if player['positions'] else 'Unknown'
+            player_stats[player['player_id']] = empty_stats(player['player_name'], team['team_name'], position, 90)
+
+    for _, event in events.iterrows():
+        if 'player' not in event or pd.isna(event['player']):
+            continue
+
+        player_id = event['player']['id']
+        if player_id not in player_stats:
+            player_stats[player_id] = empty_stats(
+                event['player']['name'], event.get('team', {}).get('name', 'Unknown'), 'Unknown', 45
+            )
+
+        event_type = event['type']['name']
+        stats = player_stats[player_id]
+
+        if event_type == 'Pass':
+            stats['passes'] += 1
+            if event.get('pass', {}).get('outcome', {}).get('name') != 'Incomplete':
+                stats['passes_completed'] += 1
+            if event.get('pass', {}).get('goal_assist'):
+                stats['assists'] += 1
+            elif event.get('pass', {}).get('shot_assist'):
+                stats['key_passes'] += 1
+        elif event_type == 'Shot':
+            stats['shots'] += 1
+            if event.get('shot', {}).get('outcome', {}).get('name') == 'Goal':
+                stats['goals'] += 1
+                stats['shots_on_target'] += 1
+            elif not event.get('shot', {}).get('outcome', {}).get('name') in ['Blocked', 'Off T', 'Wayward']:
+                stats['shots_on_target'] += 1
+            if 'shot' in event and 'statsbomb_xg' in event['shot']:
+                stats['xg'] += event['shot']['statsbomb_xg']
+        elif event_type == 'Dribble':
+            stats['dribbles'] += 1
+            if event.get('dribble', {}).get('outcome', {}).get('name') == 'Complete':
+                stats['dribbles_completed'] += 1
+        elif event_type in ['Tackle', 'Duel'] and event.get('duel', {}).get('type', {}).get('name') == 'Tackle':
+            stats['tackles'] += 1
+        elif event_type == 'Interception':
+            stats['interceptions'] += 1
+        elif event_type == 'Clearance':
+            stats['clearances'] += 1
+        elif event_type == 'Foul Committed':
+            stats['fouls'] += 1
+            if 'foul_committed' in event:
+                if event['foul_committed'].get('card', {}).get('name') == 'Yellow Card':
+                    stats['cards_yellow'] += 1
+                elif event['foul_committed'].get('card', {}).get('name') == 'Red Card':
+                    stats['cards_red'] += 1
+
+        stats['touches'] += 1
+
+    return pd.DataFrame.from_dict(player_stats, orient='index')
+
+
+def sample_match(n_events: int = 3000, seed: int = 7):
+    """Build a StatsBomb-shaped match with every event branch represented"""
+    rng = np.random.default_rng(seed)
+    teams = [('Home FC', range(1, 12)), ('Away FC', range(21, 32))]
+    lineups = [
+        {'team_name': name, 'lineup': [
+            {'player_id': pid, 'player_name': f'Player {pid}',
+             'positions': [] if pid % 11 == 0 else [{'position': 'Center Forward'}]}
+            for pid in ids
+        ]}
+        for name, ids in teams
+    ]
+
+    events = [{'type': {'name': 'Starting XI'}, 'team': {'name': 'Home FC'}}]
+    event_types = ['Pass', 'Shot', 'Dribble', 'Duel', 'Interception', 'Clearance',
+                   'Foul Committed', 'Ball Receipt*', 'Carry']
+    for _ in range(n_events):
+        team_name, ids = teams[rng.integers(2)]
+        # A few players are subs missing from the lineups
+        player_id = int(rng.choice(list(ids) + [ids[0] + 40]))
+        event_type = event_types[rng.integers(len(event_types))]
+        event = {
+            'type': {'name': event_type},
+            'team': {'name': team_name},
+            'player': {'id': player_id, 'name': f'Player {player_id}'},
+        }
+        if event_type == 'Pass':
+            event['pass'] = {}
+            if rng.random() < 0.2:
+                event['pass']['outcome'] = {'name': str(rng.choice(['Incomplete', 'Out']))}
+            if rng.random() < 0.05:
+                event['pass']['goal_assist'] = True
+            elif rng.random() < 0.1:
+                event['pass']['shot_assist'] = True
+        elif event_type == 'Shot':
+            event['shot'] = {'outcome': {'name': str(rng.choice(['Goal', 'Saved', 'Blocked', 'Off T', 'Wayward', 'Post']))}}
+            if rng.random() < 0.9:
+                event['shot']['statsbomb_xg'] = float(rng.random())
+        elif event_type == 'Dribble':
+            event['dribble'] = {'outcome': {'name': str(rng.choice(['Complete', 'Incomplete']))}}
+        elif event_type == 'Duel':
+            event['duel'] = {'type': {'name': str(rng.choice(['Tackle', 'Aerial Lost']))}}
+        elif event_type == 'Foul Committed':
+            event['foul_committed'] = {}
+            if rng.random() < 0.3:
+                event['foul_committed']['card'] = {'name': str(rng.choice(['Yellow Card', 'Red Card', 'Second Yellow']))}
+        events.append(event)
+
+    return events, lineups, {'match_id': 3788741, 'match_date': '2020-06-11'}
+
+
+def test_player_match_stats_parity():
+    events, lineups, match_info = sample_match()
+    frame = pd.DataFrame(events)
+
+    expected = reference_player_match_stats(frame, lineups, match_info)
+    actual = calculate_player_match_stats(flatten_events(frame), lineups, match_info)
+
+    pd.testing.assert_frame_equal(actual, expected, check_exact=False)
+
+
+def test_player_match_stats_parity_from_raw_json():
+    events, lineups, match_info = sample_match(n_events=500, seed=11)
+
+    expected = reference_player_match_stats(pd.DataFrame(events), lineups, match_info)
+    actual = calculate_player_match_stats(flatten_events(events), lineups, match_info)
+
+    pd.testing.assert_frame_equal(actual, expected, check_exact=False)
+
+
+if __name__ == "__main__":
+    test_player_match_stats_parity()
+    test_player_match_stats_parity_from_raw_json()
+    print("Columnar stats engine matches the reference loop")